@@ -1,243 +1,412 @@
-#!/usr/bin/env python3
-"""
-Cloud Sentinel - Web Dashboard
-Real-time security monitoring dashboard
-"""
-
-from flask import Flask, render_template, jsonify, request
-from flask_cors import CORS
-import sys
-from pathlib import Path
-import json
-from datetime import datetime, timedelta
-
-# Add parent directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'scanner'))
-
-from database import Database
-
-app = Flask(__name__)
-CORS(app)
-
-db = Database()
-
-
-@app.route('/')
-def index():
-    """Main dashboard page"""
-    return render_template('dashboard.html')
-
-
-@app.route('/api/summary')
-def get_summary():
-    """Get scan summary statistics"""
-    try:
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Check if violations table exists
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='violations'")
-            if not cursor.fetchone():
-                return jsonify({
-                    'total_violations': 0,
-                    'by_severity': {},
-                    'by_framework': {},
-                    'recent_scans': 0,
-                    'last_updated': datetime.now().isoformat()
-                })
-            
-            # Total violations
-            cursor.execute("SELECT COUNT(*) FROM violations")
-            total = cursor.fetchone()[0]
-            
-            # By severity
-            cursor.execute("""
-                SELECT severity, COUNT(*) 
-                FROM violations 
-                GROUP BY severity
-            """)
-            by_severity = dict(cursor.fetchall())
-            
-            # By framework (check if column exists first)
-            try:
-                cursor.execute("""
-                    SELECT framework, COUNT(*) 
-                    FROM violations 
-                    GROUP BY framework
-                """)
-                by_framework = dict(cursor.fetchall())
-            except:
-                # Framework column doesn't exist yet, use default
-                by_framework = {'terraform': total}
-            
-            # Recent scans
-            cursor.execute("""
-                SELECT COUNT(DISTINCT scan_id) 
-                FROM violations 
-                WHERE timestamp > datetime('now', '-7 days')
-            """)
-            recent_scans = cursor.fetchone()[0] if total > 0 else 0
-            
-            return jsonify({
-                'total_violations': total,
-                'by_severity': by_severity,
-                'by_framework': by_framework,
-                'recent_scans': recent_scans,
-                'last_updated': datetime.now().isoformat()
-            })
-    except Exception as e:
-        return jsonify({
-            'error': str(e),
-            'total_violations': 0,
-            'by_severity': {},
-            'by_framework': {},
-            'recent_scans': 0,
-            'last_updated': datetime.now().isoformat()
-        }), 200  # Return 200 with error message instead of 500
-
-
-@app.route('/api/violations')
-def get_violations():
-    """Get recent violations"""
-    try:
-        limit = request.args.get('limit', 50, type=int)
-        framework = request.args.get('framework', None)
-        
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Check if violations table exists
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='violations'")
-            if not cursor.fetchone():
-                return jsonify([])
-            
-            # Check if framework column exists
-            cursor.execute("PRAGMA table_info(violations)")
-            columns_info = cursor.fetchall()
-            has_framework = any(col[1] == 'framework' for col in columns_info)
-            
-            query = "SELECT * FROM violations"
-            params = []
-            
-            if framework and has_framework:
-                query += " WHERE framework = ?"
-                params.append(framework)
-            
-            query += " ORDER BY timestamp DESC LIMIT ?"
-            params.append(limit)
-            
-            cursor.execute(query, params)
-            
-            columns = [desc[0] for desc in cursor.description]
-            violations = [dict(zip(columns, row)) for row in cursor.fetchall()]
-            
-            return jsonify(violations)
-    except Exception as e:
-        return jsonify({'error': str(e), 'violations': []}), 200
-
-
-@app.route('/api/trends')
-def get_trends():
-    """Get violation trends over time"""
-    try:
-        days = request.args.get('days', 7, type=int)
-        
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT DATE(timestamp) as date, COUNT(*) as count
-            FROM violations
-            WHERE timestamp > datetime('now', ? || ' days')
-            GROUP BY DATE(timestamp)
-            ORDER BY date
-        """, (f'-{days}',))
-        
-        trends = [{'date': row[0], 'count': row[1]} for row in cursor.fetchall()]
-        
-        conn.close()
-        
-        return jsonify(trends)
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/api/scan', methods=['POST'])
-def trigger_scan():
-    """Trigger a new security scan"""
-    try:
-        import subprocess
-        import shutil
-        
-        # Check if checkov is installed
-        if not shutil.which('checkov'):
-            return jsonify({
-                'status': 'error',
-                'message': 'Checkov not installed. Install with: pip install checkov',
-                'output': 'Please install Checkov first:\n  pip install checkov\n  OR\n  pip3 install checkov'
-            }), 200
-        
-        # Run enhanced scanner
-        result = subprocess.run(
-            ['python', 'scanner/enhanced_scan.py'],
-            capture_output=True,
-            text=True,
-            timeout=300
-        )
-        
-        return jsonify({
-            'status': 'success' if result.returncode == 0 else 'error',
-            'message': 'Scan completed successfully!' if result.returncode == 0 else 'Scan failed - check output',
-            'output': result.stdout + '\n' + result.stderr
-        })
-    except subprocess.TimeoutExpired:
-        return jsonify({
-            'status': 'error',
-            'message': 'Scan timeout (>5 minutes)',
-            'output': 'Scan took too long and was cancelled'
-        }), 200
-    except Exception as e:
-        return jsonify({
-            'status': 'error',
-            'message': f'Error: {str(e)}',
-            'output': str(e)
-        }), 200
-
-
-@app.route('/api/pipeline', methods=['POST'])
-def trigger_pipeline():
-    """Trigger full DevSecOps pipeline"""
-    try:
-        import subprocess
-        
-        # Run full pipeline
-        result = subprocess.run(
-            ['python', 'scanner/pipeline.py'],
-            capture_output=True,
-            text=True,
-            timeout=600  # 10 minutes
-        )
-        
-        return jsonify({
-            'status': 'success' if result.returncode == 0 else 'error',
-            'message': 'Pipeline completed! Check your email for reports.' if result.returncode == 0 else 'Pipeline failed',
-            'output': result.stdout + '\n' + result.stderr
-        })
-    except subprocess.TimeoutExpired:
-        return jsonify({
-            'status': 'error',
-            'message': 'Pipeline timeout (>10 minutes)',
-            'output': 'Pipeline took too long and was cancelled'
-        }), 200
-    except Exception as e:
-        return jsonify({
-            'status': 'error',
-            'message': f'Error: {str(e)}',
-            'output': str(e)
-        }), 200
-
-
-if __name__ == '__main__':
-    print("🚀 Starting Cloud Sentinel Dashboard...")
-    print("📊 Dashboard available at: http://localhost:5000")
-    app.run(debug=True, host='0.0.0.0', port=5000)
+#!/usr/bin/env python3
+"""
+Cloud Sentinel - Web Dashboard
+Real-time security monitoring dashboard
+"""
+
+from flask import Flask, render_template, jsonify, request, make_response, Response, stream_with_context
+from flask_cors import CORS
+from werkzeug.routing import BaseConverter
+import gzip
+import itertools
+import os
+import sys
+from pathlib import Path
+import json
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scanner'))
+
+from database import Database
+from export import (EXPORT_FORMATS, COLUMNAR_FORMATS, CONTENT_TYPES, SCAN_COLUMNS,
+                    VIOLATION_COLUMNS, iter_columnar, iter_rows, serialize)
+from heatmap import HeatmapBuilder, to_json
+
+
+class ProjectConverter(BaseConverter):
+    """Project names: 'name' or 'owner/repo' (the GITHUB_REPOSITORY default)
+    
+    The second segment can't be a sub-resource that takes further segments
+    (export/<table>, resources/..., lifecycle/...), or e.g.
+    /api/projects/default/export/violations would read as project
+    'default/export'.
+    """
+    regex = r'[^/]+(?:/(?!(?:export|resources|lifecycle)/)[^/]+)?'
+    part_isolating = False
+
+
+app = Flask(__name__)
+app.url_map.converters['project'] = ProjectConverter
+CORS(app)
+
+db = Database()
+db.enable_analytics()
+heatmaps = HeatmapBuilder(db)
+
+# JSON responses smaller than this are not worth compressing
+COMPRESS_MIN_SIZE = 1024
+
+# How long browsers may reuse the dashboard page before revalidating
+PAGE_MAX_AGE = 300
+
+
+@app.after_request
+def compress_json(response):
+    """Gzip JSON API responses for clients that accept it"""
+    if (response.direct_passthrough
+            or response.is_streamed
+            or response.mimetype != 'application/json'
+            or 'Content-Encoding' in response.headers
+            or 'gzip' not in request.headers.get('Accept-Encoding', '').lower()):
+        return response
+    
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+    
+    response.set_data(gzip.compress(data, compresslevel=6))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.headers['Content-Length'] = str(len(response.get_data()))
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+@app.route('/')
+def index():
+    """Main dashboard page"""
+    response = make_response(render_template('dashboard.html'))
+    response.cache_control.public = True
+    response.cache_control.max_age = PAGE_MAX_AGE
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+@app.route('/api/summary')
+@app.route('/api/projects/<project:project>/summary')
+def get_summary(project=None):
+    """Get scan summary statistics (of one project on the project route)"""
+    try:
+        # Taken first: a client may see an update twice, but never miss one
+        updated_cursor = db.get_update_cursor()
+        # Served by the analytics backend (DuckDB) when one is configured
+        counts = db.get_violation_counts(project)
+        return jsonify({
+            'total_violations': counts['total'],
+            'by_severity': counts['by_severity'],
+            'by_framework': counts['by_framework'],
+            'recent_scans': counts['recent_scans'],
+            # Ingest sequence the counts are taken at; clients poll /api/changes from here
+            'cursor': counts['cursor'],
+            'updated_cursor': updated_cursor,
+            'last_updated': datetime.now().isoformat()
+        })
+    except Exception as e:
+        return jsonify({
+            'error': str(e),
+            'total_violations': 0,
+            'by_severity': {},
+            'by_framework': {},
+            'recent_scans': 0,
+            'last_updated': datetime.now().isoformat()
+        }), 200  # Return 200 with error message instead of 500
+
+
+@app.route('/api/violations')
+@app.route('/api/projects/<project:project>/violations')
+def get_violations(project=None):
+    """Get recent violations"""
+    try:
+        limit = request.args.get('limit', 50, type=int)
+        framework = request.args.get('framework', None)
+        
+        with db.get_read_connection() as conn:
+            cursor = conn.cursor()
+            
+            # Check if violations table exists
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='violations'")
+            if not cursor.fetchone():
+                return jsonify([])
+            
+            # Check if framework column exists
+            cursor.execute("PRAGMA table_info(violations)")
+            columns_info = cursor.fetchall()
+            has_framework = any(col[1] == 'framework' for col in columns_info)
+            
+            query = "SELECT * FROM violations WHERE 1 = 1"
+            params = []
+            
+            if project:
+                query += " AND project = ?"
+                params.append(project)
+            if framework and has_framework:
+                query += " AND framework = ?"
+                params.append(framework)
+            
+            query += " ORDER BY timestamp DESC LIMIT ?"
+            params.append(limit)
+            
+            cursor.execute(query, params)
+            
+            columns = [desc[0] for desc in cursor.description]
+            violations = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            
+            return jsonify(violations)
+    except Exception as e:
+        return jsonify({'error': str(e), 'violations': []}), 200
+
+
+@app.route('/api/changes')
+@app.route('/api/projects/<project:project>/changes')
+def get_changes(project=None):
+    """Violations ingested (and, with ?updated=, remediated) since the client's cursors
+    
+    The dashboard takes both cursors from /api/summary and polls here,
+    merging the delta locally, so an idle refresh transfers a few bytes
+    instead of the whole summary and table.
+    """
+    try:
+        cursor = max(request.args.get('cursor', 0, type=int), 0)
+        updated_cursor = request.args.get('updated', None, type=int)
+        if updated_cursor is not None:
+            updated_cursor = max(updated_cursor, 0)
+        limit = min(request.args.get('limit', 20, type=int), 500)
+        changes = db.get_violation_changes(cursor, limit, project=project,
+                                           updated_cursor=updated_cursor)
+        changes['last_updated'] = datetime.now().isoformat()
+        return jsonify(changes)
+    except Exception as e:
+        return jsonify({'error': str(e), 'violations': []}), 200
+
+
+@app.route('/api/search')
+@app.route('/api/projects/<project:project>/search')
+def search_violations(project=None):
+    """Full-text search over violations with filters and pagination"""
+    try:
+        query = request.args.get('q', '')
+        limit = min(request.args.get('limit', 50, type=int), 500)
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        
+        page = db.search_violations(
+            query,
+            severity=request.args.get('severity'),
+            scan_id=request.args.get('scan_id'),
+            check_id=request.args.get('check_id'),
+            limit=limit,
+            offset=offset,
+            project=project
+        )
+        return jsonify(page)
+    except Exception as e:
+        return jsonify({'error': str(e), 'results': []}), 200
+
+
+@app.route('/api/export/<table>')
+@app.route('/api/projects/<project:project>/export/<table>')
+def export_rows(table, project=None):
+    """Stream scans or violations for bulk consumers (SIEM, BI)
+    
+    Query params: format=ndjson|csv|json|arrow|parquet, since/until
+    (timestamps), scan_id, severity (violations), kind (scans: full, fast or
+    plan), limit and cursor. Rows are ordered by
+    id; to resume an interrupted export pass the last id received as cursor.
+    """
+    columns = {'scans': SCAN_COLUMNS, 'violations': VIOLATION_COLUMNS}.get(table)
+    if columns is None:
+        return jsonify({'error': f'Unknown export: {table}'}), 404
+    
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS + COLUMNAR_FORMATS:
+        return jsonify({'error': f'Unsupported format: {fmt}'}), 400
+    
+    try:
+        chunks = db.iter_export(
+            table,
+            after_id=request.args.get('cursor', 0, type=int),
+            since=request.args.get('since'),
+            until=request.args.get('until'),
+            scan_id=request.args.get('scan_id'),
+            severity=request.args.get('severity'),
+            limit=request.args.get('limit', None, type=int),
+            project=project,
+            kind=request.args.get('kind')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if fmt in COLUMNAR_FORMATS:
+        # Build the schema and first batch before the response starts, so a
+        # failure is an error status rather than a truncated stream
+        body = iter_columnar(chunks, columns, fmt)
+        try:
+            body = itertools.chain([next(body)], body)
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+    else:
+        rows = ({col: row.get(col) for col in columns} for row in iter_rows(chunks))
+        body = serialize(rows, fmt, columns)
+    
+    extension = {'ndjson': 'ndjson', 'arrow': 'arrows'}.get(fmt, fmt)
+    response = Response(stream_with_context(body), mimetype=CONTENT_TYPES[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename={table}.{extension}'
+    return response
+
+
+@app.route('/api/resources/top')
+@app.route('/api/projects/<project:project>/resources/top')
+def get_top_resources(project=None):
+    """Riskiest resources of a scan (default: latest), from the resources index"""
+    try:
+        limit = min(request.args.get('limit', 10, type=int), 500)
+        return jsonify(db.get_riskiest_resources(request.args.get('scan_id'), limit,
+                                                 project=project))
+    except Exception as e:
+        return jsonify({'error': str(e), 'resources': []}), 200
+
+
+@app.route('/api/resources/<path:resource_name>/history')
+@app.route('/api/projects/<project:project>/resources/<path:resource_name>/history')
+def get_resource_history(resource_name, project=None):
+    """Posture of a single resource across scans"""
+    try:
+        limit = min(request.args.get('limit', 50, type=int), 500)
+        return jsonify(db.get_resource_history(resource_name, limit, project=project))
+    except Exception as e:
+        return jsonify({'error': str(e), 'history': []}), 200
+
+
+@app.route('/api/trends')
+@app.route('/api/projects/<project:project>/trends')
+def get_trends(project=None):
+    """Get violation trends over time"""
+    try:
+        days = request.args.get('days', 7, type=int)
+        return jsonify(db.get_violation_trends(days, project))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/projects')
+def get_projects():
+    """Cross-project rollup: totals and latest scan per project"""
+    try:
+        return jsonify(db.get_project_rollups())
+    except Exception as e:
+        return jsonify({'error': str(e), 'projects': []}), 200
+
+
+@app.route('/api/lifecycle/mttr')
+@app.route('/api/projects/<project:project>/lifecycle/mttr')
+def get_mttr(project=None):
+    """Mean time to remediate per severity (query params: branch, since)"""
+    try:
+        return jsonify(db.get_mttr(project, request.args.get('branch'),
+                                   request.args.get('since')))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 200
+
+
+@app.route('/api/lifecycle/open-ages')
+@app.route('/api/projects/<project:project>/lifecycle/open-ages')
+def get_open_ages(project=None):
+    """Open findings per severity by age bucket (query param: branch)"""
+    try:
+        return jsonify(db.get_open_ages(project, request.args.get('branch')))
+    except Exception as e:
+        return jsonify({'error': str(e), 'by_severity': {}}), 200
+
+
+@app.route('/api/heatmap')
+@app.route('/api/projects/<project:project>/heatmap')
+def get_heatmap(project=None):
+    """Check (or resource) x scan matrices (query params: axis, scans, rows)"""
+    try:
+        scans = min(max(request.args.get('scans', 200, type=int), 1), 1000)
+        rows = min(max(request.args.get('rows', 100, type=int), 1), 1000)
+        return jsonify(to_json(heatmaps.build(request.args.get('axis', 'check'), scans,
+                                              project, rows)))
+    except Exception as e:
+        return jsonify({'error': str(e), 'labels': [], 'scans': []}), 200
+
+
+@app.route('/api/audit')
+def get_audit_log():
+    """Audit events, newest first (query params: scan_id, action, since, until, limit)"""
+    try:
+        limit = min(request.args.get('limit', 100, type=int), 1000)
+        return jsonify(db.get_audit_log(
+            scan_id=request.args.get('scan_id'),
+            action=request.args.get('action'),
+            since=request.args.get('since'),
+            until=request.args.get('until'),
+            limit=limit
+        ))
+    except Exception as e:
+        return jsonify({'error': str(e), 'events': []}), 200
+
+
+@app.route('/api/scan', methods=['POST'])
+def trigger_scan():
+    """Request a security scan (debounced and coalesced by the scan scheduler)"""
+    try:
+        from scheduler import ScanScheduler
+        
+        body = request.get_json(silent=True) or {}
+        response = ScanScheduler(db).submit(
+            body.get('triggered_by') or 'dashboard',
+            branch=body.get('branch'), commit_hash=body.get('commit'),
+            project=body.get('project'), force=bool(body.get('force')))
+        return jsonify({
+            'status': 'success',
+            'message': response['message'],
+            'output': 'Scans run from the scheduler: python scanner/scheduler.py run',
+            'request': response
+        })
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Error: {str(e)}',
+            'output': str(e)
+        }), 200
+
+
+@app.route('/api/pipeline', methods=['POST'])
+def trigger_pipeline():
+    """Trigger full DevSecOps pipeline"""
+    try:
+        import subprocess
+        
+        # Run full pipeline
+        result = subprocess.run(
+            ['python', 'scanner/pipeline.py'],
+            capture_output=True,
+            text=True,
+            timeout=600  # 10 minutes
+        )
+        
+        return jsonify({
+            'status': 'success' if result.returncode == 0 else 'error',
+            'message': 'Pipeline completed! Check your email for reports.' if result.returncode == 0 else 'Pipeline failed',
+            'output': result.stdout + '\n' + result.stderr
+        })
+    except subprocess.TimeoutExpired:
+        return jsonify({
+            'status': 'error',
+            'message': 'Pipeline timeout (>10 minutes)',
+            'output': 'Pipeline took too long and was cancelled'
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Error: {str(e)}',
+            'output': str(e)
+        }), 200
+
+
+if __name__ == '__main__':
+    # Development server only - use dashboard/wsgi.py for production
+    print("🚀 Starting Cloud Sentinel Dashboard (development server)...")
+    print("📊 Dashboard available at: http://localhost:5000")
+    print("   For production run: python dashboard/wsgi.py")
+    app.run(debug=os.getenv('FLASK_DEBUG', '0') == '1', host='0.0.0.0', port=5000)
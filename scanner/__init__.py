@@ -4,7 +4,10 @@ CLOUD SENTINEL - Security Scanner Package
 
 from .config import Config, config
 from .database import Database, db
+from .hcl_cache import HCLCache
 from .logger import ScanLogger, logger
+from .records import CheckRecord
+from .report import ReportGenerator
 from .scan import SecurityScanner
 
 __all__ = [
@@ -12,8 +15,11 @@ __all__ = [
     'config', 
     'Database',
     'db',
+    'HCLCache',
     'ScanLogger',
     'logger',
+    'CheckRecord',
+    'ReportGenerator',
     'SecurityScanner'
 ]
 
@@ -0,0 +1,138 @@
+"""
+CLOUD SENTINEL - Analytics Module
+Columnar (DuckDB) mirror of the violations table for the dashboard's aggregate queries
+"""
+
+import csv
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from config import Config
+
+# Columns mirrored for aggregation; text-heavy ones (names, descriptions) stay in SQLite
+ANALYTICS_COLUMNS = ['id', 'scan_id', 'project', 'check_id', 'severity', 'resource_type',
+                     'timestamp']
+
+# Rows staged per COPY while syncing
+SYNC_CHUNK_SIZE = 50000
+
+
+class AnalyticsStore:
+    """DuckDB copy of violations that summary and trend queries run against
+    
+    SecurityScanner keeps writing to SQLite; sync() appends the violations
+    added since the last sync (violation ids only grow, as in the change
+    feed) and is throttled to once per sync_interval seconds. If SQLite's
+    highest id drops below the mirrored one, the database was replaced and
+    the mirror is rebuilt.
+    """
+    
+    def __init__(self, db, path: Optional[str] = None, sync_interval: float = None):
+        try:
+            import duckdb
+        except ImportError:
+            raise RuntimeError("ANALYTICS_BACKEND=duckdb requires duckdb: pip install duckdb")
+        
+        self.db = db
+        self.path = path or Config.ANALYTICS_DB_PATH or ':memory:'
+        self.sync_interval = (sync_interval if sync_interval is not None
+                              else Config.ANALYTICS_SYNC_SECONDS)
+        self.conn = duckdb.connect(self.path)
+        self._lock = threading.Lock()
+        self._synced_at = 0.0
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS violations (
+                id BIGINT,
+                scan_id VARCHAR,
+                project VARCHAR,
+                check_id VARCHAR,
+                severity VARCHAR,
+                resource_type VARCHAR,
+                timestamp TIMESTAMP
+            )
+        ''')
+        self.synced_id = self.conn.execute('SELECT COALESCE(MAX(id), 0) FROM violations').fetchone()[0]
+    
+    def sync(self, force: bool = False) -> int:
+        """Copy violations added in SQLite since the last sync; returns rows copied"""
+        with self._lock:
+            if not force and time.monotonic() - self._synced_at < self.sync_interval:
+                return 0
+            
+            with self.db.get_read_connection() as conn:
+                head = conn.execute('SELECT COALESCE(MAX(id), 0) FROM violations').fetchone()[0]
+            if head < self.synced_id:
+                self.conn.execute('DELETE FROM violations')
+                self.synced_id = 0
+            
+            copied = 0
+            if head > self.synced_id:
+                chunks = self.db._iter_keyset(
+                    'violations', ' AND id <= ?', [head], self.synced_id, SYNC_CHUNK_SIZE,
+                    columns=', '.join(ANALYTICS_COLUMNS))
+                for chunk in chunks:
+                    self._copy(chunk)
+                    copied += len(chunk)
+                self.synced_id = head
+            
+            self._synced_at = time.monotonic()
+            return copied
+    
+    def _copy(self, rows: List[Dict[str, Any]]):
+        """Bulk-load rows through a CSV file (much faster than executemany)"""
+        fd, path = tempfile.mkstemp(prefix='analytics_', suffix='.csv')
+        try:
+            with os.fdopen(fd, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                for row in rows:
+                    writer.writerow([row[col] for col in ANALYTICS_COLUMNS])
+            self.conn.execute(f"COPY violations FROM '{path}' (FORMAT csv, HEADER false)")
+        finally:
+            os.unlink(path)
+    
+    def get_violation_counts(self, project: str = None) -> Dict[str, Any]:
+        """Same shape as Database.get_violation_counts"""
+        self.sync()
+        cursor = self.conn.cursor()
+        head = self.synced_id
+        scope = ' AND project = ?' if project else ''
+        params = [head, project] if project else [head]
+        
+        by_severity = dict(cursor.execute(
+            f'SELECT severity, COUNT(*) FROM violations WHERE id <= ?{scope} GROUP BY severity',
+            params).fetchall())
+        total = sum(by_severity.values())
+        cutoff = datetime.utcnow() - timedelta(days=7)
+        recent_scans = cursor.execute(
+            f'SELECT COUNT(DISTINCT scan_id) FROM violations WHERE timestamp > ?{scope}',
+            [cutoff] + params[1:]).fetchone()[0]
+        
+        return {
+            'cursor': head,
+            'total': total,
+            'by_severity': by_severity,
+            # No framework column yet: everything is Terraform
+            'by_framework': {'terraform': total},
+            'recent_scans': recent_scans if total else 0
+        }
+    
+    def get_violation_trends(self, days: int = 7, project: str = None) -> List[Dict]:
+        """Same shape as Database.get_violation_trends"""
+        self.sync()
+        scope = ' AND project = ?' if project else ''
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        rows = self.conn.cursor().execute(f'''
+            SELECT CAST(timestamp AS DATE) AS date, COUNT(*)
+            FROM violations
+            WHERE timestamp > ?{scope}
+            GROUP BY date
+            ORDER BY date
+        ''', [cutoff, project] if project else [cutoff]).fetchall()
+        return [{'date': date.isoformat(), 'count': count} for date, count in rows]
+    
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+CLOUD SENTINEL - Artifact Store
+Compressed archive of raw Checkov reports, indexed for random access
+
+Usage:
+    python scanner/artifacts.py show SCAN_ID
+    python scanner/artifacts.py extract SCAN_ID -o report.json     # scan.py --results-file input
+    python scanner/artifacts.py find --check CKV_AWS_20 --result failed
+    python scanner/artifacts.py reingest SCAN_ID                   # re-parse as a new scan
+"""
+
+import gzip
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from config import Config
+
+# Checkov result lists split into indexed records; everything else stays in the header
+CHECK_LISTS = ('passed_checks', 'failed_checks', 'skipped_checks')
+
+CODECS = ('zstd', 'gzip')
+_EXTENSIONS = {'zstd': '.jsonl.zst', 'gzip': '.jsonl.gz'}
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("ARTIFACT_CODEC=zstd requires zstandard: pip install zstandard")
+    return zstandard
+
+
+def resolve_codec(name: str = None) -> str:
+    """'zstd', 'gzip', or '' for zstd when zstandard is installed, else gzip"""
+    name = (Config.ARTIFACT_CODEC if name is None else name).lower()
+    if not name:
+        try:
+            import zstandard  # noqa: F401
+            return 'zstd'
+        except ImportError:
+            return 'gzip'
+    if name not in CODECS:
+        raise ValueError(f"Unknown artifact codec: {name!r} (expected one of {', '.join(CODECS)})")
+    if name == 'zstd':
+        _zstandard()
+    return name
+
+
+def _segment_codec(segment: str) -> str:
+    return 'zstd' if segment.endswith(_EXTENSIONS['zstd']) else 'gzip'
+
+
+def _compressor(codec: str) -> Callable[[bytes], bytes]:
+    if codec == 'zstd':
+        return _zstandard().ZstdCompressor(level=Config.ARTIFACT_ZSTD_LEVEL).compress
+    return lambda data: gzip.compress(data, mtime=0)
+
+
+def _decompressor(codec: str) -> Callable[[bytes], bytes]:
+    if codec == 'zstd':
+        return _zstandard().ZstdDecompressor().decompress
+    return gzip.decompress
+
+
+def _results_container(report: Dict[str, Any]) -> Dict[str, Any]:
+    """The dict holding a report's check lists (the same shapes parse_results accepts)"""
+    results = report.get('results')
+    return results if isinstance(results, dict) else report
+
+
+class ArtifactStore:
+    """Raw Checkov reports, compressed in frames that decompress on their own
+    
+    Reports go to one append-only segment file per calendar month. A
+    unit's report is written as a header frame (the report without its
+    check lists) followed by frames of up to frame_records check results,
+    each a JSON line carrying scan_id, unit and result. Every frame is a
+    complete zstd frame or gzip member, so a segment is still an ordinary
+    .jsonl.zst / .jsonl.gz file (zstdcat / zcat) for audits.
+    
+    The scan database indexes each frame (segment, byte offset, length) and
+    each check result (scan, unit, check, resource, result -> frame, line).
+    A scan, one unit or a single check is read back by decompressing only
+    the frames it lives in, and get_report() rebuilds a unit's report as
+    Checkov wrote it.
+    
+    Storing a unit again (a resumed scan retrying it) replaces its index
+    entries; the earlier frames remain in the segment, unreferenced.
+    """
+    
+    def __init__(self, db, root: Optional[Path] = None, codec: str = None,
+                 frame_records: int = None, retention_months: int = None):
+        self.db = db
+        self.root = Path(root or Config.ARTIFACT_STORE_DIR)
+        self.codec = codec
+        self.frame_records = max(1, frame_records or Config.ARTIFACT_FRAME_RECORDS)
+        self.retention_months = (retention_months if retention_months is not None
+                                 else Config.ARTIFACT_RETENTION_MONTHS)
+        with self.db.get_connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS artifact_frames (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    scan_id TEXT NOT NULL,
+                    unit TEXT NOT NULL,
+                    segment TEXT NOT NULL,
+                    offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    kind TEXT NOT NULL,
+                    records INTEGER NOT NULL,
+                    raw_bytes INTEGER NOT NULL,
+                    stored_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS artifact_checks (
+                    scan_id TEXT NOT NULL,
+                    unit TEXT NOT NULL,
+                    check_id TEXT,
+                    resource TEXT,
+                    file_path TEXT,
+                    result TEXT NOT NULL,
+                    frame_id INTEGER NOT NULL,
+                    line INTEGER NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_artifact_frames_scan ON artifact_frames(scan_id, unit)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_artifact_frames_segment ON artifact_frames(segment)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_artifact_checks_scan ON artifact_checks(scan_id, check_id)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_artifact_checks_check ON artifact_checks(check_id, result)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_artifact_checks_resource ON artifact_checks(resource)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_artifact_checks_frame ON artifact_checks(frame_id)')
+    
+    def store(self, scan_id: str, unit: str, report: Any) -> int:
+        """Archive one unit's raw report; returns the compressed bytes written"""
+        codec = resolve_codec(self.codec)
+        compress = _compressor(codec)
+        reports = report if isinstance(report, list) else [report]
+        
+        header = {'type': 'report', 'scan_id': scan_id, 'unit': unit,
+                  'shape': 'list' if isinstance(report, list) else 'dict', 'reports': []}
+        records: List[Tuple[bytes, tuple]] = []
+        for index, entry in enumerate(reports):
+            if not isinstance(entry, dict):
+                header['reports'].append(entry)
+                continue
+            stripped = dict(entry)
+            container = _results_container(entry)
+            if container is not entry:
+                stripped['results'] = dict(container)
+            stripped_container = _results_container(stripped)
+            for list_name in CHECK_LISTS:
+                checks = container.get(list_name)
+                if not isinstance(checks, list):
+                    continue
+                stripped_container[list_name] = []
+                result = list_name[:-len('_checks')]
+                for check in checks:
+                    line = json.dumps({'scan_id': scan_id, 'unit': unit, 'report': index,
+                                       'result': result, 'check': check})
+                    records.append((line.encode('utf-8') + b'\n',
+                                    (check.get('check_id'), check.get('resource'),
+                                     check.get('file_path'), result)))
+            header['reports'].append(stripped)
+        
+        frames = [('report', 0, (json.dumps(header) + '\n').encode('utf-8'), [])]
+        for start in range(0, len(records), self.frame_records):
+            chunk = records[start:start + self.frame_records]
+            frames.append(('checks', len(chunk), b''.join(line for line, _ in chunk),
+                           [key for _, key in chunk]))
+        
+        compressed = [compress(raw) for _, _, raw, _ in frames]
+        blob = b''.join(compressed)
+        segment = f"checkov_{datetime.utcnow():%Y%m}{_EXTENSIONS[codec]}"
+        offset = self._append(self.root / segment, blob)
+        
+        with self.db.get_connection() as conn:
+            self._delete(conn, 'scan_id = ? AND unit = ?', (scan_id, unit))
+            for (kind, count, raw, keys), data in zip(frames, compressed):
+                frame_id = conn.execute('''
+                    INSERT INTO artifact_frames
+                    (scan_id, unit, segment, offset, length, kind, records, raw_bytes)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (scan_id, unit, segment, offset, len(data), kind, count, len(raw))).lastrowid
+                conn.executemany('''
+                    INSERT INTO artifact_checks
+                    (scan_id, unit, check_id, resource, file_path, result, frame_id, line)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', [(scan_id, unit, *key, frame_id, line) for line, key in enumerate(keys)])
+                offset += len(data)
+        return len(blob)
+    
+    def _append(self, path: Path, blob: bytes) -> int:
+        """Append blob with one O_APPEND write; returns the offset it landed at
+        
+        The write (and the file position after it) is atomic on local POSIX
+        filesystems, so concurrent scans can share a segment.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o644)
+        try:
+            written = 0
+            while written < len(blob):
+                written += os.write(fd, blob[written:])
+            end = os.lseek(fd, 0, os.SEEK_CUR)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        return end - len(blob)
+    
+    @staticmethod
+    def _delete(conn, where: str, params: tuple):
+        conn.execute(f'''
+            DELETE FROM artifact_checks WHERE frame_id IN
+            (SELECT id FROM artifact_frames WHERE {where})
+        ''', params)
+        conn.execute(f'DELETE FROM artifact_frames WHERE {where}', params)
+    
+    def _read_frames(self, frames: Iterable[Dict[str, Any]]) -> Dict[int, List[Dict[str, Any]]]:
+        """{frame id: decoded lines}, reading each frame's bytes and nothing else"""
+        decoded = {}
+        by_segment: Dict[str, List[Dict[str, Any]]] = {}
+        for frame in frames:
+            by_segment.setdefault(frame['segment'], []).append(frame)
+        for segment, segment_frames in by_segment.items():
+            decompress = _decompressor(_segment_codec(segment))
+            with open(self.root / segment, 'rb') as f:
+                for frame in sorted(segment_frames, key=lambda frame: frame['offset']):
+                    f.seek(frame['offset'])
+                    data = decompress(f.read(frame['length']))
+                    decoded[frame['id']] = [json.loads(line) for line in data.splitlines()]
+        return decoded
+    
+    def _frames(self, scan_id: str, unit: str = None) -> List[Dict[str, Any]]:
+        query = 'SELECT * FROM artifact_frames WHERE scan_id = ?'
+        params = [scan_id]
+        if unit is not None:
+            query += ' AND unit = ?'
+            params.append(unit)
+        with self.db.get_read_connection() as conn:
+            return [dict(row) for row in conn.execute(query + ' ORDER BY id', params).fetchall()]
+    
+    def units(self, scan_id: str) -> List[Dict[str, Any]]:
+        """Archived units of a scan with their check counts and sizes"""
+        with self.db.get_read_connection() as conn:
+            rows = conn.execute('''
+                SELECT unit, MIN(segment) AS segment, COUNT(*) AS frames,
+                       SUM(records) AS checks, SUM(length) AS compressed_bytes,
+                       SUM(raw_bytes) AS raw_bytes, MIN(stored_at) AS stored_at
+                FROM artifact_frames WHERE scan_id = ?
+                GROUP BY unit ORDER BY MIN(id)
+            ''', (scan_id,)).fetchall()
+        return [dict(row) for row in rows]
+    
+    def get_reports(self, scan_id: str, unit: str = None) -> Dict[str, Any]:
+        """{unit: raw Checkov report} for a scan (or one unit), as Checkov wrote it"""
+        frames = self._frames(scan_id, unit)
+        decoded = self._read_frames(frames)
+        reports = {}
+        for frame in frames:
+            lines = decoded[frame['id']]
+            if frame['kind'] == 'report':
+                header = lines[0]
+                reports[frame['unit']] = header
+                continue
+            header = reports[frame['unit']]
+            for line in lines:
+                container = _results_container(header['reports'][line['report']])
+                container[f"{line['result']}_checks"].append(line['check'])
+        return {name: header['reports'] if header['shape'] == 'list' else header['reports'][0]
+                for name, header in reports.items()}
+    
+    def get_report(self, scan_id: str, unit: str = '.') -> Optional[Any]:
+        """One unit's raw report (None if not archived)"""
+        return self.get_reports(scan_id, unit).get(unit)
+    
+    def extract(self, scan_id: str) -> Any:
+        """A scan's units merged into one report that parse_results / --results-file accept"""
+        reports = self.get_reports(scan_id)
+        if len(reports) == 1:
+            return next(iter(reports.values()))
+        merged = []
+        for report in reports.values():
+            merged.extend(report if isinstance(report, list) else [report])
+        return merged
+    
+    def find(self, scan_id: str = None, check_id: str = None, resource: str = None,
+             result: str = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Archived check results matching all given filters, newest first
+        
+        Only the frames holding matches are read and decompressed.
+        """
+        conditions, params = [], []
+        for column, value in (('scan_id', scan_id), ('check_id', check_id),
+                              ('resource', resource), ('result', result)):
+            if value is not None:
+                conditions.append(f'c.{column} = ?')
+                params.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        with self.db.get_read_connection() as conn:
+            hits = [dict(row) for row in conn.execute(f'''
+                SELECT c.frame_id, c.line, f.segment, f.offset, f.length
+                FROM artifact_checks c JOIN artifact_frames f ON f.id = c.frame_id
+                {where}
+                ORDER BY c.frame_id DESC, c.line
+                LIMIT ?
+            ''', params + [limit]).fetchall()]
+        decoded = self._read_frames({hit['frame_id']: {'id': hit['frame_id'], 'segment': hit['segment'],
+                                                       'offset': hit['offset'], 'length': hit['length']}
+                                     for hit in hits}.values())
+        return [decoded[hit['frame_id']][hit['line']] for hit in hits]
+    
+    def prune(self, retention_months: int = None) -> int:
+        """Drop segments (and their index entries) past the retention; returns files removed"""
+        keep = self.retention_months if retention_months is None else retention_months
+        if keep <= 0 or not self.root.exists():
+            return 0
+        now = datetime.utcnow()
+        month = now.year * 12 + now.month - 1 - (keep - 1)
+        oldest = f"checkov_{month // 12:04d}{month % 12 + 1:02d}"
+        
+        removed = 0
+        for path in sorted(self.root.glob('checkov_*.jsonl.*')):
+            if path.name[:len(oldest)] >= oldest:
+                continue
+            with self.db.get_connection() as conn:
+                self._delete(conn, 'segment = ?', (path.name,))
+            path.unlink()
+            removed += 1
+        return removed
+
+
+def main():
+    """Main entry point"""
+    import argparse
+    import tempfile
+    
+    from database import Database
+    
+    parser = argparse.ArgumentParser(description='Cloud Sentinel raw report archive')
+    sub = parser.add_subparsers(dest='command', required=True)
+    
+    show = sub.add_parser('show', help="List a scan's archived units")
+    show.add_argument('scan_id')
+    
+    extract = sub.add_parser('extract', help="Write a scan's raw Checkov report")
+    extract.add_argument('scan_id')
+    extract.add_argument('-u', '--unit', type=str, help='Only this unit')
+    extract.add_argument('-o', '--output', type=str, help='Output file (default: stdout)')
+    
+    find = sub.add_parser('find', help='Look up archived check results')
+    find.add_argument('--scan', type=str, help='Scan ID')
+    find.add_argument('--check', type=str, help='Check ID, e.g. CKV_AWS_20')
+    find.add_argument('--resource', type=str, help='Resource, e.g. aws_s3_bucket.logs')
+    find.add_argument('--result', choices=['passed', 'failed', 'skipped'])
+    find.add_argument('--limit', type=int, default=100, help='Results to show')
+    
+    reingest = sub.add_parser('reingest', help='Re-parse an archived scan as a new scan '
+                                               '(current severity mapping and gate; does '
+                                               'not touch the finding lifecycle)')
+    reingest.add_argument('scan_id')
+    
+    args = parser.parse_args()
+    db = Database()
+    store = ArtifactStore(db)
+    
+    if args.command == 'show':
+        units = store.units(args.scan_id)
+        if not units:
+            print(f"No archived reports for {args.scan_id}", file=sys.stderr)
+            sys.exit(1)
+        row_format = "{:<40} {:>7} {:>7} {:>12} {:>12}  {}"
+        print(row_format.format('Unit', 'Frames', 'Checks', 'Raw', 'Compressed', 'Segment'))
+        for unit in units:
+            print(row_format.format(unit['unit'], unit['frames'], unit['checks'],
+                                    unit['raw_bytes'], unit['compressed_bytes'], unit['segment']))
+    
+    elif args.command == 'extract':
+        if args.unit:
+            report = store.get_report(args.scan_id, args.unit)
+        else:
+            report = store.extract(args.scan_id) if store.units(args.scan_id) else None
+        if report is None:
+            print(f"No archived report for {args.scan_id}", file=sys.stderr)
+            sys.exit(1)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"Wrote {args.output}")
+        else:
+            json.dump(report, sys.stdout, indent=2)
+            print()
+    
+    elif args.command == 'find':
+        for line in store.find(args.scan, args.check, args.resource, args.result, args.limit):
+            check = line['check']
+            print(f"{line['scan_id']}  {line['unit']:<24} {line['result']:<8} "
+                  f"{check.get('check_id', '')} {check.get('resource', '')} "
+                  f"({check.get('file_path', '')})")
+    
+    else:
+        from scan import SecurityScanner
+        
+        scan = db.get_scan(args.scan_id)
+        if not scan or not store.units(args.scan_id):
+            print(f"No archived reports for {args.scan_id}", file=sys.stderr)
+            sys.exit(1)
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump(store.extract(args.scan_id), f)
+        try:
+            result = SecurityScanner(db).scan(
+                results_file=Path(f.name), commit_hash=scan['commit_hash'],
+                branch=scan['branch'], triggered_by=f"reingest:{args.scan_id}",
+                project=scan['project'], counts_only=True, kind='reingest')
+        finally:
+            os.unlink(f.name)
+        sys.exit(1 if result['blocked'] else 0)
+
+
+if __name__ == '__main__':
+    main()
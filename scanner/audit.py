@@ -0,0 +1,275 @@
+"""
+CLOUD SENTINEL - Audit Module
+Buffered audit logging into monthly, indexed partitions of the scan database
+"""
+
+import atexit
+import os
+import re
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config import Config
+
+# Single table used before partitioning; migrated into the partitions once
+LEGACY_TABLE = 'audit_log'
+_PARTITION_RE = re.compile(r'^audit_log_(\d{6})$')
+
+# One AuditLog (and flusher thread) per database file, see AuditLog.for_db
+_shared: Dict[str, 'AuditLog'] = {}
+_shared_lock = threading.Lock()
+
+
+def partition_name(timestamp: str) -> str:
+    """'2024-03-15 10:00:00' -> 'audit_log_202403'"""
+    return f"audit_log_{timestamp[:4]}{timestamp[5:7]}"
+
+
+class AuditLog:
+    """Audit trail that stays off the scan ingestion path
+    
+    log() only appends to an in-memory buffer. Events are written in one
+    transaction per batch by a background thread, every flush_interval
+    seconds or as soon as batch_size events are waiting (with no interval,
+    the caller that fills the batch writes it), and before any query and at
+    interpreter exit. Each event keeps the time it was logged, not the
+    time it was written. A failed flush keeps its events for the next one.
+    Buffering trades durability for speed: up to flush_interval
+    (AUDIT_FLUSH_SECONDS) of events are lost if the process is killed
+    (SIGKILL) or crashes before the next flush; set it to 0 with a
+    batch_size of 1 to write every event as it is logged.
+    
+    Events go to one table per calendar month (audit_log_YYYYMM) indexed by
+    scan_id, action and timestamp; rotate() drops whole months past the
+    retention instead of deleting row by row. Retention is opt-in: with
+    retention_months 0 (the default) nothing is dropped.
+    
+    Database objects share one instance per database file (for_db), so
+    opening more of them doesn't start more flusher threads; close()
+    stops the thread after a last flush.
+    """
+    
+    def __init__(self, db, batch_size: int = None, flush_interval: float = None,
+                 retention_months: int = None):
+        self.db = db
+        self.batch_size = max(1, batch_size if batch_size is not None else Config.AUDIT_BATCH_SIZE)
+        self.flush_interval = (flush_interval if flush_interval is not None
+                               else Config.AUDIT_FLUSH_SECONDS)
+        self.retention_months = (retention_months if retention_months is not None
+                                 else Config.AUDIT_RETENTION_MONTHS)
+        self._buffer: List[tuple] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid = None
+        self._partitions = set()
+    
+    @classmethod
+    def for_db(cls, db) -> 'AuditLog':
+        """The shared AuditLog for db's file, created on first use"""
+        key = str(Path(db.db_path).resolve())
+        with _shared_lock:
+            audit = _shared.get(key)
+            if audit is None:
+                audit = _shared[key] = cls(db)
+            else:
+                # The file may have been replaced since: re-check partitions
+                audit._partitions = set()
+            return audit
+    
+    def log(self, action: str, details: str, user: str = 'system', scan_id: str = None):
+        """Record an event (written at the next flush)"""
+        timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        with self._lock:
+            self._buffer.append((timestamp, action, details, user, scan_id))
+            full = len(self._buffer) >= self.batch_size
+        if self.flush_interval > 0:
+            self._ensure_thread()
+            if full:
+                self._wake.set()
+        elif full:
+            self.flush()
+    
+    def _ensure_thread(self):
+        """Start the flusher (again after a fork: threads don't survive it)"""
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(self._stop,),
+                                            name='audit-flush', daemon=True)
+            self._thread.start()
+    
+    def _run(self, stop: threading.Event):
+        while not stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if stop.is_set():
+                break
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Audit flush failed, will retry: {e}", file=sys.stderr)
+    
+    def close(self):
+        """Stop the flusher thread and write what is left
+        
+        Logging again afterwards starts a new thread.
+        """
+        with self._lock:
+            thread, stop = self._thread, self._stop
+            self._thread = None
+        if thread is not None and self._pid == os.getpid():
+            stop.set()
+            self._wake.set()
+            thread.join()
+        self.flush()
+    
+    def flush(self) -> int:
+        """Write buffered events; returns how many were written"""
+        with self._flush_lock:
+            with self._lock:
+                events, self._buffer = self._buffer, []
+            if not events:
+                return 0
+            
+            try:
+                by_partition: Dict[str, List[tuple]] = {}
+                for event in events:
+                    by_partition.setdefault(partition_name(event[0]), []).append(event)
+                
+                created = False
+                with self.db.get_connection() as conn:
+                    for table, rows in by_partition.items():
+                        if table not in self._partitions:
+                            created |= self._create_partition(conn, table)
+                        conn.executemany(f'''
+                            INSERT INTO {table} (timestamp, action, details, user, scan_id)
+                            VALUES (?, ?, ?, ?, ?)
+                        ''', rows)
+                    if created:
+                        self._rotate(conn)
+            except Exception:
+                # Keep the events (ahead of newer ones) for the next flush
+                with self._lock:
+                    self._buffer[:0] = events
+                raise
+            return len(events)
+    
+    def _create_partition(self, conn, table: str) -> bool:
+        """Create a month's table and indexes; True if it did not exist"""
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name = ?", (table,)
+        ).fetchone() is not None
+        if not exists:
+            conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS {table} (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp DATETIME NOT NULL,
+                    action TEXT NOT NULL,
+                    details TEXT,
+                    user TEXT,
+                    scan_id TEXT
+                )
+            ''')
+            conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_scan_id ON {table}(scan_id)')
+            conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_action ON {table}(action, timestamp)')
+            conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_timestamp ON {table}(timestamp)')
+        self._partitions.add(table)
+        return not exists
+    
+    def migrate_legacy(self, conn):
+        """Move rows of the old single audit_log table into monthly partitions"""
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name = ?",
+                            (LEGACY_TABLE,)).fetchone():
+            return
+        months = conn.execute(f"""
+            SELECT DISTINCT strftime('%Y-%m', timestamp) FROM {LEGACY_TABLE}
+            WHERE timestamp IS NOT NULL
+        """).fetchall()
+        for (month,) in months:
+            table = partition_name(month)
+            self._create_partition(conn, table)
+            conn.execute(f"""
+                INSERT INTO {table} (timestamp, action, details, user, scan_id)
+                SELECT timestamp, action, details, user, scan_id FROM {LEGACY_TABLE}
+                WHERE strftime('%Y-%m', timestamp) = ? ORDER BY id
+            """, (month,))
+        conn.execute(f'DROP TABLE {LEGACY_TABLE}')
+        if months:
+            self._rotate(conn)
+    
+    @staticmethod
+    def _list_partitions(conn) -> List[str]:
+        """Monthly partitions, newest first"""
+        names = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'audit_log_%'")]
+        return sorted((name for name in names if _PARTITION_RE.match(name)), reverse=True)
+    
+    def _rotate(self, conn):
+        if self.retention_months <= 0:
+            return
+        # Keep the current calendar month and the retention_months - 1 before it
+        now = datetime.utcnow()
+        months = now.year * 12 + now.month - self.retention_months
+        oldest = f"audit_log_{months // 12:04d}{months % 12 + 1:02d}"
+        for table in self._list_partitions(conn):
+            if table < oldest:
+                conn.execute(f'DROP TABLE {table}')
+                self._partitions.discard(table)
+    
+    def rotate(self):
+        """Drop months older than the retention (done automatically when a month starts)"""
+        self.flush()
+        with self.db.get_connection() as conn:
+            self._rotate(conn)
+    
+    def query(self, scan_id: str = None, action: str = None, since: str = None,
+              until: str = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Events newest first, reading only the partitions in [since, until)"""
+        self.flush()
+        
+        conditions, params = [], []
+        for column, op, value in (('scan_id', '=', scan_id), ('action', '=', action),
+                                  ('timestamp', '>=', since), ('timestamp', '<', until)):
+            if value:
+                conditions.append(f'{column} {op} ?')
+                params.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        
+        events: List[Dict[str, Any]] = []
+        with self.db.get_read_connection() as conn:
+            tables = [table for table in self._list_partitions(conn)
+                      if not (since and table < partition_name(since))
+                      and not (until and table > partition_name(until))]
+            for table in tables:
+                if len(events) >= limit:
+                    break
+                rows = conn.execute(f'''
+                    SELECT timestamp, action, details, user, scan_id
+                    FROM {table} {where}
+                    ORDER BY timestamp DESC, id DESC
+                    LIMIT ?
+                ''', params + [limit - len(events)]).fetchall()
+                events.extend(dict(row) for row in rows)
+        return events
+
+
+def _close_shared():
+    """Flush every shared AuditLog at interpreter exit"""
+    for audit in list(_shared.values()):
+        try:
+            audit.close()
+        except Exception as e:
+            print(f"Audit flush at exit failed: {e}", file=sys.stderr)
+
+
+atexit.register(_close_shared)
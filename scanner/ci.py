@@ -0,0 +1,154 @@
+"""
+CLOUD SENTINEL - CI Integration Module
+Writes GitHub Actions step outputs, job summary and PR comment for a scan
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+SEVERITY_ORDER = ['CRITICAL', 'HIGH', 'MEDIUM', 'LOW']
+
+SEVERITY_ICONS = {
+    'CRITICAL': '🔴',
+    'HIGH': '🟠',
+    'MEDIUM': '🟡',
+    'LOW': '🔵'
+}
+
+# Violations listed individually in the summary / PR comment
+MAX_LISTED_VIOLATIONS = 25
+
+
+def severity_counts(violations: List[Any]) -> Dict[str, int]:
+    """Count violations per severity"""
+    counts = {sev: 0 for sev in SEVERITY_ORDER}
+    for v in violations:
+        counts[v['severity']] = counts.get(v['severity'], 0) + 1
+    return counts
+
+
+def _cell(value: Any) -> str:
+    """Make a value safe inside a markdown table cell"""
+    return str(value if value is not None else '').replace('|', '\\|').replace('\n', ' ')
+
+
+def _append(path: Optional[str], text: str):
+    """Append to a GitHub-provided file (no-op outside Actions)"""
+    if not path:
+        return
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(text)
+
+
+def scan_status(results: Dict[str, Any]) -> str:
+    """'gated' if stopped early by --fail-fast, 'incomplete' if units did not
+    finish, else 'failed' / 'passed'"""
+    if results.get('status') == 'gated':
+        return 'gated'
+    if results.get('incomplete_units'):
+        return 'incomplete'
+    return 'failed' if results['summary']['failed'] else 'passed'
+
+
+def build_markdown(results: Dict[str, Any], counts: Dict[str, int],
+                   commit_hash: str = None, branch: str = None) -> str:
+    """Markdown report used for both the job summary and the PR comment"""
+    summary = results['summary']
+    violations = results['violations']
+    status = scan_status(results)
+    
+    lines = [
+        "## 🛡️ Cloud Sentinel Security Scan Results",
+        "",
+        "| Metric | Value |",
+        "|--------|-------|",
+        f"| Status | {status} |",
+        f"| Violations Found | **{summary['failed']}** |",
+        f"| Checks | {summary['passed']} passed, {summary['skipped']} skipped |",
+        f"| Deployment | {'🚫 blocked' if results['blocked'] else '✅ allowed'} |",
+        f"| Scan ID | `{results['scan_id']}` |",
+    ]
+    if results.get('gate_reason'):
+        stopped = ' (scan stopped early)' if status == 'gated' else ''
+        lines.append(f"| Gate | {_cell(results['gate_reason'])}{stopped} |")
+    if results.get('incomplete_units'):
+        lines.append(f"| Incomplete Units | {_cell(', '.join(results['incomplete_units']))} |")
+    if commit_hash:
+        lines.append(f"| Commit | {commit_hash} |")
+    if branch:
+        lines.append(f"| Branch | {branch} |")
+    lines.append("")
+    
+    if not violations:
+        lines += ["### ✅ No Security Issues Found",
+                  "All infrastructure configurations passed security validation.", ""]
+        return '\n'.join(lines)
+    
+    lines += ["### 🚨 Security Issues Detected", "",
+              " | ".join(f"{SEVERITY_ICONS.get(sev, '')} {sev}: **{counts.get(sev, 0)}**"
+                         for sev in SEVERITY_ORDER), ""]
+    
+    rank = {sev: i for i, sev in enumerate(SEVERITY_ORDER)}
+    listed = sorted(violations, key=lambda v: rank.get(v['severity'], len(rank)))
+    listed = listed[:MAX_LISTED_VIOLATIONS]
+    
+    lines += ["| Severity | Check | Resource | File |",
+              "|----------|-------|----------|------|"]
+    for v in listed:
+        location = f"{v['file_path']}:{v['file_line']}" if v['file_line'] else v['file_path']
+        lines.append(f"| {v['severity']} | `{_cell(v['check_id'])}` {_cell(v['check_name'])} "
+                     f"| `{_cell(v['resource_name'])}` | {_cell(location)} |")
+    if len(violations) > len(listed):
+        lines.append(f"\n_Showing {len(listed)} of {len(violations)} violations._")
+    lines.append("")
+    
+    return '\n'.join(lines)
+
+
+def publish_results(results: Dict[str, Any], commit_hash: str = None,
+                    branch: str = None, comment_file: Optional[Path] = None) -> Dict[str, Any]:
+    """Emit step outputs, job summary and PR comment from one parsed scan
+    
+    Everything is derived from the scan result already in memory, so the
+    Checkov report is only parsed once per workflow run.
+    """
+    summary = results['summary']
+    counts = severity_counts(results['violations'])
+    status = scan_status(results)
+    
+    outputs = {
+        'status': status,
+        'violations': summary['failed'],
+        'critical': counts.get('CRITICAL', 0),
+        'high': counts.get('HIGH', 0),
+        'blocked': str(results['blocked']).lower(),
+        'scan_id': results['scan_id']
+    }
+    _append(os.getenv('GITHUB_OUTPUT'),
+            ''.join(f"{key}={value}\n" for key, value in outputs.items()))
+    
+    markdown = build_markdown(results, counts, commit_hash, branch)
+    _append(os.getenv('GITHUB_STEP_SUMMARY'), markdown + '\n')
+    if comment_file:
+        Path(comment_file).write_text(markdown, encoding='utf-8')
+    
+    # Workflow annotations
+    if summary['failed']:
+        print(f"::warning::🚨 Found {summary['failed']} security violations "
+              f"({counts.get('CRITICAL', 0)} critical, {counts.get('HIGH', 0)} high)")
+    else:
+        print("::notice::✅ No security violations found!")
+    
+    return outputs
+
+
+def publish_failure(message: str, warning: bool = False):
+    """Emit 'unknown' outputs when the scan itself could not complete
+    
+    With warning, the annotation is a warning instead of an error (--soft-fail).
+    """
+    _append(os.getenv('GITHUB_OUTPUT'), "status=unknown\nviolations=0\nblocked=true\n")
+    _append(os.getenv('GITHUB_STEP_SUMMARY'),
+            f"## 🛡️ Cloud Sentinel Security Scan Results\n\n⚠️ Scan failed: {message}\n")
+    print(f"::{'warning' if warning else 'error'}::Cloud Sentinel scan failed: {message}")
@@ -8,7 +8,8 @@ from pathlib import Path
 from dotenv import load_dotenv
 
 # Load .env file from project root
-env_path = Path(__file__).parent.parent / '.env'
+PROJECT_ROOT = Path(__file__).parent.parent
+env_path = PROJECT_ROOT / '.env'
 load_dotenv(env_path)
 
 
@@ -27,6 +28,26 @@ class Config:
     # Database Settings
     SQLITE_DB_PATH = os.getenv('SQLITE_DB_PATH', './data/scan_results.db')
     
+    # Project (repository) new scans are filed under; defaults to the GitHub repo in Actions
+    SCAN_PROJECT = os.getenv('SCAN_PROJECT') or os.getenv('GITHUB_REPOSITORY') or 'default'
+    
+    # Optional columnar backend for dashboard aggregates ('duckdb'; empty = SQLite only).
+    # Only the dashboard opens it; the scanner, workers, scheduler and CLI tools stay
+    # SQLite-only. The mirror lives in memory per process unless ANALYTICS_DB_PATH names
+    # a file (a file can only be opened by one process, so not with DASHBOARD_WORKERS > 1)
+    ANALYTICS_BACKEND = os.getenv('ANALYTICS_BACKEND', '').lower()
+    ANALYTICS_DB_PATH = os.getenv('ANALYTICS_DB_PATH', '')
+    ANALYTICS_SYNC_SECONDS = float(os.getenv('ANALYTICS_SYNC_SECONDS', '5'))
+    
+    # Audit log: events are written in batches of AUDIT_BATCH_SIZE (1 = write each one
+    # at once) by a background thread at least every AUDIT_FLUSH_SECONDS (0 = no thread;
+    # that much buffered history is lost if the process is killed), into monthly tables.
+    # AUDIT_RETENTION_MONTHS > 0 drops tables older than that many calendar months;
+    # the default 0 keeps everything
+    AUDIT_BATCH_SIZE = int(os.getenv('AUDIT_BATCH_SIZE', '50'))
+    AUDIT_FLUSH_SECONDS = float(os.getenv('AUDIT_FLUSH_SECONDS', '2'))
+    AUDIT_RETENTION_MONTHS = int(os.getenv('AUDIT_RETENTION_MONTHS', '0'))
+    
     # GitHub Settings
     GITHUB_REPO_URL = os.getenv('GITHUB_REPO_URL', '')
     GITHUB_TOKEN = os.getenv('GITHUB_TOKEN', '')
@@ -41,6 +62,67 @@ class Config:
     # Scanner Settings
     TERRAFORM_DIR = os.getenv('TERRAFORM_DIR', './terraform')
     CHECKOV_OUTPUT_DIR = os.getenv('CHECKOV_OUTPUT_DIR', './checkov_results')
+    CHECKOV_ARTIFACT_RETENTION = int(os.getenv('CHECKOV_ARTIFACT_RETENTION', '20'))  # scans kept
+    
+    # Raw Checkov report archive (see artifacts.py): monthly segment files under
+    # ARTIFACT_STORE_DIR, codec ('zstd' needs zstandard, 'gzip'; empty = zstd when
+    # installed) and zstd level, check results per independently decompressible
+    # frame and months of segments kept (0 = all)
+    ARTIFACT_STORE_DIR = os.getenv('ARTIFACT_STORE_DIR', './data/artifacts')
+    ARTIFACT_CODEC = os.getenv('ARTIFACT_CODEC', '')
+    ARTIFACT_ZSTD_LEVEL = int(os.getenv('ARTIFACT_ZSTD_LEVEL', '9'))
+    ARTIFACT_FRAME_RECORDS = int(os.getenv('ARTIFACT_FRAME_RECORDS', '256'))
+    ARTIFACT_RETENTION_MONTHS = int(os.getenv('ARTIFACT_RETENTION_MONTHS', '0'))
+    
+    # Profile every scan ('cpu' or 'memory', see profiling.py); artifacts go to
+    # <CHECKOV_OUTPUT_DIR>/<scan_id>/profile/. Same as scan.py --profile, for
+    # scans started by the dashboard or a scheduler
+    SCAN_PROFILE = os.getenv('SCAN_PROFILE', '')
+    
+    # Parsed-Terraform cache for native analysis (see hcl_cache.py); a relative
+    # path is taken from the project root, so every working directory shares it
+    HCL_CACHE_DIR = os.getenv('HCL_CACHE_DIR', '.cache/hcl')
+    HCL_CACHE_MAX_MB = int(os.getenv('HCL_CACHE_MAX_MB', '64'))
+    
+    # Scan units ('directory' = one Checkov run per Terraform module, 'file' = per .tf file)
+    SCAN_UNIT_MODE = os.getenv('SCAN_UNIT_MODE', 'directory')
+    
+    # Distributed scans (scan.py --distributed, scanner/worker.py): shard queue file
+    # shared by the coordinator and all workers, lease length (renewed by worker
+    # heartbeats), leases per shard before it fails, coordinator poll interval and
+    # how long the coordinator waits with no worker activity before giving up
+    WORK_QUEUE_PATH = os.getenv('WORK_QUEUE_PATH', './data/work_queue.db')
+    SHARD_LEASE_SECONDS = float(os.getenv('SHARD_LEASE_SECONDS', '60'))
+    SHARD_MAX_ATTEMPTS = int(os.getenv('SHARD_MAX_ATTEMPTS', '3'))
+    SHARD_POLL_SECONDS = float(os.getenv('SHARD_POLL_SECONDS', '1'))
+    SHARD_IDLE_TIMEOUT = float(os.getenv('SHARD_IDLE_TIMEOUT', '900'))
+    
+    # Scan scheduler (see scheduler.py): a branch is scanned once no trigger has
+    # arrived for DEBOUNCE seconds, but at most MAX_DELAY after its first pending
+    # trigger; periodic scans per branch, e.g. 'main=6h,develop=1d'. A running scan
+    # holds its requests under a lease (renewed while it runs) of LEASE seconds
+    SCHEDULER_DEBOUNCE_SECONDS = float(os.getenv('SCHEDULER_DEBOUNCE_SECONDS', '60'))
+    SCHEDULER_MAX_DELAY_SECONDS = float(os.getenv('SCHEDULER_MAX_DELAY_SECONDS', '600'))
+    SCHEDULER_POLL_SECONDS = float(os.getenv('SCHEDULER_POLL_SECONDS', '5'))
+    SCHEDULER_LEASE_SECONDS = float(os.getenv('SCHEDULER_LEASE_SECONDS', '60'))
+    SCAN_SCHEDULES = os.getenv('SCAN_SCHEDULES', '')
+    
+    # Per-unit Checkov timeouts (seconds); with history a unit gets
+    # CHECKOV_TIMEOUT_FACTOR x its slowest recent run, clamped to [MIN, MAX]
+    CHECKOV_TIMEOUT = float(os.getenv('CHECKOV_TIMEOUT', '300'))
+    CHECKOV_TIMEOUT_MIN = float(os.getenv('CHECKOV_TIMEOUT_MIN', '60'))
+    CHECKOV_TIMEOUT_MAX = float(os.getenv('CHECKOV_TIMEOUT_MAX', '1800'))
+    CHECKOV_TIMEOUT_FACTOR = float(os.getenv('CHECKOV_TIMEOUT_FACTOR', '3'))
+    
+    # Report Settings
+    REPORTS_DIR = os.getenv('REPORTS_DIR', './reports')
+    REPORT_PAGE_SIZE = int(os.getenv('REPORT_PAGE_SIZE', '500'))
+    
+    # Dashboard Server Settings (production mode, see dashboard/wsgi.py)
+    DASHBOARD_HOST = os.getenv('DASHBOARD_HOST', '0.0.0.0')
+    DASHBOARD_PORT = int(os.getenv('DASHBOARD_PORT', '5000'))
+    DASHBOARD_WORKERS = int(os.getenv('DASHBOARD_WORKERS', '1'))
+    DASHBOARD_THREADS = int(os.getenv('DASHBOARD_THREADS', '8'))
     
     # Severity Levels
     SEVERITY_LEVELS = {
@@ -55,6 +137,15 @@ class Config:
     BLOCK_ON_CRITICAL = True
     BLOCK_ON_HIGH = True
     
+    # Deployment gate (see gate.py). Thresholds: findings per severity that block,
+    # e.g. 'CRITICAL=1,HIGH=5' (empty = the BLOCK_ON_* flags); per resource type,
+    # e.g. 'aws_s3_bucket:MEDIUM=1;aws_iam_policy:HIGH=1'; comma-separated check ID
+    # globs that never block (allow) or always block (deny)
+    GATE_THRESHOLDS = os.getenv('GATE_THRESHOLDS', '')
+    GATE_RESOURCE_THRESHOLDS = os.getenv('GATE_RESOURCE_THRESHOLDS', '')
+    GATE_ALLOW_CHECKS = os.getenv('GATE_ALLOW_CHECKS', '')
+    GATE_DENY_CHECKS = os.getenv('GATE_DENY_CHECKS', '')
+    
     @classmethod
     def get_db_path(cls) -> Path:
         """Get database path, creating directory if needed"""
@@ -74,6 +165,25 @@ class Config:
         output_dir.mkdir(parents=True, exist_ok=True)
         return output_dir
     
+    @classmethod
+    def get_scan_artifact_dir(cls, scan_id: str) -> Path:
+        """Get a scan's artifact directory (profiles), creating if needed"""
+        artifact_dir = cls.get_checkov_output_dir() / scan_id
+        artifact_dir.mkdir(parents=True, exist_ok=True)
+        return artifact_dir
+    
+    @classmethod
+    def get_hcl_cache_dir(cls) -> Path:
+        """Get parsed-Terraform cache directory, anchored at the project root"""
+        return PROJECT_ROOT / cls.HCL_CACHE_DIR
+    
+    @classmethod
+    def get_reports_dir(cls) -> Path:
+        """Get report output directory, creating if needed"""
+        reports_dir = Path(cls.REPORTS_DIR)
+        reports_dir.mkdir(parents=True, exist_ok=True)
+        return reports_dir
+    
     @classmethod
     def validate(cls) -> list:
         """Validate configuration and return list of warnings"""
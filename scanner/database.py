@@ -3,21 +3,43 @@ CLOUD SENTINEL - Database Module
 SQLite database for storing scan results and audit logs
 """
 
+import os
 import sqlite3
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Iterable, Iterator
 from contextlib import contextmanager
 
+from audit import AuditLog
 from config import Config
 
+# Open-finding age buckets: (label, upper bound in days); the last one is open-ended
+OPEN_AGE_BUCKETS = [('<1d', 1), ('1-7d', 7), ('7-30d', 30), ('30-90d', 90), ('>90d', None)]
+
 
 class Database:
     """SQLite database handler for scan results"""
     
     def __init__(self, db_path: Optional[Path] = None):
         self.db_path = db_path or Config.get_db_path()
+        self.fts_enabled = False
+        self._local = threading.local()
+        self.audit = AuditLog.for_db(self)
         self._init_database()
+        self.analytics = None
+    
+    def enable_analytics(self):
+        """Serve aggregate queries from the configured analytics backend
+        
+        Only the dashboard calls this: the scanner, workers and CLI tools
+        never run the aggregates, and a file-backed DuckDB store can only
+        be held open by one process at a time.
+        """
+        if self.analytics is None and Config.ANALYTICS_BACKEND == 'duckdb':
+            from analytics import AnalyticsStore
+            self.analytics = AnalyticsStore(self)
+        return self.analytics
     
     @contextmanager
     def get_connection(self):
@@ -33,6 +55,24 @@ class Database:
         finally:
             conn.close()
     
+    @contextmanager
+    def get_read_connection(self):
+        """Context manager for a reused, read-only connection
+        
+        Each thread (and each forked worker process) keeps one connection
+        opened with mode=ro, so read-heavy callers like the dashboard skip
+        the per-request connect and cannot write by accident.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA query_only = ON')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        yield conn
+    
     def _init_database(self):
         """Initialize database schema"""
         with self.get_connection() as conn:
@@ -93,15 +133,25 @@ class Database:
                 )
             ''')
             
-            # Audit log table
+            # Scan units table - checkpoints for resumable scans
             cursor.execute('''
-                CREATE TABLE IF NOT EXISTS audit_log (
+                CREATE TABLE IF NOT EXISTS scan_units (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    action TEXT NOT NULL,
-                    details TEXT,
-                    user TEXT,
-                    scan_id TEXT
+                    scan_id TEXT NOT NULL,
+                    unit TEXT NOT NULL,
+                    target TEXT,
+                    status TEXT NOT NULL,
+                    attempts INTEGER DEFAULT 0,
+                    timeout_seconds REAL,
+                    duration_seconds REAL,
+                    passed_checks INTEGER DEFAULT 0,
+                    failed_checks INTEGER DEFAULT 0,
+                    skipped_checks INTEGER DEFAULT 0,
+                    started_at DATETIME,
+                    finished_at DATETIME,
+                    error TEXT,
+                    UNIQUE (scan_id, unit),
+                    FOREIGN KEY (scan_id) REFERENCES scans(scan_id)
                 )
             ''')
             
@@ -110,19 +160,339 @@ class Database:
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_violations_severity ON violations(severity)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_scans_timestamp ON scans(timestamp)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_resources_scan_id ON resources(scan_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_violations_scan_severity ON violations(scan_id, severity)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_violations_timestamp ON violations(timestamp)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_scan_units_history ON scan_units(unit, status, finished_at)')
+            
+            # Per-resource posture index columns (added after the first release)
+            self._ensure_columns(cursor, 'resources', {
+                'max_severity': 'TEXT',
+                'severity_rank': 'INTEGER DEFAULT -1'
+            })
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_resources_risk
+                ON resources(scan_id, severity_rank DESC, violation_count DESC)
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_resources_name ON resources(resource_name)')
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_violations_fingerprint '
+                'ON violations(scan_id, check_id, resource_name, file_path)'
+            )
+            
+            # Profile artifacts of scans run with --profile / SCAN_PROFILE
+            self._ensure_columns(cursor, 'scans', {'profile_path': 'TEXT'})
+            
+            # Scan kind: 'full' (Checkov), 'fast' (native pre-check rules), 'plan'
+            # (native rules on a plan file) or 'reingest' (an archived report parsed
+            # again); only full scans stand for a branch's posture
+            self._ensure_columns(cursor, 'scans', {'kind': "TEXT NOT NULL DEFAULT 'full'"})
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_scans_kind ON scans(kind, status, timestamp)')
+            
+            # Update sequence of violation rows changed after ingest (remediation),
+            # streamed by get_violation_changes next to the id-keyed inserts
+            self._ensure_columns(cursor, 'violations', {'updated_seq': 'INTEGER'})
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_violations_updated_seq ON violations(updated_seq)')
+            
+            self._init_projects(cursor)
+            self._init_lifecycle(cursor)
+            
+            # Audit log: monthly partitions written in batches (see audit.py)
+            self.audit.migrate_legacy(conn)
+            self.fts_enabled = self._init_search_index(cursor)
+    
+    @staticmethod
+    def _ensure_columns(cursor, table: str, columns: Dict[str, str]):
+        """Add columns missing from an existing table"""
+        cursor.execute(f'PRAGMA table_info({table})')
+        existing = {row[1] for row in cursor.fetchall()}
+        for name, definition in columns.items():
+            if name not in existing:
+                cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {definition}')
+    
+    def _init_projects(self, cursor):
+        """Project (repository) dimension and the cross-project rollups
+        
+        Scans, violations and resources carry their project and the
+        per-project indexes lead with it, so a project-scoped query only
+        touches that project's rows. Totals across projects live in
+        project_rollups, updated as results are stored, instead of being
+        recomputed from every project's violations.
+        """
+        for table in ('scans', 'violations', 'resources'):
+            self._ensure_columns(cursor, table, {'project': "TEXT NOT NULL DEFAULT 'default'"})
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_scans_project ON scans(project, timestamp)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_violations_project_severity ON violations(project, severity)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_violations_project_timestamp ON violations(project, timestamp)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_resources_project_name ON resources(project, resource_name)')
+        
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name='project_rollups'"
+        )
+        exists = cursor.fetchone() is not None
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS project_rollups (
+                project TEXT PRIMARY KEY,
+                scan_count INTEGER DEFAULT 0,
+                violation_count INTEGER DEFAULT 0,
+                critical_count INTEGER DEFAULT 0,
+                high_count INTEGER DEFAULT 0,
+                medium_count INTEGER DEFAULT 0,
+                low_count INTEGER DEFAULT 0,
+                last_scan_id TEXT,
+                last_status TEXT,
+                last_failed_checks INTEGER,
+                last_blocked BOOLEAN,
+                last_scan_at DATETIME
+            )
+        ''')
+        if exists:
+            return
+        
+        # Roll up results stored before the table existed
+        cursor.execute('''
+            INSERT INTO project_rollups
+            (project, scan_count, last_scan_id, last_status, last_failed_checks,
+             last_blocked, last_scan_at)
+            SELECT s.project, c.scan_count, s.scan_id, s.status, s.failed_checks,
+                   s.blocked_deployment, s.timestamp
+            FROM scans s
+            JOIN (SELECT project, COUNT(*) AS scan_count, MAX(id) AS last_id
+                  FROM scans GROUP BY project) c ON s.id = c.last_id
+        ''')
+        cursor.execute('SELECT project, severity, COUNT(*) FROM violations GROUP BY project, severity')
+        for project, severity, count in cursor.fetchall():
+            self._roll_up_violations(cursor, project, {severity: count})
+    
+    @staticmethod
+    def _roll_up_violations(conn, project: str, by_severity: Dict[str, int]):
+        """Add newly stored violations to their project's rollup"""
+        conn.execute('''
+            INSERT INTO project_rollups
+            (project, violation_count, critical_count, high_count, medium_count, low_count)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (project) DO UPDATE SET
+                violation_count = violation_count + excluded.violation_count,
+                critical_count = critical_count + excluded.critical_count,
+                high_count = high_count + excluded.high_count,
+                medium_count = medium_count + excluded.medium_count,
+                low_count = low_count + excluded.low_count
+        ''', (project, sum(by_severity.values()), by_severity.get('CRITICAL', 0),
+              by_severity.get('HIGH', 0), by_severity.get('MEDIUM', 0), by_severity.get('LOW', 0)))
+    
+    @staticmethod
+    def _scan_project(conn, scan_id: str) -> str:
+        """Project a scan was filed under"""
+        row = conn.execute('SELECT project FROM scans WHERE scan_id = ?', (scan_id,)).fetchone()
+        return row[0] if row else 'default'
+    
+    def _init_lifecycle(self, cursor):
+        """Per-finding lifecycle: first seen, last seen and fixed-at per branch
+        
+        A finding is identified by (project, branch, check, resource, file),
+        the same fingerprint the scan diff uses, and belongs to the target
+        (Terraform directory) of the scan that last saw it. Rows are updated
+        when a full scan completes (see record_lifecycle), so remediation
+        metrics read this table instead of comparing scans pairwise.
+        """
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name='violation_lifecycle'"
+        )
+        exists = cursor.fetchone() is not None
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS violation_lifecycle (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                project TEXT NOT NULL,
+                branch TEXT NOT NULL DEFAULT '',
+                check_id TEXT NOT NULL,
+                resource_name TEXT NOT NULL DEFAULT '',
+                file_path TEXT NOT NULL DEFAULT '',
+                severity TEXT,
+                first_seen DATETIME NOT NULL,
+                first_scan_id TEXT NOT NULL,
+                last_seen DATETIME NOT NULL,
+                last_scan_id TEXT NOT NULL,
+                fixed_at DATETIME,
+                fixed_scan_id TEXT,
+                reopen_count INTEGER DEFAULT 0,
+                target TEXT NOT NULL DEFAULT '',
+                UNIQUE (project, branch, check_id, resource_name, file_path)
+            )
+        ''')
+        cursor.execute('PRAGMA table_info(violation_lifecycle)')
+        if 'target' not in {row[1] for row in cursor.fetchall()}:
+            # Findings tracked before targets: take the target of the scan that last saw them
+            cursor.execute("ALTER TABLE violation_lifecycle ADD COLUMN target TEXT NOT NULL DEFAULT ''")
+            cursor.execute('''
+                UPDATE violation_lifecycle SET target = COALESCE(
+                    (SELECT MIN(u.target) FROM scan_units u WHERE u.scan_id = last_scan_id), '')
+            ''')
+        cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_lifecycle_branch ON violation_lifecycle(project, branch, fixed_at)'
+        )
+        cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_lifecycle_fixed ON violation_lifecycle(project, fixed_at)'
+        )
+        cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_lifecycle_target '
+            'ON violation_lifecycle(project, branch, target, fixed_at)'
+        )
+        if exists:
+            return
+        
+        # Replay scans completed before the table existed, oldest first
+        cursor.execute("SELECT scan_id FROM scans WHERE status = 'completed' AND kind = 'full' ORDER BY id")
+        for (scan_id,) in cursor.fetchall():
+            self._record_lifecycle(cursor, scan_id)
+    
+    @staticmethod
+    def _record_lifecycle(conn, scan_id: str) -> Dict[str, int]:
+        """Fold one completed scan into violation_lifecycle
+        
+        Findings in the scan are opened (or reopened) and stamped last seen;
+        open findings on the same project, branch and target (the directory
+        its units scanned, '' for an ingested report) that the scan no longer
+        reports are marked fixed, and their last violation rows remediated.
+        A scan of a subdirectory therefore leaves the rest of the tree alone.
+        Cost is proportional to the scan's findings plus the branch's open ones.
+        """
+        row = conn.execute('''
+            SELECT project, COALESCE(branch, ''), timestamp,
+                   COALESCE((SELECT MIN(target) FROM scan_units WHERE scan_id = scans.scan_id), '')
+            FROM scans WHERE scan_id = ?
+        ''', (scan_id,)).fetchone()
+        if row is None:
+            return {'seen': 0, 'fixed': 0}
+        project, branch, seen_at, target = row
+        
+        seen = conn.execute('''
+            INSERT INTO violation_lifecycle
+            (project, branch, check_id, resource_name, file_path, severity,
+             first_seen, first_scan_id, last_seen, last_scan_id, target)
+            SELECT ?, ?, check_id, COALESCE(resource_name, ''), COALESCE(file_path, ''),
+                   severity, ?, ?, ?, ?, ?
+            FROM violations
+            WHERE scan_id = ?
+            GROUP BY check_id, resource_name, file_path
+            ON CONFLICT (project, branch, check_id, resource_name, file_path) DO UPDATE SET
+                severity = excluded.severity,
+                first_seen = CASE WHEN fixed_at IS NULL THEN first_seen ELSE excluded.first_seen END,
+                first_scan_id = CASE WHEN fixed_at IS NULL THEN first_scan_id
+                                     ELSE excluded.first_scan_id END,
+                reopen_count = reopen_count + (fixed_at IS NOT NULL),
+                last_seen = excluded.last_seen,
+                last_scan_id = excluded.last_scan_id,
+                fixed_at = NULL,
+                fixed_scan_id = NULL,
+                target = excluded.target
+        ''', (project, branch, seen_at, scan_id, seen_at, scan_id, target, scan_id)).rowcount
+        
+        fixed = conn.execute('''
+            SELECT last_scan_id, check_id, resource_name, file_path
+            FROM violation_lifecycle
+            WHERE project = ? AND branch = ? AND target = ? AND last_scan_id != ?
+              AND fixed_at IS NULL
+        ''', (project, branch, target, scan_id)).fetchall()
+        if fixed:
+            conn.execute('''
+                UPDATE violation_lifecycle SET fixed_at = ?, fixed_scan_id = ?
+                WHERE project = ? AND branch = ? AND target = ? AND last_scan_id != ?
+                  AND fixed_at IS NULL
+            ''', (seen_at, scan_id, project, branch, target, scan_id))
+            # One update sequence value per sweep; writers are serialized, so it
+            # grows in commit order like the violation ids
+            update_seq = conn.execute(
+                'SELECT COALESCE(MAX(updated_seq), 0) + 1 FROM violations').fetchone()[0]
+            conn.executemany('''
+                UPDATE violations SET remediated = 1, remediation_date = ?, updated_seq = ?
+                WHERE scan_id = ? AND check_id = ?
+                  AND COALESCE(resource_name, '') = ? AND COALESCE(file_path, '') = ?
+            ''', ((seen_at, update_seq) + tuple(finding) for finding in fixed))
+        
+        return {'seen': seen, 'fixed': len(fixed)}
+    
+    def _init_search_index(self, cursor) -> bool:
+        """Create the FTS5 violation search index and its sync triggers
+        
+        The index is an external-content table over violations, so text is
+        stored once and the triggers keep it current on every insert,
+        update and delete. Returns False if SQLite lacks FTS5.
+        """
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name='violations_fts'"
+        )
+        exists = cursor.fetchone() is not None
+        
+        try:
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS violations_fts USING fts5(
+                    check_name, resource_name, file_path, description,
+                    content='violations', content_rowid='id'
+                )
+            ''')
+        except sqlite3.OperationalError:
+            return False
+        
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS violations_fts_insert AFTER INSERT ON violations
+            BEGIN
+                INSERT INTO violations_fts (rowid, check_name, resource_name, file_path, description)
+                VALUES (new.id, new.check_name, new.resource_name, new.file_path, new.description);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS violations_fts_delete AFTER DELETE ON violations
+            BEGIN
+                INSERT INTO violations_fts (violations_fts, rowid, check_name, resource_name, file_path, description)
+                VALUES ('delete', old.id, old.check_name, old.resource_name, old.file_path, old.description);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS violations_fts_update
+            AFTER UPDATE OF check_name, resource_name, file_path, description ON violations
+            BEGIN
+                INSERT INTO violations_fts (violations_fts, rowid, check_name, resource_name, file_path, description)
+                VALUES ('delete', old.id, old.check_name, old.resource_name, old.file_path, old.description);
+                INSERT INTO violations_fts (rowid, check_name, resource_name, file_path, description)
+                VALUES (new.id, new.check_name, new.resource_name, new.file_path, new.description);
+            END
+        ''')
+        
+        # Index violations stored before the search index existed
+        if not exists:
+            cursor.execute("INSERT INTO violations_fts (violations_fts) VALUES ('rebuild')")
+        
+        return True
     
     def create_scan(self, scan_id: str, commit_hash: str = None, 
-                    branch: str = None, triggered_by: str = None) -> str:
-        """Create a new scan record"""
+                    branch: str = None, triggered_by: str = None,
+                    project: str = None, kind: str = 'full') -> str:
+        """Create a new scan record under project (default: Config.SCAN_PROJECT)
+        
+        Only full scans become the project's last scan in its rollup.
+        """
+        project = project or Config.SCAN_PROJECT
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                INSERT INTO scans (scan_id, status, commit_hash, branch, triggered_by)
-                VALUES (?, 'running', ?, ?, ?)
-            ''', (scan_id, commit_hash, branch, triggered_by))
-            
-            self._log_audit(conn, 'SCAN_STARTED', f'Scan {scan_id} started', scan_id=scan_id)
+                INSERT INTO scans (scan_id, status, commit_hash, branch, triggered_by, project, kind)
+                VALUES (?, 'running', ?, ?, ?, ?, ?)
+            ''', (scan_id, commit_hash, branch, triggered_by, project, kind))
+            if kind != 'full':
+                cursor.execute('''
+                    INSERT INTO project_rollups (project, scan_count) VALUES (?, 1)
+                    ON CONFLICT (project) DO UPDATE SET scan_count = scan_count + 1
+                ''', (project,))
+            else:
+                cursor.execute('''
+                    INSERT INTO project_rollups (project, scan_count, last_scan_id, last_status, last_scan_at)
+                    VALUES (?, 1, ?, 'running', CURRENT_TIMESTAMP)
+                    ON CONFLICT (project) DO UPDATE SET
+                        scan_count = scan_count + 1, last_scan_id = excluded.last_scan_id,
+                        last_status = 'running', last_failed_checks = NULL, last_blocked = NULL,
+                        last_scan_at = excluded.last_scan_at
+                ''', (project, scan_id))
         
+        self.audit.log('SCAN_STARTED', f'Scan {scan_id} started', scan_id=scan_id)
         return scan_id
     
     def update_scan(self, scan_id: str, status: str, total_checks: int,
@@ -139,56 +509,82 @@ class Database:
                 WHERE scan_id = ?
             ''', (status, total_checks, passed_checks, failed_checks, 
                   skipped_checks, duration_seconds, blocked_deployment, scan_id))
-            
-            action = 'SCAN_COMPLETED' if status == 'completed' else 'SCAN_FAILED'
-            self._log_audit(conn, action, 
-                          f'Scan {scan_id}: {passed_checks} passed, {failed_checks} failed',
-                          scan_id=scan_id)
+            cursor.execute('''
+                UPDATE project_rollups
+                SET last_status = ?, last_failed_checks = ?, last_blocked = ?
+                WHERE last_scan_id = ?
+            ''', (status, failed_checks, blocked_deployment, scan_id))
+        
+        # Logged once the update is committed; written off this path in batches
+        action = {'completed': 'SCAN_COMPLETED',
+                  'incomplete': 'SCAN_INCOMPLETE',
+                  'gated': 'SCAN_GATED'}.get(status, 'SCAN_FAILED')
+        self.audit.log(action, f'Scan {scan_id}: {passed_checks} passed, {failed_checks} failed',
+                       scan_id=scan_id)
+    
+    def set_scan_kind(self, scan_id: str, kind: str):
+        """Re-file a scan as another kind (e.g. 'fast' once the pre-check decided it)"""
+        with self.get_connection() as conn:
+            conn.execute('UPDATE scans SET kind = ? WHERE scan_id = ?', (kind, scan_id))
+    
+    def set_scan_profile(self, scan_id: str, profile_path: str):
+        """Link a scan to its profile artifact directory"""
+        with self.get_connection() as conn:
+            conn.execute('UPDATE scans SET profile_path = ? WHERE scan_id = ?',
+                         (profile_path, scan_id))
+    
+    def record_lifecycle(self, scan_id: str) -> Dict[str, int]:
+        """Update the violation lifecycle from a completed full scan
+        
+        Only call this for scans that ran every check: findings missing from
+        a partial scan (fast lane, plan, incomplete) would be marked fixed.
+        Returns {'seen': findings in the scan, 'fixed': findings it resolved}.
+        """
+        with self.get_connection() as conn:
+            return self._record_lifecycle(conn, scan_id)
     
     def add_violation(self, scan_id: str, violation: Dict[str, Any]):
         """Add a violation record"""
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO violations 
-                (scan_id, check_id, check_name, severity, resource_type,
-                 resource_name, file_path, file_line, guideline, description)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                scan_id,
-                violation.get('check_id', ''),
-                violation.get('check_name', ''),
-                violation.get('severity', 'MEDIUM'),
-                violation.get('resource_type', ''),
-                violation.get('resource_name', ''),
-                violation.get('file_path', ''),
-                violation.get('file_line', 0),
-                violation.get('guideline', ''),
-                violation.get('description', '')
-            ))
+            self._insert_violations(conn, scan_id, [violation])
     
     def add_violations_batch(self, scan_id: str, violations: List[Dict[str, Any]]):
         """Add multiple violations in a batch"""
         with self.get_connection() as conn:
-            cursor = conn.cursor()
+            self._insert_violations(conn, scan_id, violations)
+    
+    @staticmethod
+    def _insert_violations(conn, scan_id: str, violations: Iterable[Dict[str, Any]]):
+        """Bulk-insert violations on an open connection and add them to the rollup"""
+        project = Database._scan_project(conn, scan_id)
+        by_severity: Dict[str, int] = {}
+        
+        def rows():
             for violation in violations:
-                cursor.execute('''
-                    INSERT INTO violations 
-                    (scan_id, check_id, check_name, severity, resource_type,
-                     resource_name, file_path, file_line, guideline, description)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
+                severity = violation.get('severity', 'MEDIUM')
+                by_severity[severity] = by_severity.get(severity, 0) + 1
+                yield (
                     scan_id,
+                    project,
                     violation.get('check_id', ''),
                     violation.get('check_name', ''),
-                    violation.get('severity', 'MEDIUM'),
+                    severity,
                     violation.get('resource_type', ''),
                     violation.get('resource_name', ''),
                     violation.get('file_path', ''),
                     violation.get('file_line', 0),
                     violation.get('guideline', ''),
                     violation.get('description', '')
-                ))
+                )
+        
+        conn.executemany('''
+            INSERT INTO violations 
+            (scan_id, project, check_id, check_name, severity, resource_type,
+             resource_name, file_path, file_line, guideline, description)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows())
+        if by_severity:
+            Database._roll_up_violations(conn, project, by_severity)
     
     def add_resource(self, scan_id: str, resource: Dict[str, Any]):
         """Add a scanned resource record"""
@@ -196,11 +592,12 @@ class Database:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO resources 
-                (scan_id, resource_type, resource_name, file_path, 
+                (scan_id, project, resource_type, resource_name, file_path, 
                  security_status, check_count, violation_count)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             ''', (
                 scan_id,
+                self._scan_project(conn, scan_id),
                 resource.get('resource_type', ''),
                 resource.get('resource_name', ''),
                 resource.get('file_path', ''),
@@ -209,6 +606,161 @@ class Database:
                 resource.get('violation_count', 0)
             ))
     
+    def add_resources_batch(self, scan_id: str, resources: Iterable[Dict[str, Any]]):
+        """Bulk-write per-resource aggregates for a scan"""
+        with self.get_connection() as conn:
+            self._insert_resources(conn, scan_id, resources)
+    
+    @staticmethod
+    def _insert_resources(conn, scan_id: str, resources: Iterable[Dict[str, Any]]):
+        """Bulk-insert resource aggregates on an open connection"""
+        levels = Config.SEVERITY_LEVELS
+        project = Database._scan_project(conn, scan_id)
+        conn.executemany('''
+            INSERT INTO resources
+            (scan_id, project, resource_type, resource_name, file_path, security_status,
+             check_count, violation_count, max_severity, severity_rank)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            (
+                scan_id,
+                project,
+                resource.get('resource_type', ''),
+                resource.get('resource_name', ''),
+                resource.get('file_path', ''),
+                'failed' if resource.get('violation_count') else 'passed',
+                resource.get('check_count', 0),
+                resource.get('violation_count', 0),
+                resource.get('max_severity'),
+                levels.get(resource.get('max_severity'), -1)
+            )
+            for resource in resources
+        ))
+    
+    def start_scan_unit(self, scan_id: str, unit: str, target: str, timeout_seconds: float):
+        """Checkpoint: mark a scan unit as running (creating it on first attempt)"""
+        with self.get_connection() as conn:
+            conn.execute('''
+                INSERT INTO scan_units
+                (scan_id, unit, target, status, attempts, timeout_seconds, started_at)
+                VALUES (?, ?, ?, 'running', 1, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT (scan_id, unit) DO UPDATE SET
+                    status = 'running', attempts = attempts + 1, error = NULL,
+                    timeout_seconds = excluded.timeout_seconds,
+                    started_at = CURRENT_TIMESTAMP, finished_at = NULL
+            ''', (scan_id, unit, target, timeout_seconds))
+    
+    def complete_scan_unit(self, scan_id: str, unit: str, summary: Dict[str, int],
+                           violations: Iterable[Dict[str, Any]],
+                           resources: Iterable[Dict[str, Any]], duration_seconds: float):
+        """Checkpoint: store a unit's results and mark it completed
+        
+        Violations, resources and the unit status are written in one
+        transaction, so a crash never leaves a half-stored unit behind.
+        """
+        with self.get_connection() as conn:
+            self._insert_violations(conn, scan_id, violations)
+            self._insert_resources(conn, scan_id, resources)
+            conn.execute('''
+                UPDATE scan_units
+                SET status = 'completed', duration_seconds = ?, passed_checks = ?,
+                    failed_checks = ?, skipped_checks = ?, finished_at = CURRENT_TIMESTAMP
+                WHERE scan_id = ? AND unit = ?
+            ''', (duration_seconds, summary['passed'], summary['failed'],
+                  summary['skipped'], scan_id, unit))
+    
+    def fail_scan_unit(self, scan_id: str, unit: str, status: str,
+                       duration_seconds: float, error: str = None):
+        """Checkpoint: mark a unit as 'timeout' or 'failed'"""
+        with self.get_connection() as conn:
+            conn.execute('''
+                UPDATE scan_units
+                SET status = ?, duration_seconds = ?, error = ?, finished_at = CURRENT_TIMESTAMP
+                WHERE scan_id = ? AND unit = ?
+            ''', (status, duration_seconds, error, scan_id, unit))
+    
+    def get_scan_units(self, scan_id: str) -> List[Dict]:
+        """Checkpoint state of every unit in a scan"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT * FROM scan_units WHERE scan_id = ? ORDER BY id', (scan_id,)
+            )
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def get_unit_durations(self, unit: str, limit: int = 20) -> List[float]:
+        """Recent successful run times of a unit, newest first"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT duration_seconds FROM scan_units
+                WHERE unit = ? AND status = 'completed' AND duration_seconds IS NOT NULL
+                ORDER BY finished_at DESC
+                LIMIT ?
+            ''', (unit, limit))
+            return [row[0] for row in cursor.fetchall()]
+    
+    def reopen_scan(self, scan_id: str):
+        """Put a timed-out or crashed scan back into 'running' for a resume"""
+        with self.get_connection() as conn:
+            conn.execute("UPDATE scans SET status = 'running' WHERE scan_id = ?", (scan_id,))
+        self.audit.log('SCAN_RESUMED', f'Scan {scan_id} resumed', scan_id=scan_id)
+    
+    def _latest_scan_id(self, conn, project: str = None) -> Optional[str]:
+        """Most recent completed full scan (of a project, if given)"""
+        sql = "SELECT scan_id FROM scans WHERE status = 'completed' AND kind = 'full'"
+        params: List[Any] = []
+        if project:
+            sql += ' AND project = ?'
+            params.append(project)
+        cursor = conn.cursor()
+        cursor.execute(sql + ' ORDER BY timestamp DESC, id DESC LIMIT 1', params)
+        row = cursor.fetchone()
+        return row['scan_id'] if row else None
+    
+    def get_riskiest_resources(self, scan_id: str = None, limit: int = 10,
+                               project: str = None) -> Dict[str, Any]:
+        """Top-N resources by max severity, then violation count, for a scan
+        
+        Defaults to the latest completed full scan (of project, if given).
+        """
+        with self.get_read_connection() as conn:
+            scan_id = scan_id or self._latest_scan_id(conn, project)
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT resource_type, resource_name, file_path, security_status,
+                       check_count, violation_count, max_severity
+                FROM resources
+                WHERE scan_id = ?
+                ORDER BY severity_rank DESC, violation_count DESC
+                LIMIT ?
+            ''', (scan_id, limit))
+            return {'scan_id': scan_id,
+                    'resources': [dict(row) for row in cursor.fetchall()]}
+    
+    def get_resource_history(self, resource_name: str, limit: int = 50,
+                             project: str = None) -> List[Dict]:
+        """Posture of one resource across scans, newest first"""
+        sql = '''
+            SELECT r.scan_id, r.project, s.timestamp, s.branch, s.commit_hash,
+                   r.file_path, r.security_status, r.check_count,
+                   r.violation_count, r.max_severity
+            FROM resources r
+            JOIN scans s ON s.scan_id = r.scan_id
+            WHERE r.resource_name = ?
+        '''
+        params: List[Any] = [resource_name]
+        if project:
+            sql += ' AND r.project = ?'
+            params.append(project)
+        sql += ' ORDER BY s.timestamp DESC, s.id DESC LIMIT ?'
+        params.append(limit)
+        
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            return [dict(row) for row in cursor.fetchall()]
+    
     def get_scan(self, scan_id: str) -> Optional[Dict]:
         """Get scan details by ID"""
         with self.get_connection() as conn:
@@ -233,14 +785,136 @@ class Database:
                 )
             return [dict(row) for row in cursor.fetchall()]
     
-    def get_recent_scans(self, limit: int = 10) -> List[Dict]:
-        """Get recent scans"""
+    def _iter_query(self, sql: str, params: List[Any],
+                    chunk_size: int = 1000) -> Iterator[List[Dict]]:
+        """Run a read query and yield its rows in fetchmany() chunks"""
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [dict(row) for row in rows]
+    
+    def _iter_keyset(self, table: str, where: str, params: List[Any], after_id: int = 0,
+                     chunk_size: int = 1000, limit: Optional[int] = None,
+                     columns: str = '*') -> Iterator[List[Dict]]:
+        """Yield a table's rows in id order, one short query per chunk
+        
+        Unlike _iter_query no read stays open between chunks, so a slow
+        consumer (an export client) never holds the SHARED lock that blocks
+        scan ingestion while it downloads. where is appended to 'id > ?'.
+        """
+        last_id = after_id
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            with self.get_read_connection() as conn:
+                rows = [dict(row) for row in conn.execute(
+                    f'SELECT {columns} FROM {table} WHERE id > ?{where} ORDER BY id LIMIT ?',
+                    [last_id] + params + [size]).fetchall()]
+            if not rows:
+                break
+            yield rows
+            if len(rows) < size:
+                break
+            last_id = rows[-1]['id']
+            if remaining is not None:
+                remaining -= len(rows)
+    
+    def iter_violations(self, scan_id: str, severity: str = None,
+                        chunk_size: int = 1000) -> Iterator[List[Dict]]:
+        """Yield a scan's violations in chunks instead of loading them all"""
+        sql = 'SELECT * FROM violations WHERE scan_id = ?'
+        params: List[Any] = [scan_id]
+        if severity:
+            sql += ' AND severity = ?'
+            params.append(severity)
+        sql += ' ORDER BY check_id, resource_name'
+        
+        return self._iter_query(sql, params, chunk_size)
+    
+    @staticmethod
+    def _diff_query(select: str) -> str:
+        """Violations in one scan with no matching finding in another
+        
+        Findings match on check, resource and file. Parameters are
+        (scan_id, other_scan_id).
+        """
+        return f'''
+            SELECT {select} FROM violations v
+            WHERE v.scan_id = ?
+              AND NOT EXISTS (
+                  SELECT 1 FROM violations o
+                  WHERE o.scan_id = ?
+                    AND o.check_id = v.check_id
+                    AND o.resource_name IS v.resource_name
+                    AND o.file_path IS v.file_path
+              )
+        '''
+    
+    def get_diff_summary(self, base_scan_id: str, head_scan_id: str) -> Dict[str, Dict[str, int]]:
+        """Count new and fixed violations by severity between two scans"""
+        query = self._diff_query('v.severity, COUNT(*) AS count') + ' GROUP BY v.severity'
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, (head_scan_id, base_scan_id))
+            new = {row['severity']: row['count'] for row in cursor.fetchall()}
+            cursor.execute(query, (base_scan_id, head_scan_id))
+            fixed = {row['severity']: row['count'] for row in cursor.fetchall()}
+        return {'new': new, 'fixed': fixed}
+    
+    def iter_violation_diff(self, base_scan_id: str, head_scan_id: str,
+                            kind: str = 'new', severity: str = None,
+                            chunk_size: int = 1000) -> Iterator[List[Dict]]:
+        """Yield violations new in head ('new') or gone from it ('fixed'), in chunks"""
+        if kind == 'new':
+            params: List[Any] = [head_scan_id, base_scan_id]
+        elif kind == 'fixed':
+            params = [base_scan_id, head_scan_id]
+        else:
+            raise ValueError(f"kind must be 'new' or 'fixed', not {kind!r}")
+        
+        sql = self._diff_query('v.*')
+        if severity:
+            sql += ' AND v.severity = ?'
+            params.append(severity)
+        sql += ' ORDER BY v.check_id, v.resource_name'
+        
+        return self._iter_query(sql, params, chunk_size)
+    
+    def iter_scans(self, limit: Optional[int] = None, chunk_size: int = 1000,
+                   project: str = None, kind: str = None) -> Iterator[List[Dict]]:
+        """Yield scans newest first (of one project / kind, if given), in chunks"""
+        sql = 'SELECT * FROM scans WHERE 1 = 1'
+        params: List[Any] = []
+        if project:
+            sql += ' AND project = ?'
+            params.append(project)
+        if kind:
+            sql += ' AND kind = ?'
+            params.append(kind)
+        sql += ' ORDER BY timestamp DESC'
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return self._iter_query(sql, params, chunk_size)
+    
+    def get_recent_scans(self, limit: int = 10, project: str = None,
+                         kind: str = None) -> List[Dict]:
+        """Get recent scans (of one project / kind, if given)"""
+        sql = 'SELECT * FROM scans WHERE 1 = 1'
+        params: List[Any] = []
+        if project:
+            sql += ' AND project = ?'
+            params.append(project)
+        if kind:
+            sql += ' AND kind = ?'
+            params.append(kind)
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(
-                'SELECT * FROM scans ORDER BY timestamp DESC LIMIT ?',
-                (limit,)
-            )
+            cursor.execute(sql + ' ORDER BY timestamp DESC LIMIT ?', params + [limit])
             return [dict(row) for row in cursor.fetchall()]
     
     def get_violation_summary(self, scan_id: str) -> Dict[str, int]:
@@ -255,29 +929,71 @@ class Database:
             ''', (scan_id,))
             return {row['severity']: row['count'] for row in cursor.fetchall()}
     
-    def get_statistics(self) -> Dict[str, Any]:
-        """Get overall statistics"""
+    def iter_export(self, table: str, after_id: int = 0, since: str = None,
+                    until: str = None, scan_id: str = None, severity: str = None,
+                    limit: Optional[int] = None, chunk_size: int = 5000,
+                    project: str = None, kind: str = None) -> Iterator[List[Dict]]:
+        """Yield scans or violations in id order for bulk export
+        
+        Rows come back ordered by id, so a client that stopped part way
+        resumes by passing the last id it received as after_id.
+        """
+        if table not in ('scans', 'violations'):
+            raise ValueError(f"Cannot export table: {table}")
+        
+        where = ''
+        params: List[Any] = []
+        if project:
+            where += ' AND project = ?'
+            params.append(project)
+        if since:
+            where += ' AND timestamp >= ?'
+            params.append(since)
+        if until:
+            where += ' AND timestamp < ?'
+            params.append(until)
+        if scan_id:
+            where += ' AND scan_id = ?'
+            params.append(scan_id)
+        if severity:
+            if table != 'violations':
+                raise ValueError('severity filter applies to violations only')
+            where += ' AND severity = ?'
+            params.append(severity)
+        if kind:
+            if table != 'scans':
+                raise ValueError('kind filter applies to scans only')
+            where += ' AND kind = ?'
+            params.append(kind)
+        
+        return self._iter_keyset(table, where, params, after_id or 0, chunk_size, limit)
+    
+    def get_statistics(self, project: str = None) -> Dict[str, Any]:
+        """Get overall statistics (of one project, if given)"""
+        where, params = ('WHERE project = ?', (project,)) if project else ('', ())
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
             # Total scans
-            cursor.execute('SELECT COUNT(*) as count FROM scans')
+            cursor.execute(f'SELECT COUNT(*) as count FROM scans {where}', params)
             total_scans = cursor.fetchone()['count']
             
             # Total violations
-            cursor.execute('SELECT COUNT(*) as count FROM violations')
+            cursor.execute(f'SELECT COUNT(*) as count FROM violations {where}', params)
             total_violations = cursor.fetchone()['count']
             
             # Violations by severity
-            cursor.execute('''
+            cursor.execute(f'''
                 SELECT severity, COUNT(*) as count 
                 FROM violations 
+                {where}
                 GROUP BY severity
-            ''')
+            ''', params)
             by_severity = {row['severity']: row['count'] for row in cursor.fetchall()}
             
             # Blocked deployments
-            cursor.execute('SELECT COUNT(*) as count FROM scans WHERE blocked_deployment = 1')
+            cursor.execute('SELECT COUNT(*) as count FROM scans WHERE blocked_deployment = 1'
+                           + (' AND project = ?' if project else ''), params)
             blocked_deployments = cursor.fetchone()['count']
             
             return {
@@ -287,14 +1003,309 @@ class Database:
                 'blocked_deployments': blocked_deployments
             }
     
-    def _log_audit(self, conn, action: str, details: str, 
-                   user: str = 'system', scan_id: str = None):
-        """Log an audit entry"""
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO audit_log (action, details, user, scan_id)
-            VALUES (?, ?, ?, ?)
-        ''', (action, details, user, scan_id))
+    def get_violation_counts(self, project: str = None) -> Dict[str, Any]:
+        """Dashboard summary: totals by severity and framework plus recent scans
+        
+        Counts are taken at 'cursor' (the highest violation id), so clients
+        can follow get_violation_changes() from there. Served by the
+        analytics backend when one is configured.
+        """
+        if self.analytics:
+            return self.analytics.get_violation_counts(project)
+        
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT COALESCE(MAX(id), 0) FROM violations')
+            head = cursor.fetchone()[0]
+            
+            scope = ' AND project = ?' if project else ''
+            params = (head, project) if project else (head,)
+            
+            cursor.execute(f'''
+                SELECT severity, COUNT(*)
+                FROM violations
+                WHERE id <= ?{scope}
+                GROUP BY severity
+            ''', params)
+            by_severity = dict(cursor.fetchall())
+            total = sum(by_severity.values())
+            
+            try:
+                cursor.execute(f'''
+                    SELECT framework, COUNT(*)
+                    FROM violations
+                    WHERE id <= ?{scope}
+                    GROUP BY framework
+                ''', params)
+                by_framework = dict(cursor.fetchall())
+            except sqlite3.OperationalError:
+                # No framework column yet: everything is Terraform
+                by_framework = {'terraform': total}
+            
+            cursor.execute(f'''
+                SELECT COUNT(DISTINCT scan_id)
+                FROM violations
+                WHERE timestamp > datetime('now', '-7 days'){scope}
+            ''', params[1:])
+            recent_scans = cursor.fetchone()[0] if total else 0
+            
+            return {
+                'cursor': head,
+                'total': total,
+                'by_severity': by_severity,
+                'by_framework': by_framework,
+                'recent_scans': recent_scans
+            }
+    
+    def get_violation_trends(self, days: int = 7, project: str = None) -> List[Dict]:
+        """Violations per day over the last `days` days"""
+        if self.analytics:
+            return self.analytics.get_violation_trends(days, project)
+        
+        scope = ' AND project = ?' if project else ''
+        params = (f'-{days}', project) if project else (f'-{days}',)
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT DATE(timestamp) as date, COUNT(*) as count
+                FROM violations
+                WHERE timestamp > datetime('now', ? || ' days'){scope}
+                GROUP BY DATE(timestamp)
+                ORDER BY date
+            ''', params)
+            return [{'date': row[0], 'count': row[1]} for row in cursor.fetchall()]
+    
+    def get_project_rollups(self) -> List[Dict]:
+        """Per-project totals and latest scan, from the rollup table
+        
+        Cost grows with the number of projects, not with their data.
+        """
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM project_rollups ORDER BY project')
+            return [dict(row) for row in cursor.fetchall()]
+    
+    @staticmethod
+    def _lifecycle_scope(project: str = None, branch: str = None):
+        """WHERE conditions and parameters for lifecycle metric queries"""
+        conditions, params = [], []
+        if project:
+            conditions.append('project = ?')
+            params.append(project)
+        if branch is not None:
+            conditions.append('branch = ?')
+            params.append(branch)
+        return conditions, params
+    
+    def get_mttr(self, project: str = None, branch: str = None,
+                 since: str = None) -> Dict[str, Dict[str, Any]]:
+        """Mean time to remediate (hours) per severity, from violation_lifecycle
+        
+        Counts findings fixed at or after `since` (all time by default);
+        open findings are reported alongside for context. A finding that
+        comes back starts a new episode, so only its latest fix counts.
+        """
+        conditions, params = self._lifecycle_scope(project, branch)
+        fixed_conditions = conditions + ['fixed_at IS NOT NULL']
+        fixed_params = list(params)
+        if since:
+            fixed_conditions.append('fixed_at >= ?')
+            fixed_params.append(since)
+        
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT severity, COUNT(*),
+                       AVG(julianday(fixed_at) - julianday(first_seen)) * 24,
+                       MAX(julianday(fixed_at) - julianday(first_seen)) * 24
+                FROM violation_lifecycle
+                WHERE {' AND '.join(fixed_conditions)}
+                GROUP BY severity
+            ''', fixed_params)
+            mttr = {severity: {'fixed': count, 'mttr_hours': round(mean, 1),
+                               'max_hours': round(longest, 1), 'open': 0}
+                    for severity, count, mean, longest in cursor.fetchall()}
+            
+            cursor.execute(f'''
+                SELECT severity, COUNT(*)
+                FROM violation_lifecycle
+                WHERE {' AND '.join(conditions + ['fixed_at IS NULL'])}
+                GROUP BY severity
+            ''', params)
+            for severity, count in cursor.fetchall():
+                mttr.setdefault(severity, {'fixed': 0, 'mttr_hours': None,
+                                           'max_hours': None, 'open': 0})['open'] = count
+            return mttr
+    
+    def get_open_ages(self, project: str = None, branch: str = None) -> Dict[str, Any]:
+        """Open findings per severity bucketed by age since first seen"""
+        conditions, params = self._lifecycle_scope(project, branch)
+        conditions.append('fixed_at IS NULL')
+        cases = ' '.join(f"WHEN age < {days} THEN '{label}'" for label, days in OPEN_AGE_BUCKETS[:-1])
+        
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT severity, CASE {cases} ELSE '{OPEN_AGE_BUCKETS[-1][0]}' END AS bucket,
+                       COUNT(*), MAX(age)
+                FROM (SELECT severity, julianday('now') - julianday(first_seen) AS age
+                      FROM violation_lifecycle
+                      WHERE {' AND '.join(conditions)})
+                GROUP BY severity, bucket
+            ''', params)
+            
+            labels = [label for label, _ in OPEN_AGE_BUCKETS]
+            by_severity: Dict[str, Dict[str, int]] = {}
+            total, oldest = 0, 0.0
+            for severity, bucket, count, age in cursor.fetchall():
+                by_severity.setdefault(severity, dict.fromkeys(labels, 0))[bucket] = count
+                total += count
+                oldest = max(oldest, age)
+            return {'buckets': labels, 'by_severity': by_severity, 'open': total,
+                    'oldest_days': round(oldest, 1)}
+    
+    @staticmethod
+    def _fts_query(query: str) -> str:
+        """Turn free text into an FTS5 query that ANDs each term
+        
+        Terms are quoted so punctuation such as ``public-read`` or ``iam.tf``
+        is matched as a phrase instead of parsed as FTS5 operators. A trailing
+        ``*`` keeps prefix matching.
+        """
+        terms = []
+        for term in query.split():
+            prefix = term.endswith('*')
+            term = term.rstrip('*').replace('"', '""')
+            if term:
+                terms.append(f'"{term}"*' if prefix else f'"{term}"')
+        return ' '.join(terms)
+    
+    def search_violations(self, query: str, severity: str = None,
+                          scan_id: str = None, check_id: str = None,
+                          limit: int = 50, offset: int = 0,
+                          project: str = None) -> Dict[str, Any]:
+        """Full-text search over violations, best matches first"""
+        match = self._fts_query(query)
+        page = {'query': query, 'limit': limit, 'offset': offset,
+                'has_more': False, 'results': []}
+        if not match:
+            return page
+        if not self.fts_enabled:
+            raise RuntimeError('SQLite FTS5 is not available; search is disabled')
+        
+        sql = '''
+            SELECT v.*, bm25(violations_fts) AS rank
+            FROM violations_fts
+            JOIN violations v ON v.id = violations_fts.rowid
+            WHERE violations_fts MATCH ?
+        '''
+        params: List[Any] = [match]
+        if severity:
+            sql += ' AND v.severity = ?'
+            params.append(severity)
+        if scan_id:
+            sql += ' AND v.scan_id = ?'
+            params.append(scan_id)
+        if check_id:
+            sql += ' AND v.check_id = ?'
+            params.append(check_id)
+        if project:
+            sql += ' AND v.project = ?'
+            params.append(project)
+        
+        # Fetch one extra row to know whether another page exists
+        sql += ' ORDER BY rank LIMIT ? OFFSET ?'
+        params.extend([limit + 1, offset])
+        
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            rows = [dict(row) for row in cursor.fetchall()]
+        
+        page['has_more'] = len(rows) > limit
+        page['results'] = rows[:limit]
+        return page
+    
+    def get_update_cursor(self) -> int:
+        """Highest violation update sequence (see get_violation_changes)"""
+        with self.get_read_connection() as conn:
+            return conn.execute('SELECT COALESCE(MAX(updated_seq), 0) FROM violations').fetchone()[0]
+    
+    def get_violation_changes(self, cursor: int = 0, limit: int = 20,
+                              project: str = None, updated_cursor: int = None) -> Dict[str, Any]:
+        """Violations ingested or updated after the cursors, for clients that merge deltas
+        
+        Violations are only ever inserted or marked remediated. Their
+        AUTOINCREMENT id is never reused, and writers commit whole
+        transactions, so the highest id is a monotonic ingest sequence; the
+        delta carries aggregate counts for every new row but only the newest
+        `limit` rows themselves. Rows remediated after ingest get the next
+        updated_seq, a second sequence: with updated_cursor, `updated` holds
+        the newest `limit` rows changed after it (counts are unaffected).
+        `reset` is set when either cursor is ahead of the database (e.g. it
+        was recreated) and the client must reload in full.
+        
+        The cursors are global, so a project-scoped client advances them past
+        other projects' rows too; only its own project's rows are returned.
+        """
+        with self.get_read_connection() as conn:
+            head = conn.execute('SELECT COALESCE(MAX(id), 0) FROM violations').fetchone()[0]
+            update_head = conn.execute(
+                'SELECT COALESCE(MAX(updated_seq), 0) FROM violations').fetchone()[0]
+            changes = {'cursor': head, 'updated_cursor': update_head,
+                       'reset': cursor > head or (updated_cursor or 0) > update_head,
+                       'total': 0, 'by_severity': {}, 'by_framework': {},
+                       'violations': [], 'updated': []}
+            if changes['reset']:
+                return changes
+            
+            if updated_cursor is not None and updated_cursor < update_head:
+                scope = ' AND project = ?' if project else ''
+                params = (updated_cursor, update_head) + ((project,) if project else ())
+                rows = conn.execute(f'''
+                    SELECT * FROM violations
+                    WHERE updated_seq > ? AND updated_seq <= ?{scope}
+                    ORDER BY updated_seq DESC, id DESC LIMIT ?
+                ''', params + (limit,)).fetchall()
+                changes['updated'] = [dict(row) for row in rows]
+            
+            if cursor >= head:
+                return changes
+            
+            # Bound every query by head so they agree even if a scan commits meanwhile
+            where = 'id > ? AND id <= ?'
+            window: tuple = (cursor, head)
+            if project:
+                where += ' AND project = ?'
+                window += (project,)
+            changes['by_severity'] = dict(conn.execute(f'''
+                SELECT severity, COUNT(*) FROM violations
+                WHERE {where}
+                GROUP BY severity
+            ''', window).fetchall())
+            changes['total'] = sum(changes['by_severity'].values())
+            try:
+                changes['by_framework'] = dict(conn.execute(f'''
+                    SELECT framework, COUNT(*) FROM violations
+                    WHERE {where}
+                    GROUP BY framework
+                ''', window).fetchall())
+            except sqlite3.OperationalError:
+                # No framework column; /api/summary counts everything as terraform
+                changes['by_framework'] = {'terraform': changes['total']}
+            
+            rows = conn.execute(f'''
+                SELECT * FROM violations
+                WHERE {where}
+                ORDER BY id DESC LIMIT ?
+            ''', window + (limit,)).fetchall()
+            changes['violations'] = [dict(row) for row in rows]
+        return changes
+    
+    def get_audit_log(self, scan_id: str = None, action: str = None, since: str = None,
+                      until: str = None, limit: int = 100) -> List[Dict]:
+        """Audit events, newest first (see AuditLog.query)"""
+        return self.audit.query(scan_id, action, since, until, limit)
 
 
 # Create singleton instance
@@ -0,0 +1,168 @@
+"""
+CLOUD SENTINEL - Export Module
+Streaming JSON / NDJSON / CSV / Arrow / Parquet serializers for database rows
+"""
+
+import csv
+import io
+import json
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+
+EXPORT_FORMATS = ['json', 'ndjson', 'csv']
+
+# Columnar formats need pyarrow (optional dependency)
+COLUMNAR_FORMATS = ['arrow', 'parquet']
+
+CONTENT_TYPES = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+    'arrow': 'application/vnd.apache.arrow.stream',
+    'parquet': 'application/vnd.apache.parquet'
+}
+
+SCAN_COLUMNS = [
+    'id', 'scan_id', 'timestamp', 'status', 'total_checks', 'passed_checks',
+    'failed_checks', 'skipped_checks', 'commit_hash', 'branch',
+    'triggered_by', 'duration_seconds', 'blocked_deployment', 'project', 'profile_path', 'kind'
+]
+
+VIOLATION_COLUMNS = [
+    'id', 'scan_id', 'check_id', 'check_name', 'severity', 'resource_type',
+    'resource_name', 'file_path', 'file_line', 'guideline', 'description',
+    'timestamp', 'project'
+]
+
+# Non-string columns for the Arrow schema (pyarrow type factories); everything
+# else is a string
+COLUMN_TYPES = {
+    'id': 'int64',
+    'total_checks': 'int64',
+    'passed_checks': 'int64',
+    'failed_checks': 'int64',
+    'skipped_checks': 'int64',
+    'file_line': 'int64',
+    'duration_seconds': 'float64',
+    'blocked_deployment': 'bool_'
+}
+
+# SQLite stores booleans as 0/1, which Arrow won't take for a bool column
+BOOL_COLUMNS = [col for col, arrow_type in COLUMN_TYPES.items() if arrow_type == 'bool_']
+
+
+def iter_rows(chunks: Iterable[List[Dict[str, Any]]]) -> Iterator[Dict[str, Any]]:
+    """Flatten chunked query results (e.g. Database.iter_violations) into rows"""
+    for chunk in chunks:
+        yield from chunk
+
+
+def iter_ndjson(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """One JSON object per line"""
+    for row in rows:
+        yield json.dumps(row, default=str) + '\n'
+
+
+def iter_json(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """A JSON array, emitted element by element"""
+    yield '['
+    first = True
+    for row in rows:
+        yield ('' if first else ',') + '\n' + json.dumps(row, default=str)
+        first = False
+    yield '\n]\n'
+
+
+def iter_csv(rows: Iterable[Dict[str, Any]], columns: Optional[List[str]] = None) -> Iterator[str]:
+    """CSV with a header row; columns default to the first row's keys"""
+    buffer = io.StringIO()
+    writer = None
+    for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=columns or list(row.keys()),
+                                    extrasaction='ignore')
+            writer.writeheader()
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    if writer is None and columns:
+        yield ','.join(columns) + '\r\n'
+
+
+def serialize(rows: Iterable[Dict[str, Any]], fmt: str,
+              columns: Optional[List[str]] = None) -> Iterator[str]:
+    """Stream rows in the requested format"""
+    if fmt == 'ndjson':
+        return iter_ndjson(rows)
+    if fmt == 'json':
+        return iter_json(rows)
+    if fmt == 'csv':
+        return iter_csv(rows, columns)
+    raise ValueError(f"Unsupported format: {fmt} (expected one of {', '.join(EXPORT_FORMATS)})")
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to a generator"""
+    
+    closed = False
+    
+    def __init__(self):
+        self.parts: List[bytes] = []
+    
+    def write(self, data) -> int:
+        self.parts.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self) -> bytes:
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+def iter_columnar(chunks: Iterable[List[Dict[str, Any]]], columns: List[str],
+                  fmt: str = 'arrow') -> Iterator[bytes]:
+    """Stream chunked rows as an Arrow IPC stream or a Parquet file
+    
+    Each chunk becomes one record batch (Arrow) or row group (Parquet) and
+    its bytes are yielded before the next chunk is read. The first yield
+    carries the schema and the first chunk, so a caller can take it before
+    starting a response and turn a failure into an error status.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError(f"{fmt} export requires pyarrow: pip install pyarrow")
+    
+    schema = pa.schema([
+        (col, getattr(pa, COLUMN_TYPES.get(col, 'string'))()) for col in columns
+    ])
+    sink = _ChunkSink()
+    if fmt == 'arrow':
+        writer = pa.ipc.new_stream(sink, schema)
+    elif fmt == 'parquet':
+        writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    else:
+        raise ValueError(f"Unsupported columnar format: {fmt}")
+    
+    bool_columns = [col for col in BOOL_COLUMNS if col in columns]
+    for chunk in chunks:
+        rows = [{col: row.get(col) for col in columns} for row in chunk]
+        for row in rows:
+            for col in bool_columns:
+                if row[col] is not None:
+                    row[col] = bool(row[col])
+        batch = pa.RecordBatch.from_pylist(rows, schema=schema)
+        if fmt == 'arrow':
+            writer.write_batch(batch)
+        else:
+            writer.write_table(pa.Table.from_batches([batch]))
+        data = sink.drain()
+        if data:
+            yield data
+    
+    writer.close()
+    yield sink.drain()
@@ -0,0 +1,140 @@
+"""
+CLOUD SENTINEL - Gate Module
+Deployment gate: blocking policy compiled once, evaluated finding by finding
+"""
+
+import fnmatch
+import re
+from typing import Any, Dict, Iterable, Optional, Pattern
+
+from config import Config
+
+
+def compile_patterns(patterns: Iterable[str]) -> Optional[Pattern]:
+    """Check ID globs ('CKV2_AWS_*') -> one compiled regex, None if there are none"""
+    patterns = [pattern.strip() for pattern in patterns if pattern.strip()]
+    if not patterns:
+        return None
+    return re.compile('|'.join(fnmatch.translate(pattern) for pattern in patterns))
+
+
+def parse_thresholds(spec: str) -> Dict[str, int]:
+    """'CRITICAL=1,HIGH=3' -> {'CRITICAL': 1, 'HIGH': 3}"""
+    thresholds = {}
+    for item in spec.split(','):
+        if not item.strip():
+            continue
+        severity, _, count = item.partition('=')
+        try:
+            thresholds[severity.strip().upper()] = int(count)
+        except ValueError:
+            raise ValueError(f"Invalid gate threshold: {item!r} (expected SEVERITY=COUNT)")
+    return thresholds
+
+
+def parse_resource_thresholds(spec: str) -> Dict[str, Dict[str, int]]:
+    """'aws_s3_bucket:MEDIUM=1;aws_iam_policy:HIGH=1,LOW=5' -> {type: thresholds}"""
+    thresholds = {}
+    for item in spec.split(';'):
+        if not item.strip():
+            continue
+        resource_type, _, severities = item.partition(':')
+        thresholds[resource_type.strip()] = parse_thresholds(severities)
+    return thresholds
+
+
+class Gate:
+    """Blocking policy for deployments
+    
+    A scan is blocked as soon as one of its findings fails a denied check,
+    or the findings of a severity reach that severity's threshold (overall,
+    or on one resource type via resource_thresholds). Findings of allowed
+    checks never count and a threshold of 0 (or none) never blocks. Check
+    lists are globs, compiled into one regex each.
+    """
+    
+    def __init__(self, thresholds: Dict[str, int] = None,
+                 resource_thresholds: Dict[str, Dict[str, int]] = None,
+                 allow: Iterable[str] = (), deny: Iterable[str] = ()):
+        self.thresholds = {sev: count for sev, count in (thresholds or {}).items() if count > 0}
+        self.resource_thresholds = {
+            resource_type: {sev: count for sev, count in limits.items() if count > 0}
+            for resource_type, limits in (resource_thresholds or {}).items()
+        }
+        self.allow = compile_patterns(allow)
+        self.deny = compile_patterns(deny)
+    
+    @classmethod
+    def from_config(cls) -> 'Gate':
+        """Gate from the GATE_* settings (default: the BLOCK_ON_* flags)"""
+        if Config.GATE_THRESHOLDS:
+            thresholds = parse_thresholds(Config.GATE_THRESHOLDS)
+        else:
+            thresholds = {'CRITICAL': int(Config.BLOCK_ON_CRITICAL),
+                          'HIGH': int(Config.BLOCK_ON_HIGH)}
+        return cls(thresholds,
+                   parse_resource_thresholds(Config.GATE_RESOURCE_THRESHOLDS),
+                   Config.GATE_ALLOW_CHECKS.split(','),
+                   Config.GATE_DENY_CHECKS.split(','))
+    
+    def evaluator(self) -> 'GateEvaluator':
+        """Fresh state for one scan's findings"""
+        return GateEvaluator(self)
+    
+    def evaluate(self, violations: Iterable[Any]) -> 'GateEvaluator':
+        """Evaluate all findings at once (stops reading at the first block)"""
+        evaluator = self.evaluator()
+        evaluator.add_all(violations)
+        return evaluator
+
+
+class GateEvaluator:
+    """Running gate verdict; add() findings as they arrive
+    
+    Once blocked the verdict is final, so callers can stop scanning.
+    """
+    
+    def __init__(self, gate: Gate):
+        self.gate = gate
+        self.counts: Dict[str, int] = {}
+        self.resource_counts: Dict[tuple, int] = {}
+        self.blocked = False
+        self.reason: Optional[str] = None
+    
+    def add(self, violation: Any) -> bool:
+        """Count one finding (any mapping with check_id, severity, resource_type)"""
+        if self.blocked:
+            return True
+        gate = self.gate
+        check_id = violation['check_id']
+        if gate.allow and gate.allow.match(check_id):
+            return False
+        if gate.deny and gate.deny.match(check_id):
+            return self._block(f"{check_id} is on the deny list ({violation['resource_name']})")
+        
+        severity = violation['severity']
+        count = self.counts[severity] = self.counts.get(severity, 0) + 1
+        limit = gate.thresholds.get(severity)
+        if limit and count >= limit:
+            return self._block(f"{count} {severity} finding(s) (threshold {limit})")
+        
+        resource_type = violation['resource_type']
+        limit = gate.resource_thresholds.get(resource_type, {}).get(severity)
+        if limit:
+            key = (resource_type, severity)
+            count = self.resource_counts[key] = self.resource_counts.get(key, 0) + 1
+            if count >= limit:
+                return self._block(f"{count} {severity} finding(s) on {resource_type} "
+                                   f"(threshold {limit})")
+        return False
+    
+    def add_all(self, violations: Iterable[Any]) -> bool:
+        for violation in violations:
+            if self.add(violation):
+                break
+        return self.blocked
+    
+    def _block(self, reason: str) -> bool:
+        self.blocked = True
+        self.reason = reason
+        return True
@@ -0,0 +1,380 @@
+"""
+CLOUD SENTINEL - HCL Parser Module
+Minimal Terraform (HCL2) parser for the native pre-check engine
+"""
+
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Bump when the parse tree changes shape (keys parse caches)
+PARSER_VERSION = 1
+
+_TOKEN_RE = re.compile(r'''
+    (?P<space>[ \t\r]+)
+  | (?P<comment>(?:\#|//)[^\n]*)
+  | (?P<block_comment>/\*.*?\*/)
+  | (?P<newline>\n)
+  | (?P<heredoc><<-?(?P<tag>[A-Za-z_][A-Za-z0-9_]*)[ \t]*\n)
+  | (?P<number>\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+  | (?P<ident>[A-Za-z_][A-Za-z0-9_-]*)
+  | (?P<op>==|!=|<=|>=|&&|\|\||=>|\.\.\.|[{}\[\]()=,:.?!<>+\-*/%])
+''', re.VERBOSE | re.DOTALL)
+
+# Tokens that end an expression at bracket depth 0
+_EXPR_END = {'\n', ',', ']', '}', ')'}
+
+
+class HCLError(ValueError):
+    """Raised when a file cannot be parsed"""
+
+
+class Ref(str):
+    """A reference or expression kept as source text, e.g. aws_vpc.main.id"""
+
+
+class Call:
+    """A function call such as jsonencode({...})"""
+    
+    __slots__ = ('name', 'args')
+    
+    def __init__(self, name: str, args: List[Any]):
+        self.name = name
+        self.args = args
+    
+    def __repr__(self) -> str:
+        return f"Call({self.name!r}, {self.args!r})"
+
+
+class Block:
+    """A block: resource "aws_s3_bucket" "logs" { ... }"""
+    
+    __slots__ = ('type', 'labels', 'attrs', 'blocks', 'line', 'end_line')
+    
+    def __init__(self, type: str, labels: List[str], line: int):
+        self.type = type
+        self.labels = labels
+        self.attrs: Dict[str, Any] = {}
+        self.blocks: List['Block'] = []
+        self.line = line
+        self.end_line = line
+    
+    def children(self, type: str) -> List['Block']:
+        """Nested blocks of one type (e.g. every ingress block)"""
+        return [block for block in self.blocks if block.type == type]
+    
+    def __repr__(self) -> str:
+        return f"Block({self.type!r}, {self.labels!r}, line={self.line})"
+
+
+def _tokenize(text: str) -> List[Tuple[str, Any, int]]:
+    """Split source into (kind, value, line) tokens"""
+    tokens = []
+    pos, line, length = 0, 1, len(text)
+    
+    while pos < length:
+        if text[pos] == '"':
+            value, pos, newlines = _scan_string(text, pos, line)
+            tokens.append(('string', value, line))
+            line += newlines
+            continue
+        
+        match = _TOKEN_RE.match(text, pos)
+        if not match:
+            raise HCLError(f"line {line}: unexpected character {text[pos]!r}")
+        kind = match.lastgroup if match.lastgroup != 'tag' else 'heredoc'
+        value = match.group()
+        pos = match.end()
+        
+        if kind == 'heredoc':
+            body, pos, newlines = _scan_heredoc(text, pos, match.group('tag'), line)
+            tokens.append(('string', body, line))
+            line += newlines + 1
+        elif kind == 'newline':
+            tokens.append(('op', '\n', line))
+            line += 1
+        elif kind in ('comment', 'space'):
+            pass
+        elif kind == 'block_comment':
+            line += value.count('\n')
+        elif kind == 'number':
+            tokens.append(('number', float(value) if '.' in value or 'e' in value.lower()
+                           else int(value), line))
+        else:
+            tokens.append((kind, value, line))
+    
+    tokens.append(('eof', None, line))
+    return tokens
+
+
+def _scan_string(text: str, pos: int, line: int) -> Tuple[str, int, int]:
+    """Read a quoted string, keeping ${...} interpolations verbatim"""
+    out = []
+    depth = 0
+    newlines = 0
+    pos += 1
+    while pos < len(text):
+        char = text[pos]
+        if char == '\\' and depth == 0:
+            nxt = text[pos + 1:pos + 2]
+            out.append({'n': '\n', 't': '\t', '"': '"', '\\': '\\'}.get(nxt, '\\' + nxt))
+            pos += 2
+            continue
+        if char == '\n':
+            newlines += 1
+        if depth == 0 and char == '"':
+            return ''.join(out), pos + 1, newlines
+        if text.startswith('${', pos) or text.startswith('%{', pos):
+            depth += 1
+            out.append(text[pos:pos + 2])
+            pos += 2
+            continue
+        if depth and char == '{':
+            depth += 1
+        elif depth and char == '}':
+            depth -= 1
+        elif depth and char == '"':
+            # Quoted string nested inside an interpolation
+            inner, end, inner_newlines = _scan_string(text, pos, line)
+            out.append(text[pos:end])
+            newlines += inner_newlines
+            pos = end
+            continue
+        out.append(char)
+        pos += 1
+    raise HCLError(f"line {line}: unterminated string")
+
+
+def _scan_heredoc(text: str, pos: int, tag: str, line: int) -> Tuple[str, int, int]:
+    """Read a heredoc body up to its closing tag line"""
+    closing = re.compile(rf'^[ \t]*{re.escape(tag)}[ \t]*$', re.MULTILINE)
+    match = closing.search(text, pos)
+    if not match:
+        raise HCLError(f"line {line}: unterminated heredoc {tag}")
+    body = text[pos:match.start()]
+    return body, match.end(), body.count('\n')
+
+
+class _Parser:
+    """Recursive-descent parser over the token list"""
+    
+    def __init__(self, tokens: List[Tuple[str, Any, int]]):
+        self.tokens = tokens
+        self.pos = 0
+    
+    def peek(self, offset: int = 0) -> Tuple[str, Any, int]:
+        return self.tokens[min(self.pos + offset, len(self.tokens) - 1)]
+    
+    def next(self) -> Tuple[str, Any, int]:
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+    
+    def expect(self, value: str) -> Tuple[str, Any, int]:
+        token = self.next()
+        if token[1] != value or token[0] == 'string':
+            raise HCLError(f"line {token[2]}: expected {value!r}, got {token[1]!r}")
+        return token
+    
+    def skip_newlines(self):
+        while self.peek()[1] == '\n' and self.peek()[0] == 'op':
+            self.pos += 1
+    
+    def parse_body(self, block: Block, closing: Optional[str]):
+        """Attributes and nested blocks until '}' (or end of file)"""
+        while True:
+            self.skip_newlines()
+            kind, value, line = self.peek()
+            if kind == 'eof':
+                if closing:
+                    raise HCLError(f"line {line}: missing '}}'")
+                return
+            if kind == 'op' and value == closing:
+                block.end_line = self.next()[2]
+                return
+            if kind not in ('ident', 'string'):
+                raise HCLError(f"line {line}: unexpected {value!r}")
+            
+            self.next()
+            if self.peek()[1] == '=' and self.peek()[0] == 'op':
+                self.next()
+                block.attrs[value] = self.parse_expr()
+                continue
+            
+            labels = []
+            while self.peek()[0] in ('string', 'ident'):
+                labels.append(self.next()[1])
+            self.expect('{')
+            child = Block(value, labels, line)
+            self.parse_body(child, '}')
+            block.blocks.append(child)
+    
+    def parse_expr(self) -> Any:
+        """One expression; anything beyond simple values is kept as a Ref"""
+        start = self.pos
+        value = self.parse_primary()
+        kind, token, _ = self.peek()
+        if kind == 'eof' or (kind == 'op' and token in _EXPR_END):
+            return value
+        # Operators / conditionals: consume to the end and keep the source text
+        self.pos = start
+        return Ref(self.consume_expr())
+    
+    def consume_expr(self) -> str:
+        """Skip a complex expression, returning a rough source rendering"""
+        parts = []
+        depth = 0
+        while True:
+            kind, value, _ = self.peek()
+            if kind == 'eof':
+                break
+            if kind == 'op':
+                if depth == 0 and value in _EXPR_END:
+                    break
+                if value in '([{':
+                    depth += 1
+                elif value in ')]}':
+                    depth -= 1
+                elif value == '\n':
+                    self.next()
+                    continue
+            self.next()
+            parts.append(f'"{value}"' if kind == 'string' else str(value))
+        return ' '.join(parts)
+    
+    def parse_primary(self) -> Any:
+        kind, value, line = self.next()
+        if kind == 'string':
+            return value
+        if kind == 'number':
+            return value
+        if kind == 'op' and value == '-' and self.peek()[0] == 'number':
+            return -self.next()[1]
+        if kind == 'op' and value in ('!', '-'):
+            return Ref(f'{value}{self.parse_primary()}')
+        if kind == 'op' and value == '[':
+            return self.parse_list()
+        if kind == 'op' and value == '{':
+            return self.parse_object()
+        if kind == 'op' and value == '(':
+            self.skip_newlines()
+            inner = self.parse_expr()
+            self.skip_newlines()
+            self.expect(')')
+            return inner
+        if kind == 'ident':
+            if value in ('true', 'false'):
+                return value == 'true'
+            if value == 'null':
+                return None
+            if self.peek()[1] == '(' and self.peek()[0] == 'op':
+                return self.parse_call(value)
+            return self.parse_reference(value)
+        raise HCLError(f"line {line}: unexpected {value!r}")
+    
+    def parse_reference(self, head: str) -> Ref:
+        """Traversals like aws_subnet.public[0].id or var.tags["Name"]"""
+        parts = [head]
+        while True:
+            kind, value, _ = self.peek()
+            if kind == 'op' and value == '.':
+                self.next()
+                parts.append('.' + str(self.next()[1]))
+            elif kind == 'op' and value == '[' and self.peek(1)[1] == '*':
+                self.pos += 2
+                self.expect(']')
+                parts.append('[*]')
+            elif kind == 'op' and value == '[':
+                self.next()
+                self.skip_newlines()
+                index = self.parse_expr()
+                self.skip_newlines()
+                self.expect(']')
+                parts.append(f'[{index!r}]' if isinstance(index, str) and not isinstance(index, Ref)
+                             else f'[{index}]')
+            else:
+                return Ref(''.join(parts))
+    
+    def parse_call(self, name: str) -> Call:
+        self.expect('(')
+        args = []
+        while True:
+            self.skip_newlines()
+            if self.peek()[1] == ')' and self.peek()[0] == 'op':
+                self.next()
+                return Call(name, args)
+            args.append(self.parse_expr())
+            self.skip_newlines()
+            if self.peek()[1] == '...':
+                self.next()
+            if self.peek()[1] == ',':
+                self.next()
+    
+    def parse_list(self) -> Any:
+        self.skip_newlines()
+        if self.peek() == ('ident', 'for', self.peek()[2]):
+            return Ref('[' + self.consume_until(']') + ']')
+        items = []
+        while True:
+            self.skip_newlines()
+            if self.peek()[1] == ']' and self.peek()[0] == 'op':
+                self.next()
+                return items
+            items.append(self.parse_expr())
+            self.skip_newlines()
+            if self.peek()[1] == ',':
+                self.next()
+    
+    def parse_object(self) -> Any:
+        self.skip_newlines()
+        if self.peek() == ('ident', 'for', self.peek()[2]):
+            return Ref('{' + self.consume_until('}') + '}')
+        obj = {}
+        while True:
+            self.skip_newlines()
+            kind, key, line = self.peek()
+            if kind == 'op' and key == '}':
+                self.next()
+                return obj
+            if kind == 'op' and key == '(':
+                key = str(self.parse_primary())
+            else:
+                self.next()
+                if kind not in ('ident', 'string', 'number'):
+                    raise HCLError(f"line {line}: bad object key {key!r}")
+                key = str(key)
+            separator = self.next()
+            if separator[1] not in ('=', ':'):
+                raise HCLError(f"line {separator[2]}: expected '=' after {key!r}")
+            obj[key] = self.parse_expr()
+            if self.peek()[1] == ',':
+                self.next()
+    
+    def consume_until(self, closing: str) -> str:
+        """Skip to the bracket closing the current one (for-expressions)"""
+        parts = []
+        depth = 0
+        while True:
+            kind, value, line = self.next()
+            if kind == 'eof':
+                raise HCLError(f"line {line}: missing {closing!r}")
+            if kind == 'op' and value in '([{':
+                depth += 1
+            elif kind == 'op' and value in ')]}':
+                if depth == 0:
+                    return ' '.join(parts)
+                depth -= 1
+            parts.append(f'"{value}"' if kind == 'string' else str(value))
+
+
+def parse(text: str) -> List[Block]:
+    """Parse HCL source into its top-level blocks"""
+    root = Block('', [], 1)
+    _Parser(_tokenize(text)).parse_body(root, None)
+    return root.blocks
+
+
+def parse_file(path: Path) -> List[Block]:
+    """Parse one .tf file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse(f.read())
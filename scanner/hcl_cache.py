@@ -0,0 +1,238 @@
+"""
+CLOUD SENTINEL - HCL Cache Module
+On-disk cache of parsed Terraform files, keyed by content hash and parser version
+"""
+
+import hashlib
+import json
+import marshal
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from config import Config
+from hcl import PARSER_VERSION, Block, Call, HCLError, Ref, parse
+
+# marshal output is only stable per Python version, so it is part of the key too
+CACHE_VERSION = f"{PARSER_VERSION}-py{sys.version_info[0]}{sys.version_info[1]}-m{marshal.version}"
+
+
+def _encode(value: Any) -> Any:
+    """Parse tree -> marshal-able tuples (Block 'B', Ref 'R', Call 'C')
+    
+    The parser never produces tuples itself, so tagged tuples are unambiguous.
+    marshal is used instead of pickle so loading a cache file can't run code.
+    """
+    if isinstance(value, Block):
+        return ('B', value.type, value.labels, _encode(value.attrs),
+                [_encode(block) for block in value.blocks], value.line, value.end_line)
+    if isinstance(value, Ref):
+        return ('R', str(value))
+    if isinstance(value, Call):
+        return ('C', value.name, [_encode(arg) for arg in value.args])
+    if isinstance(value, list):
+        return [_encode(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _encode(item) for key, item in value.items()}
+    return value
+
+
+def _decode(value: Any) -> Any:
+    """Inverse of _encode"""
+    if isinstance(value, tuple):
+        tag = value[0]
+        if tag == 'B':
+            block = Block(value[1], value[2], value[5])
+            block.attrs = _decode(value[3])
+            block.blocks = [_decode(item) for item in value[4]]
+            block.end_line = value[6]
+            return block
+        if tag == 'R':
+            return Ref(value[1])
+        if tag == 'C':
+            return Call(value[1], [_decode(arg) for arg in value[2]])
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _decode(item) for key, item in value.items()}
+    return value
+
+
+def _atomic_write(path: Path, data: bytes):
+    """Write via temp file + rename so concurrent readers never see partial files"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix='.tmp_', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+class HCLCache:
+    """Parsed-Terraform cache shared by every native analysis
+    
+    Entries live under <cache_dir>/entries/ named by sha256(content +
+    CACHE_VERSION); a parse error is cached like a result. Writes are
+    atomic renames, so any number of processes can read and fill the cache
+    at once. Hits refresh the entry's mtime and evict() drops the least
+    recently used entries once the cache exceeds max_bytes.
+    
+    parse_directory() also keeps a per-directory manifest of (mtime, size,
+    key) per file, so unchanged files are not even read.
+    """
+    
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: int = None):
+        self.cache_dir = Path(cache_dir) if cache_dir else Config.get_hcl_cache_dir()
+        self.max_bytes = max_bytes if max_bytes is not None else Config.HCL_CACHE_MAX_MB * 1024 * 1024
+        self.stats = {'hits': 0, 'misses': 0, 'unchanged': 0}
+        self._written = False
+    
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / 'entries' / key[:2] / f"{key}.bin"
+    
+    @staticmethod
+    def content_key(content: bytes) -> str:
+        """Cache key of one file's bytes"""
+        return hashlib.sha256(CACHE_VERSION.encode() + b'\0' + content).hexdigest()
+    
+    def _load(self, key: str) -> Optional[Any]:
+        """Cached (tag, payload) for a key, or None on miss / unreadable entry"""
+        path = self._entry_path(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = marshal.load(f)
+            os.utime(path)  # LRU: a hit counts as a use
+            return entry
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+    
+    def _store(self, key: str, entry: Any):
+        try:
+            _atomic_write(self._entry_path(key), marshal.dumps(entry))
+            self._written = True
+        except OSError:
+            pass  # caching is best effort
+    
+    def _parse_bytes(self, content: bytes, key: str) -> Union[List[Block], HCLError]:
+        """Parsed blocks (or the parse error) for a file's content"""
+        entry = self._load(key)
+        if entry is not None:
+            self.stats['hits'] += 1
+        else:
+            self.stats['misses'] += 1
+            try:
+                entry = ('ok', [_encode(block) for block in parse(content.decode('utf-8'))])
+            except (HCLError, UnicodeDecodeError) as e:
+                entry = ('error', str(e))
+            self._store(key, entry)
+        
+        if entry[0] == 'error':
+            return HCLError(entry[1])
+        return [_decode(block) for block in entry[1]]
+    
+    def parse_file(self, path: Path) -> List[Block]:
+        """Parse one file through the cache (raises HCLError like hcl.parse_file)"""
+        content = Path(path).read_bytes()
+        result = self._parse_bytes(content, self.content_key(content))
+        if isinstance(result, HCLError):
+            raise result
+        return result
+    
+    def _manifest_path(self, directory: Path) -> Path:
+        digest = hashlib.sha256(str(directory.resolve()).encode()).hexdigest()
+        return self.cache_dir / 'manifests' / f"{digest}.json"
+    
+    def parse_directory(self, directory: Path) -> Dict[str, Any]:
+        """Parse every .tf file under directory, touching only changed files
+        
+        Returns {'files': {relative_path: [Block, ...]},
+                 'errors': {relative_path: message}}.
+        """
+        root = Path(directory)
+        manifest_path = self._manifest_path(root)
+        try:
+            manifest = json.loads(manifest_path.read_text())
+            if manifest.get('version') != CACHE_VERSION:
+                manifest = {}
+        except (OSError, ValueError):
+            manifest = {}
+        known = manifest.get('files', {})
+        
+        files, errors, current = {}, {}, {}
+        for path in sorted(root.rglob('*.tf')):
+            relative = path.relative_to(root)
+            if '.terraform' in relative.parts:
+                continue
+            name = relative.as_posix()
+            stat = path.stat()
+            signature = [stat.st_mtime_ns, stat.st_size]
+            
+            result = None
+            entry = known.get(name)
+            if entry and entry[:2] == signature:
+                cached = self._load(entry[2])
+                if cached is not None:
+                    self.stats['unchanged'] += 1
+                    key = entry[2]
+                    result = (HCLError(cached[1]) if cached[0] == 'error'
+                              else [_decode(block) for block in cached[1]])
+            if result is None:
+                content = path.read_bytes()
+                key = self.content_key(content)
+                result = self._parse_bytes(content, key)
+            
+            current[name] = signature + [key]
+            if isinstance(result, HCLError):
+                errors[name] = str(result)
+            else:
+                files[name] = result
+        
+        if current != known:
+            try:
+                _atomic_write(manifest_path, json.dumps(
+                    {'version': CACHE_VERSION, 'files': current}).encode())
+            except OSError:
+                pass
+        if self._written:
+            self.evict()
+            self._written = False
+        
+        return {'files': files, 'errors': errors}
+    
+    def evict(self):
+        """Delete least recently used entries until the cache fits max_bytes"""
+        entries = []
+        total = 0
+        for path in (self.cache_dir / 'entries').glob('*/*.bin'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # evicted by another process
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        
+        if total <= self.max_bytes:
+            return
+        # Trim to 90% so every new entry doesn't trigger another pass
+        target = self.max_bytes * 0.9
+        for _, size, path in sorted(entries):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            if total <= target:
+                break
+    
+    def clear(self):
+        """Remove all entries and manifests"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
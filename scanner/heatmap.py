@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+CLOUD SENTINEL - Heatmap Module
+Check x scan and resource x scan matrices across recent scans, built with NumPy
+
+Usage:
+    python scanner/heatmap.py --scans 300 -o heatmap.json
+    python scanner/heatmap.py --axis resource --matrix severity -o resources.csv
+    python scanner/heatmap.py --project owner/repo -o heatmap.npz
+"""
+
+import csv
+import json
+import sys
+import threading
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from config import Config
+
+# Row axis -> violations column / artifact index column
+AXES = {'check': ('check_id', 'check_id'), 'resource': ('resource_name', 'resource')}
+
+MATRICES = ('failed', 'passed', 'status', 'severity')
+
+# status cell values
+STATUS_NO_DATA, STATUS_PASS, STATUS_FAIL = -1, 0, 1
+
+# Built matrices kept per (parameters, data version)
+CACHE_SIZE = 16
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("Heatmaps require numpy: pip install numpy")
+    return numpy
+
+
+class HeatmapBuilder:
+    """Cross-scan matrices: one row per check (or resource), one column per scan
+    
+    build() loads the window's violations in a single query, turns the
+    columns into NumPy arrays and fills every matrix with vectorized
+    operations (np.unique codes, np.bincount, np.maximum.at) instead of
+    one get_violation_summary call per scan:
+        
+        failed    findings per cell (a check can fail on many resources)
+        passed    passed results per cell, from the artifact index (0 for
+                  scans without an archived report, see 'archived')
+        status    1 failing, 0 passing, -1 no data
+        severity  highest SEVERITY_LEVELS rank failing in the cell, -1 none
+    
+    Columns are the newest `scans` completed full scans, oldest first; rows are
+    ordered by total findings and cut at `rows`. Results are cached per
+    data version (newest violation, completed scan count and archived
+    frame), so repeated dashboard requests cost one cheap query until a
+    scan completes.
+    """
+    
+    def __init__(self, db):
+        self.db = db
+        self._cache: 'OrderedDict[tuple, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _has_artifact_index(conn) -> bool:
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'artifact_checks'"
+        ).fetchone() is not None
+    
+    def data_version(self) -> Tuple[int, int, int]:
+        """Changes whenever a scan completes or findings / archived reports are added"""
+        with self.db.get_read_connection() as conn:
+            violations, completed = conn.execute('''
+                SELECT (SELECT COALESCE(MAX(id), 0) FROM violations),
+                       (SELECT COUNT(*) FROM scans WHERE status = 'completed' AND kind = 'full')
+            ''').fetchone()
+            frames = (conn.execute('SELECT COALESCE(MAX(id), 0) FROM artifact_frames').fetchone()[0]
+                      if self._has_artifact_index(conn) else 0)
+        return violations, completed, frames
+    
+    def build(self, axis: str = 'check', scans: int = 200, project: str = None,
+              rows: Optional[int] = 100) -> Dict[str, Any]:
+        """Matrices for the newest `scans` completed full scans (cached per data version)"""
+        if axis not in AXES:
+            raise ValueError(f"Unknown heatmap axis: {axis!r} (expected one of {', '.join(AXES)})")
+        key = (axis, scans, project, rows, self.data_version())
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return dict(self._cache[key], cached=True)
+        
+        result = self._build(axis, scans, project, rows)
+        result['data_version'] = list(key[-1])
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return dict(result, cached=False)
+    
+    def _build(self, axis: str, scans: int, project: Optional[str],
+               rows: Optional[int]) -> Dict[str, Any]:
+        np = _numpy()
+        violation_column, artifact_column = AXES[axis]
+        scope = ' AND project = ?' if project else ''
+        window = f'''
+            SELECT scan_id FROM scans WHERE status = 'completed' AND kind = 'full'{scope}
+            ORDER BY timestamp DESC, id DESC LIMIT ?
+        '''
+        params = ([project] if project else []) + [scans]
+        
+        with self.db.get_read_connection() as conn:
+            scan_rows = conn.execute(f'''
+                SELECT scan_id, timestamp, branch, commit_hash FROM scans
+                WHERE scan_id IN ({window})
+                ORDER BY timestamp, id
+            ''', params).fetchall()
+            failed_rows = conn.execute(f'''
+                SELECT scan_id, COALESCE({violation_column}, ''), severity FROM violations
+                WHERE scan_id IN ({window})
+            ''', params).fetchall()
+            passed_rows = []
+            if self._has_artifact_index(conn):
+                passed_rows = conn.execute(f'''
+                    SELECT scan_id, COALESCE({artifact_column}, '') FROM artifact_checks
+                    WHERE result = 'passed' AND scan_id IN ({window})
+                ''', params).fetchall()
+                archived_ids = {row[0] for row in conn.execute(f'''
+                    SELECT DISTINCT scan_id FROM artifact_frames WHERE scan_id IN ({window})
+                ''', params).fetchall()}
+            else:
+                archived_ids = set()
+        
+        def columns(rows, count):
+            return ([np.array(column, dtype=str) for column in zip(*rows)]
+                    or [np.array([], dtype=str)] * count)
+        
+        def encode(values, table):
+            """Integer code per value via its distinct values' entries in table"""
+            distinct, inverse = np.unique(values, return_inverse=True)
+            return np.array([table[value] for value in distinct.tolist()],
+                            dtype=np.int64).reshape(-1)[inverse]
+        
+        fail_scan_ids, fail_labels, fail_severities = columns(failed_rows, 3)
+        pass_scan_ids, pass_labels = columns(passed_rows, 2)
+        positions = {row['scan_id']: index for index, row in enumerate(scan_rows)}
+        n_scans = len(scan_rows)
+        
+        # Row codes shared by both sources, then one flat cell index per result
+        labels, codes = np.unique(np.concatenate([fail_labels, pass_labels]), return_inverse=True)
+        n_labels = len(labels)
+        fail_cell = codes[:len(fail_labels)] * n_scans + encode(fail_scan_ids, positions)
+        pass_cell = codes[len(fail_labels):] * n_scans + encode(pass_scan_ids, positions)
+        
+        failed = np.bincount(fail_cell, minlength=n_labels * n_scans).reshape(n_labels, n_scans)
+        passed = np.bincount(pass_cell, minlength=n_labels * n_scans).reshape(n_labels, n_scans)
+        severity = np.full(n_labels * n_scans, -1, dtype=np.int8)
+        ranks = defaultdict(int, Config.SEVERITY_LEVELS)
+        np.maximum.at(severity, fail_cell, encode(fail_severities, ranks).astype(np.int8))
+        severity = severity.reshape(n_labels, n_scans)
+        
+        status = np.where(failed > 0, STATUS_FAIL,
+                          np.where(passed > 0, STATUS_PASS, STATUS_NO_DATA)).astype(np.int8)
+        
+        # Most findings first (ties by label), then cut to the requested rows
+        totals = failed.sum(axis=1)
+        keep = np.lexsort((labels, -totals))
+        if rows:
+            keep = keep[:rows]
+        
+        return {
+            'axis': axis,
+            'project': project,
+            'scans': [{'scan_id': row['scan_id'], 'timestamp': row['timestamp'],
+                       'branch': row['branch'], 'commit_hash': row['commit_hash'],
+                       'archived': row['scan_id'] in archived_ids} for row in scan_rows],
+            'labels': labels[keep],
+            'total_rows': n_labels,
+            'failed': failed[keep].astype(np.int32),
+            'passed': passed[keep].astype(np.int32),
+            'status': status[keep],
+            'severity': severity[keep],
+            'severity_levels': dict(Config.SEVERITY_LEVELS),
+        }
+
+
+def to_json(heatmap: Dict[str, Any]) -> Dict[str, Any]:
+    """A built heatmap with its arrays as nested lists"""
+    return {key: value.tolist() if hasattr(value, 'tolist') else value
+            for key, value in heatmap.items()}
+
+
+def write_csv(heatmap: Dict[str, Any], path: Path, matrix: str = 'failed'):
+    """One matrix as CSV: a label column, then one column per scan"""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow([heatmap['axis']] + [scan['scan_id'] for scan in heatmap['scans']])
+        for label, values in zip(heatmap['labels'].tolist(), heatmap[matrix].tolist()):
+            writer.writerow([label] + values)
+
+
+def write_npz(heatmap: Dict[str, Any], path: Path):
+    """All matrices plus the row labels and scan IDs, for NumPy / pandas users"""
+    np = _numpy()
+    np.savez_compressed(
+        path, labels=heatmap['labels'],
+        scan_ids=np.array([scan['scan_id'] for scan in heatmap['scans']], dtype=str),
+        **{name: heatmap[name] for name in MATRICES})
+
+
+def main():
+    """Main entry point"""
+    import argparse
+    
+    from database import Database
+    
+    parser = argparse.ArgumentParser(description='Cloud Sentinel cross-scan heatmap export')
+    parser.add_argument('--axis', choices=list(AXES), default='check',
+                       help='Matrix rows: checks or resources')
+    parser.add_argument('--scans', type=int, default=200, help='Newest completed scans (columns)')
+    parser.add_argument('--rows', type=int, default=100,
+                       help='Rows with the most findings to keep (0 = all)')
+    parser.add_argument('--project', type=str, help='Only this project')
+    parser.add_argument('--matrix', choices=MATRICES, default='failed',
+                       help='Matrix written by CSV output')
+    parser.add_argument('-o', '--output', type=str, required=True,
+                       help='Output file: .json (all matrices), .csv (--matrix) or .npz')
+    
+    args = parser.parse_args()
+    output = Path(args.output)
+    if output.suffix not in ('.json', '.csv', '.npz'):
+        parser.error('--output must end in .json, .csv or .npz')
+    
+    try:
+        heatmap = HeatmapBuilder(Database()).build(args.axis, args.scans, args.project,
+                                                   args.rows or None)
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(2)
+    
+    if output.suffix == '.json':
+        with open(output, 'w') as f:
+            json.dump(to_json(heatmap), f)
+    elif output.suffix == '.csv':
+        write_csv(heatmap, output, args.matrix)
+    else:
+        write_npz(heatmap, output)
+    print(f"Wrote {output}: {len(heatmap['labels'])} of {heatmap['total_rows']} "
+          f"{args.axis}s x {len(heatmap['scans'])} scans")
+
+
+if __name__ == '__main__':
+    main()
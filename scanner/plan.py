@@ -0,0 +1,332 @@
+"""
+CLOUD SENTINEL - Plan Scan Module
+Streams `terraform show -json` plan files and evaluates the native rules on resolved values
+"""
+
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Set, TextIO
+
+from hcl import Block, Ref
+from precheck import _BUCKET_REF, RULES, Context, _uses_kms, check_result, rules_by_type
+
+# Characters the skip scanner has to look at; everything else is passed over by regex
+_STRUCT_RE = re.compile(r'["{}\[\],]')
+_STRING_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+_INDEX_RE = re.compile(r'\[[^\]]*\]')
+
+CHUNK_SIZE = 64 * 1024
+
+# Value the plan has not resolved yet; rules treat a Ref as "unknown" and skip
+UNKNOWN = Ref('(known after apply)')
+
+# Resources whose rules depend on other resources (see precheck.Context);
+# they are evaluated once the whole plan has been read
+DEFERRED_TYPES = {'aws_s3_bucket'}
+
+
+class _JSONStream:
+    """Forward-only reader over a JSON document, one chunk in memory at a time
+    
+    Values that are not needed are skipped without being kept, so the memory
+    used is the chunk size plus the largest value actually decoded.
+    """
+    
+    def __init__(self, f: TextIO):
+        self.f = f
+        self.buf = ''
+        self.pos = 0
+    
+    def _more(self) -> bool:
+        """Drop consumed text and append the next chunk; False at end of file"""
+        chunk = self.f.read(CHUNK_SIZE)
+        if not chunk:
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+    
+    def peek(self) -> str:
+        """Next non-whitespace character (not consumed)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._more():
+                raise ValueError("Unexpected end of plan file")
+    
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Malformed plan file: expected {char!r}, got {found!r}")
+        self.pos += 1
+    
+    def read_string(self) -> str:
+        self.peek()
+        while True:
+            match = _STRING_RE.match(self.buf, self.pos)
+            if match:
+                self.pos = match.end()
+                return json.loads(match.group())
+            if not self._more():
+                raise ValueError("Unterminated string in plan file")
+    
+    def scan_value(self, keep: bool) -> Optional[str]:
+        """Consume one value; return its text if keep, else discard it as it goes"""
+        self.peek()
+        parts = []
+        mark = self.pos
+        depth = 0
+        while True:
+            match = _STRUCT_RE.search(self.buf, self.pos)
+            if match is None:
+                # Nothing structural left in the buffer: bank it and read on
+                if keep:
+                    parts.append(self.buf[mark:])
+                self.pos = mark = len(self.buf)
+                if not self._more():
+                    raise ValueError("Unexpected end of plan file")
+                mark = 0
+                continue
+            char = match.group()
+            if char == '"':
+                string = _STRING_RE.match(self.buf, match.start())
+                if string is None:
+                    # String runs past the buffer: keep it whole for the next pass
+                    if keep:
+                        parts.append(self.buf[mark:match.start()])
+                    self.pos = mark = match.start()
+                    if not self._more():
+                        raise ValueError("Unterminated string in plan file")
+                    mark = 0
+                    continue
+                self.pos = string.end()
+                if depth == 0:
+                    break
+            elif char in '{[':
+                depth += 1
+                self.pos = match.end()
+            elif depth == 0:
+                # ',' or a closing bracket ends a top-level scalar without being consumed
+                self.pos = match.start()
+                break
+            elif char in '}]':
+                depth -= 1
+                self.pos = match.end()
+                if depth == 0:
+                    break
+            else:
+                self.pos = match.end()
+        if keep:
+            parts.append(self.buf[mark:self.pos])
+            return ''.join(parts)
+        return None
+
+
+def iter_plan(path: Path, keys: Set[str]) -> Iterator[tuple]:
+    """Yield (key, item) for the elements of the top-level arrays named in keys
+    
+    Top-level objects named in keys are yielded whole as (key, object);
+    every other top-level value is skipped without being decoded.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        stream = _JSONStream(f)
+        stream.expect('{')
+        if stream.peek() == '}':
+            return
+        while True:
+            key = stream.read_string()
+            stream.expect(':')
+            if key not in keys:
+                stream.scan_value(keep=False)
+            elif stream.peek() == '[':
+                stream.expect('[')
+                if stream.peek() == ']':
+                    stream.expect(']')
+                else:
+                    while True:
+                        yield key, json.loads(stream.scan_value(keep=True))
+                        if stream.peek() == ']':
+                            stream.expect(']')
+                            break
+                        stream.expect(',')
+            else:
+                yield key, json.loads(stream.scan_value(keep=True))
+            if stream.peek() == '}':
+                return
+            stream.expect(',')
+
+
+def values_to_block(resource_type: str, address: str, values: Dict[str, Any],
+                    unknown: Any) -> Block:
+    """Planned values -> the Block shape the rules read from .tf files
+    
+    Lists of objects become nested blocks, nulls are dropped (like an unset
+    attribute) and values marked in after_unknown become UNKNOWN.
+    """
+    block = Block('resource', [resource_type, address], 0)
+    _fill_block(block, values, unknown)
+    return block
+
+
+def _fill_block(block: Block, values: Dict[str, Any], unknown: Any):
+    unknown = unknown if isinstance(unknown, dict) else {}
+    for key, value in values.items():
+        marker = unknown.get(key)
+        if marker is True:
+            block.attrs[key] = UNKNOWN
+        elif isinstance(value, list) and value and all(isinstance(item, dict) for item in value):
+            markers = marker if isinstance(marker, list) else []
+            for i, item in enumerate(value):
+                child = Block(key, [], 0)
+                _fill_block(child, item, markers[i] if i < len(markers) else None)
+                block.blocks.append(child)
+        elif value is not None:
+            block.attrs[key] = value
+    # Attributes only known after apply are absent (or null) in `after`
+    for key, marker in unknown.items():
+        if marker is True and key not in block.attrs:
+            block.attrs[key] = UNKNOWN
+
+
+def config_address(change: Dict[str, Any]) -> str:
+    """module.a["x"].aws_s3_bucket.b[0] -> module.a.aws_s3_bucket.b"""
+    module = _INDEX_RE.sub('', change.get('module_address') or '')
+    return f"{module + '.' if module else ''}{change['type']}.{change['name']}"
+
+
+def _bucket_references(configuration: Dict[str, Any]) -> Dict[str, Set[str]]:
+    """config address -> bucket config addresses its `bucket` expression references"""
+    references: Dict[str, Set[str]] = {}
+    
+    def walk(module: Dict[str, Any], prefix: str):
+        for resource in module.get('resources', []):
+            refs = resource.get('expressions', {}).get('bucket', {}).get('references', [])
+            buckets = {prefix + name for ref in refs for name in
+                       (f"aws_s3_bucket.{match}" for match in _BUCKET_REF.findall(ref))}
+            if buckets:
+                references[prefix + resource['address']] = buckets
+        for name, call in module.get('module_calls', {}).items():
+            walk(call.get('module', {}), f"{prefix}module.{name}.")
+    
+    walk(configuration.get('root_module', {}), '')
+    return references
+
+
+class PlanScanner:
+    """Evaluates RULES against the resource changes of a JSON plan
+    
+    The plan is streamed one resource change at a time and each one is
+    turned into a small Checkov-format report, so SecurityScanner can fold
+    the results in as they come without the plan ever being held in memory.
+    Only aws_s3_bucket changes (plus the S3 settings that refer to them) are
+    kept until the end, since their rules depend on other resources.
+    """
+    
+    def __init__(self, rules: Dict[str, Any] = None):
+        self.rules = rules or RULES
+        self.stats = {'resource_changes': 0, 'evaluated': 0, 'skipped': 0}
+    
+    def iter_reports(self, plan_file: Path) -> Iterator[Dict[str, Any]]:
+        """Checkov-format reports, one per evaluated resource change"""
+        plan_file = Path(plan_file)
+        file_path = f"/{plan_file.name}"
+        file_abs_path = str(plan_file.resolve())
+        by_type = rules_by_type(self.rules)
+        
+        def report(block: Block, ctx: Optional[Context]) -> Dict[str, Any]:
+            passed, failed = [], []
+            for check_id, name, rule in by_type.get(block.labels[0], []):
+                outcome = rule(block, ctx)
+                if outcome is None:
+                    continue
+                check = check_result(check_id, name, outcome, block.labels[1], block.labels[0],
+                                     file_path, file_abs_path, [0, 0])
+                (passed if outcome else failed).append(check)
+            return {'check_type': 'terraform_plan',
+                    'results': {'passed_checks': passed, 'failed_checks': failed,
+                                'skipped_checks': []}}
+        
+        buckets = []  # (block, bucket name, config address)
+        kms_names, blocked_names = set(), set()
+        kms_configs, blocked_configs = set(), set()
+        references = {}
+        
+        for key, item in iter_plan(plan_file, {'resource_changes', 'configuration'}):
+            if key == 'configuration':
+                references = _bucket_references(item)
+                continue
+            self.stats['resource_changes'] += 1
+            change = item.get('change') or {}
+            after = change.get('after')
+            if item.get('mode', 'managed') != 'managed' or not isinstance(after, dict):
+                self.stats['skipped'] += 1  # data sources and deletions
+                continue
+            
+            resource_type = item['type']
+            block = values_to_block(resource_type, item['address'], after,
+                                    change.get('after_unknown'))
+            bucket = block.attrs.get('bucket')
+            bucket = None if isinstance(bucket, Ref) else bucket
+            
+            if resource_type in DEFERRED_TYPES:
+                buckets.append((block, bucket, config_address(item)))
+                continue
+            if resource_type == 'aws_s3_bucket_server_side_encryption_configuration':
+                if _uses_kms(block):
+                    if bucket:
+                        kms_names.add(bucket)
+                    else:
+                        kms_configs.add(config_address(item))
+            elif resource_type == 'aws_s3_bucket_public_access_block':
+                if all(block.attrs.get(flag) is True or isinstance(block.attrs.get(flag), Ref)
+                       for flag in ('block_public_acls', 'block_public_policy')):
+                    if bucket:
+                        blocked_names.add(bucket)
+                    else:
+                        blocked_configs.add(config_address(item))
+            
+            if resource_type in by_type:
+                self.stats['evaluated'] += 1
+                yield report(block, None)
+        
+        # S3 settings are matched by resolved bucket name, else by config reference
+        def resolve(names: Set[str], configs: Set[str]) -> Set[str]:
+            targets = {target for source in configs for target in references.get(source, ())}
+            return {block.labels[1] for block, name, address in buckets
+                    if (name and name in names) or address in targets}
+        
+        ctx = Context([])
+        ctx.kms_buckets = resolve(kms_names, kms_configs)
+        ctx.access_blocked_buckets = resolve(blocked_names, blocked_configs)
+        for block, _, _ in buckets:
+            self.stats['evaluated'] += 1
+            yield report(block, ctx)
+
+
+def main():
+    """Check a plan file without touching the database"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Cloud Sentinel Plan Check')
+    parser.add_argument('plan_file', help='Output of `terraform show -json <plan>`')
+    args = parser.parse_args()
+    
+    scanner = PlanScanner()
+    passed = failed = 0
+    for report in scanner.iter_reports(Path(args.plan_file)):
+        passed += len(report['results']['passed_checks'])
+        for check in report['results']['failed_checks']:
+            failed += 1
+            print(f"✗ {check['check_id']} {check['resource']} - {check['check_name']}")
+    
+    print(f"{passed} passed, {failed} failed "
+          f"({scanner.stats['resource_changes']} resource changes)")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
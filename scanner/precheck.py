@@ -0,0 +1,360 @@
+"""
+CLOUD SENTINEL - Pre-check Module
+Native fast-lane rules evaluated straight from .tf files, no Checkov needed
+"""
+
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from hcl import Block, Call, HCLError, Ref, parse_file
+from hcl_cache import HCLCache
+
+OPEN_CIDRS = {'0.0.0.0/0', '::/0'}
+PUBLIC_READ_ACLS = {'public-read', 'public-read-write'}
+KMS_ALGORITHMS = {'aws:kms', 'aws:kms:dsse'}
+IAM_POLICY_TYPES = ['aws_iam_policy', 'aws_iam_role_policy', 'aws_iam_user_policy',
+                    'aws_iam_group_policy']
+SG_TYPES = ['aws_security_group', 'aws_security_group_rule',
+            'aws_vpc_security_group_ingress_rule']
+
+_BUCKET_REF = re.compile(r'aws_s3_bucket\.([A-Za-z0-9_-]+)')
+
+
+class Context:
+    """Cross-resource facts gathered from the whole directory before rules run"""
+    
+    def __init__(self, resources: List[Dict[str, Any]]):
+        self.kms_buckets: Set[str] = set()
+        self.access_blocked_buckets: Set[str] = set()
+        for resource in resources:
+            block = resource['block']
+            if resource['type'] == 'aws_s3_bucket_server_side_encryption_configuration':
+                if _uses_kms(block):
+                    self.kms_buckets.update(_bucket_names(block))
+            elif resource['type'] == 'aws_s3_bucket_public_access_block':
+                # Checkov's CKV2_AWS_6 needs both flags on, not just the block
+                if all(block.attrs.get(flag) is True or isinstance(block.attrs.get(flag), Ref)
+                       for flag in ('block_public_acls', 'block_public_policy')):
+                    self.access_blocked_buckets.update(_bucket_names(block))
+
+
+def _bucket_names(block: Block) -> Set[str]:
+    """Buckets referenced by a resource's `bucket` attribute (aws_s3_bucket.<name>.id)"""
+    return set(_BUCKET_REF.findall(str(block.attrs.get('bucket', ''))))
+
+
+def _uses_kms(block: Block) -> bool:
+    """Whether an SSE configuration (inline or standalone) defaults to KMS"""
+    for rule in block.children('rule'):
+        for default in rule.children('apply_server_side_encryption_by_default'):
+            if default.attrs.get('sse_algorithm') in KMS_ALGORITHMS:
+                return True
+    return False
+
+
+# Rule functions return True (passed), False (failed) or None (not applicable / unknown)
+
+def _ingress_rules(block: Block) -> List[Dict[str, Any]]:
+    """Normalize the ingress rules of the three security group resource shapes"""
+    resource_type = block.labels[0]
+    if resource_type == 'aws_security_group':
+        return [ingress.attrs for ingress in block.children('ingress')]
+    if resource_type == 'aws_security_group_rule':
+        return [block.attrs] if block.attrs.get('type') == 'ingress' else []
+    attrs = block.attrs
+    return [{
+        'cidr_blocks': [attrs.get('cidr_ipv4'), attrs.get('cidr_ipv6')],
+        'protocol': attrs.get('ip_protocol'),
+        'from_port': attrs.get('from_port'),
+        'to_port': attrs.get('to_port')
+    }]
+
+
+def _open_to_world(port: int) -> Callable[[Block, Context], Optional[bool]]:
+    """Rule: no ingress from 0.0.0.0/0 or ::/0 that reaches `port`"""
+    def rule(block: Block, ctx: Context) -> Optional[bool]:
+        rules = _ingress_rules(block)
+        if not rules:
+            return None
+        for ingress in rules:
+            cidrs = []
+            for key in ('cidr_blocks', 'ipv6_cidr_blocks'):
+                value = ingress.get(key)
+                if isinstance(value, list):
+                    cidrs += value
+            if not OPEN_CIDRS.intersection(cidrs):
+                continue
+            protocol = str(ingress.get('protocol', 'tcp')).lower()
+            if protocol in ('-1', 'all'):
+                return False
+            if protocol not in ('tcp', '6'):
+                continue
+            from_port, to_port = ingress.get('from_port'), ingress.get('to_port')
+            if isinstance(from_port, int) and isinstance(to_port, int) and from_port <= port <= to_port:
+                return False
+        return True
+    return rule
+
+
+def _instance_ebs_encrypted(block: Block, ctx: Context) -> Optional[bool]:
+    """Rule: every root / EBS block device sets encrypted = true"""
+    devices = block.children('root_block_device') + block.children('ebs_block_device')
+    for device in devices:
+        encrypted = device.attrs.get('encrypted')
+        if isinstance(encrypted, Ref):
+            return None
+        if encrypted is not True:
+            return False
+    return True
+
+
+def _volume_encrypted(block: Block, ctx: Context) -> Optional[bool]:
+    """Rule: aws_ebs_volume sets encrypted = true"""
+    encrypted = block.attrs.get('encrypted')
+    if isinstance(encrypted, Ref):
+        return None
+    return encrypted is True
+
+
+def _bucket_kms_encrypted(block: Block, ctx: Context) -> Optional[bool]:
+    """Rule: bucket defaults to KMS server-side encryption"""
+    inline = block.children('server_side_encryption_configuration')
+    return any(_uses_kms(config) for config in inline) or block.labels[1] in ctx.kms_buckets
+
+
+def _bucket_access_blocked(block: Block, ctx: Context) -> Optional[bool]:
+    """Rule: bucket has a public access block that blocks public ACLs and policies"""
+    return block.labels[1] in ctx.access_blocked_buckets
+
+
+def _acl_not_in(acls: Set[str]) -> Callable[[Block, Context], Optional[bool]]:
+    """Rule: no public canned ACL"""
+    def rule(block: Block, ctx: Context) -> Optional[bool]:
+        acl = block.attrs.get('acl')
+        if isinstance(acl, Ref):
+            return None
+        return acl not in acls
+    return rule
+
+
+def _access_block_flag(flag: str) -> Callable[[Block, Context], Optional[bool]]:
+    """Rule: a public access block flag is true (Terraform defaults them to false)"""
+    def rule(block: Block, ctx: Context) -> Optional[bool]:
+        value = block.attrs.get(flag)
+        if isinstance(value, Ref):
+            return None
+        return value is True
+    return rule
+
+
+def _policy_statements(block: Block) -> Optional[List[Dict[str, Any]]]:
+    """Statements of a jsonencode({...}) or literal JSON policy"""
+    policy = block.attrs.get('policy')
+    if isinstance(policy, Call) and policy.name == 'jsonencode' and policy.args:
+        document = policy.args[0]
+    elif isinstance(policy, str) and not isinstance(policy, Ref):
+        try:
+            document = json.loads(policy)
+        except ValueError:
+            return None
+    else:
+        return None
+    if not isinstance(document, dict):
+        return None
+    statements = document.get('Statement', [])
+    return statements if isinstance(statements, list) else [statements]
+
+
+def _as_list(value: Any) -> List[Any]:
+    return value if isinstance(value, list) else [value]
+
+
+def _iam_rule(test: Callable[[List[Any], List[Any]], bool]) -> Callable[[Block, Context], Optional[bool]]:
+    """Rule: no Allow statement matches test(actions, resources)"""
+    def rule(block: Block, ctx: Context) -> Optional[bool]:
+        statements = _policy_statements(block)
+        if statements is None:
+            return None
+        for statement in statements:
+            if not isinstance(statement, dict) or statement.get('Effect') != 'Allow':
+                continue
+            if test(_as_list(statement.get('Action', [])), _as_list(statement.get('Resource', []))):
+                return False
+        return True
+    return rule
+
+
+# check_id -> (name, resource types, rule); IDs match the equivalent Checkov checks
+RULES = {
+    'CKV_AWS_24': ('Ensure no security groups allow ingress from 0.0.0.0:0 to port 22',
+                   SG_TYPES, _open_to_world(22)),
+    'CKV_AWS_25': ('Ensure no security groups allow ingress from 0.0.0.0:0 to port 3389',
+                   SG_TYPES, _open_to_world(3389)),
+    'CKV_AWS_8': ('Ensure all data stored in the Launch configuration or instance '
+                  'Elastic Blocks Store is securely encrypted',
+                  ['aws_instance', 'aws_launch_configuration'], _instance_ebs_encrypted),
+    'CKV_AWS_3': ('Ensure all data stored in the EBS is securely encrypted',
+                  ['aws_ebs_volume'], _volume_encrypted),
+    'CKV_AWS_145': ('Ensure that S3 buckets are encrypted with KMS by default',
+                    ['aws_s3_bucket'], _bucket_kms_encrypted),
+    'CKV_AWS_20': ('S3 Bucket has an ACL defined which allows public READ access',
+                   ['aws_s3_bucket', 'aws_s3_bucket_acl'], _acl_not_in(PUBLIC_READ_ACLS)),
+    'CKV_AWS_57': ('S3 Bucket has an ACL defined which allows public WRITE access',
+                   ['aws_s3_bucket', 'aws_s3_bucket_acl'], _acl_not_in({'public-read-write'})),
+    'CKV2_AWS_6': ('Ensure that S3 bucket has a Public Access block',
+                   ['aws_s3_bucket'], _bucket_access_blocked),
+    'CKV_AWS_53': ('Ensure S3 bucket has block public ACLS enabled',
+                   ['aws_s3_bucket_public_access_block'], _access_block_flag('block_public_acls')),
+    'CKV_AWS_54': ('Ensure S3 bucket has block public policy enabled',
+                   ['aws_s3_bucket_public_access_block'], _access_block_flag('block_public_policy')),
+    'CKV_AWS_55': ('Ensure S3 bucket has ignore public ACLs enabled',
+                   ['aws_s3_bucket_public_access_block'], _access_block_flag('ignore_public_acls')),
+    'CKV_AWS_56': ('Ensure S3 bucket has restrict_public_buckets enabled',
+                   ['aws_s3_bucket_public_access_block'],
+                   _access_block_flag('restrict_public_buckets')),
+    'CKV_AWS_62': ('Ensure IAM policies that allow full "*-*" administrative privileges are not created',
+                   IAM_POLICY_TYPES, _iam_rule(lambda actions, resources: '*' in actions and '*' in resources)),
+    'CKV_AWS_63': ('Ensure no IAM policies documents allow "*" as a statement\'s actions',
+                   IAM_POLICY_TYPES, _iam_rule(lambda actions, resources: '*' in actions)),
+    'CKV_AWS_355': ('Ensure no IAM policies allow wildcard actions on all resources',
+                    IAM_POLICY_TYPES,
+                    _iam_rule(lambda actions, resources: '*' in resources and any(
+                        isinstance(action, str) and (action == '*' or action.endswith(':*'))
+                        for action in actions))),
+}
+
+
+def rules_by_type(rules: Dict[str, Any]) -> Dict[str, List[Any]]:
+    """resource type -> [(check_id, name, rule)]"""
+    by_type: Dict[str, List[Any]] = {}
+    for check_id, (name, resource_types, rule) in rules.items():
+        for resource_type in resource_types:
+            by_type.setdefault(resource_type, []).append((check_id, name, rule))
+    return by_type
+
+
+def check_result(check_id: str, name: str, passed: bool, resource: str, resource_type: str,
+                 file_path: str, file_abs_path: str, line_range: List[int]) -> Dict[str, Any]:
+    """One Checkov-format check entry, plus the resource type (addresses may be module paths)"""
+    return {
+        'check_id': check_id,
+        'check_name': name,
+        'check': {'id': check_id, 'name': name},
+        'check_result': {'result': 'PASSED' if passed else 'FAILED'},
+        'resource': resource,
+        'resource_type': resource_type,
+        'file_path': file_path,
+        'file_abs_path': file_abs_path,
+        'file_line_range': line_range,
+        'guideline': ''
+    }
+
+
+class PreCheckEngine:
+    """Evaluates RULES against the Terraform files of a directory
+    
+    Produces a Checkov-format report, so SecurityScanner.parse_results turns
+    the findings into the same records (severity, resources, fingerprints)
+    as a full Checkov scan.
+    """
+    
+    def __init__(self, rules: Dict[str, Any] = None, use_cache: bool = True):
+        self.rules = rules or RULES
+        self.cache = HCLCache() if use_cache else None
+    
+    def _parse_all(self, root: Path) -> Dict[str, Any]:
+        """{'files': {relative: blocks}, 'errors': {relative: message}}"""
+        if self.cache:
+            return self.cache.parse_directory(root)
+        files, errors = {}, {}
+        for path in sorted(root.rglob('*.tf')):
+            relative = path.relative_to(root)
+            if '.terraform' in relative.parts:
+                continue
+            try:
+                files[relative.as_posix()] = parse_file(path)
+            except (HCLError, UnicodeDecodeError) as e:
+                errors[relative.as_posix()] = str(e)
+        return {'files': files, 'errors': errors}
+    
+    def load(self, terraform_dir: Path) -> Dict[str, Any]:
+        """Parse every .tf file under terraform_dir into a resource list"""
+        root = Path(terraform_dir)
+        parsed = self._parse_all(root)
+        resources = []
+        for name, blocks in parsed['files'].items():
+            for block in blocks:
+                if block.type == 'resource' and len(block.labels) == 2:
+                    resources.append({
+                        'type': block.labels[0],
+                        'block': block,
+                        'file_path': f"/{name}",
+                        'file_abs_path': str((root / name).resolve())
+                    })
+        errors = [{'file_path': f"/{name}", 'error': error}
+                  for name, error in parsed['errors'].items()]
+        return {'resources': resources, 'errors': errors}
+    
+    def scan(self, terraform_dir: Path) -> Dict[str, Any]:
+        """Run all rules and return a Checkov-format report"""
+        loaded = self.load(terraform_dir)
+        ctx = Context(loaded['resources'])
+        
+        by_type = rules_by_type(self.rules)
+        
+        passed, failed = [], []
+        for resource in loaded['resources']:
+            block = resource['block']
+            for check_id, name, rule in by_type.get(resource['type'], []):
+                outcome = rule(block, ctx)
+                if outcome is None:
+                    continue
+                check = check_result(check_id, name, outcome, '.'.join(block.labels),
+                                     block.labels[0], resource['file_path'],
+                                     resource['file_abs_path'],
+                                     [block.line, block.end_line])
+                (passed if outcome else failed).append(check)
+        
+        return {
+            'check_type': 'terraform',
+            'results': {'passed_checks': passed, 'failed_checks': failed, 'skipped_checks': []},
+            'summary': {
+                'passed': len(passed),
+                'failed': len(failed),
+                'skipped': 0,
+                'parsing_errors': len(loaded['errors']),
+                'resource_count': len(loaded['resources'])
+            },
+            'parsing_errors': loaded['errors']
+        }
+
+
+def main():
+    """Pre-commit entry point: report findings without touching the database"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Cloud Sentinel Fast Pre-check')
+    parser.add_argument('directory', nargs='?', default='terraform',
+                        help='Terraform directory to check')
+    parser.add_argument('--no-cache', action='store_true', help='Re-parse every file')
+    args = parser.parse_args()
+    
+    report = PreCheckEngine(use_cache=not args.no_cache).scan(Path(args.directory))
+    
+    for error in report['parsing_errors']:
+        print(f"⚠ {error['file_path']}: could not parse ({error['error']})", file=sys.stderr)
+    for check in report['results']['failed_checks']:
+        print(f"✗ {check['check_id']} {check['resource']} "
+              f"({check['file_path']}:{check['file_line_range'][0]}) - {check['check_name']}")
+    
+    summary = report['summary']
+    print(f"{summary['passed']} passed, {summary['failed']} failed "
+          f"({summary['resource_count']} resources)")
+    sys.exit(1 if summary['failed'] else 0)
+
+
+if __name__ == '__main__':
+    main()
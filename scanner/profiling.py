@@ -0,0 +1,178 @@
+"""
+CLOUD SENTINEL - Profiling Module
+Opt-in CPU (cProfile) and memory (tracemalloc) profiles of a scan, phase by phase
+"""
+
+import cProfile
+import json
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+PROFILE_MODES = ('cpu', 'memory')
+
+# Stack sampling period (seconds) for the flamegraph output
+SAMPLE_INTERVAL = 0.005
+
+# Functions / allocation sites listed in the text reports
+TOP_N = 30
+
+
+class ScanProfiler:
+    """Profile of one scan, split into named phases
+    
+    phase(name) ends the current phase and starts the next, stop() ends
+    the last one and save() writes the artifacts:
+        
+        cpu     cpu_<phase>.pstats, cpu.pstats (all phases) and cpu.txt,
+                cpu.folded: sampled stacks of the scanning thread, rooted
+                at the phase (flamegraph.pl, speedscope, inferno)
+        memory  memory_<phase>.txt: allocation sites that grew in the
+                phase; memory.txt: sites still allocated at the end
+        both    profile.json: wall time (and peak traced memory) per phase
+    
+    Checkov runs as a subprocess, so its work appears as time waiting in
+    subprocess.run rather than in Checkov's own functions.
+    """
+    
+    def __init__(self, mode: str):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode!r} (expected one of {', '.join(PROFILE_MODES)})")
+        self.mode = mode
+        self.phases: List[Dict[str, Any]] = []
+        self._current: Optional[Dict[str, Any]] = None
+        self._profiles: Dict[str, cProfile.Profile] = {}
+        self._samples: Dict[str, int] = {}
+        self._sampler: Optional[threading.Thread] = None
+        self._sampling = threading.Event()
+        self._thread_id = threading.get_ident()
+        self._owns_tracemalloc = False
+        self._snapshot = None
+        self._final_snapshot = None
+        
+        if mode == 'memory' and not tracemalloc.is_tracing():
+            tracemalloc.start()  # one frame: sites are reported by line
+            self._owns_tracemalloc = True
+        if mode == 'cpu':
+            self._sampler = threading.Thread(target=self._sample, name='profile-sampler', daemon=True)
+            self._sampler.start()
+    
+    def phase(self, name: str):
+        """End the current phase (if any) and start `name`"""
+        self._end_phase()
+        self._current = {'name': name, 'started': time.perf_counter()}
+        if self.mode == 'cpu':
+            profile = self._profiles.setdefault(name, cProfile.Profile())
+            profile.enable()
+        else:
+            tracemalloc.reset_peak()
+            self._snapshot = tracemalloc.take_snapshot()
+    
+    def _end_phase(self):
+        current, self._current = self._current, None
+        if current is None:
+            return
+        entry = {'name': current['name'],
+                 'seconds': round(time.perf_counter() - current['started'], 4)}
+        if self.mode == 'cpu':
+            self._profiles[current['name']].disable()
+        else:
+            entry['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+            snapshot = tracemalloc.take_snapshot()
+            entry['top'] = [str(stat) for stat in
+                            self._top(snapshot.compare_to(self._snapshot, 'lineno'))]
+            self._snapshot = None
+        self.phases.append(entry)
+    
+    def stop(self):
+        """End the last phase and stop sampling / tracing"""
+        self._end_phase()
+        if self._sampler is not None:
+            self._sampling.set()
+            self._sampler.join()
+            self._sampler = None
+        if self.mode == 'memory' and tracemalloc.is_tracing():
+            self._final_snapshot = tracemalloc.take_snapshot()
+            if self._owns_tracemalloc:
+                tracemalloc.stop()
+    
+    @staticmethod
+    def _top(statistics) -> list:
+        """First TOP_N statistics, leaving out the profiler's and tracemalloc's own
+        
+        (Filtering the statistics is much cheaper than Snapshot.filter_traces,
+        which matches every trace in Python.)
+        """
+        own = (tracemalloc.__file__, __file__)
+        return [stat for stat in statistics if stat.traceback[0].filename not in own][:TOP_N]
+    
+    def _sample(self):
+        """Count the scanning thread's stacks every SAMPLE_INTERVAL"""
+        while not self._sampling.wait(SAMPLE_INTERVAL):
+            current = self._current
+            frame = sys._current_frames().get(self._thread_id)
+            if current is None or frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            key = ';'.join([current['name']] + stack[::-1])
+            self._samples[key] = self._samples.get(key, 0) + 1
+    
+    def save(self, output_dir: Path) -> Path:
+        """Write the artifacts into output_dir (created); returns it"""
+        self.stop()
+        output_dir.mkdir(parents=True, exist_ok=True)
+        
+        if self.mode == 'cpu':
+            combined = None
+            for name, profile in self._profiles.items():
+                profile.dump_stats(str(output_dir / f"cpu_{name}.pstats"))
+                if combined is None:
+                    combined = pstats.Stats(profile)
+                else:
+                    combined.add(profile)
+            if combined is not None:
+                combined.dump_stats(str(output_dir / 'cpu.pstats'))
+                with open(output_dir / 'cpu.txt', 'w') as f:
+                    combined.stream = f
+                    combined.sort_stats('cumulative').print_stats(TOP_N)
+                    combined.sort_stats('tottime').print_stats(TOP_N)
+            with open(output_dir / 'cpu.folded', 'w') as f:
+                for stack, count in sorted(self._samples.items()):
+                    f.write(f"{stack} {count}\n")
+        else:
+            for entry in self.phases:
+                (output_dir / f"memory_{entry['name']}.txt").write_text(
+                    f"Peak traced memory: {entry['peak_bytes'] / 1024 / 1024:.1f} MiB\n"
+                    f"Top allocation sites grown during '{entry['name']}':\n"
+                    + ''.join(f"{line}\n" for line in entry['top']))
+            if self._final_snapshot is not None:
+                top = self._top(self._final_snapshot.statistics('lineno'))
+                (output_dir / 'memory.txt').write_text(
+                    "Top allocation sites still allocated at the end of the scan:\n"
+                    + ''.join(f"{stat}\n" for stat in top))
+        
+        summary = {'mode': self.mode,
+                   'phases': [{key: value for key, value in entry.items() if key != 'top'}
+                              for entry in self.phases]}
+        (output_dir / 'profile.json').write_text(json.dumps(summary, indent=2) + '\n')
+        return output_dir
+
+
+class NullProfiler:
+    """Stand-in used when profiling is off"""
+    
+    mode = None
+    
+    def phase(self, name: str):
+        pass
+    
+    def stop(self):
+        pass
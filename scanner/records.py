@@ -0,0 +1,77 @@
+"""
+CLOUD SENTINEL - Result Records Module
+Compact record type for individual Checkov check results
+"""
+
+import sys
+from typing import Dict, Any, Optional
+
+
+def _intern(value: Any) -> Any:
+    """Intern string values, passing anything else through unchanged"""
+    return sys.intern(value) if type(value) is str else value
+
+
+class CheckRecord:
+    """Single check result stored in slots instead of a per-check dict.
+    
+    Check IDs, resource types, file paths and severities repeat heavily
+    across a scan, so they are interned and shared between records.
+    Supports read-only mapping access (``record['severity']``,
+    ``record.get('file_line')``) so existing dict-based callers keep working.
+    """
+    
+    __slots__ = (
+        'check_id', 'check_name', 'status', 'severity', 'resource_type',
+        'resource_name', 'file_path', 'file_line', 'guideline', 'description'
+    )
+    
+    FIELDS = __slots__
+    
+    def __init__(self, check_id: str, check_name: str, status: str,
+                 severity: str, resource_type: str, resource_name: str,
+                 file_path: str, file_line: int, guideline: str,
+                 description: str):
+        self.check_id = _intern(check_id)
+        self.check_name = check_name
+        self.status = _intern(status)
+        self.severity = _intern(severity)
+        self.resource_type = _intern(resource_type)
+        self.resource_name = resource_name
+        self.file_path = _intern(file_path)
+        self.file_line = file_line
+        self.guideline = guideline
+        self.description = description
+    
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self.FIELDS
+    
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        """Dict-style lookup with a default"""
+        if key not in self.FIELDS:
+            return default
+        return getattr(self, key)
+    
+    def keys(self):
+        """Field names, in storage order"""
+        return self.FIELDS
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Materialize the record as a plain dict (e.g. for JSON output)"""
+        return {field: getattr(self, field) for field in self.FIELDS}
+    
+    def __repr__(self) -> str:
+        return (f"CheckRecord({self.status} {self.check_id} "
+                f"{self.resource_name} [{self.severity}])")
+    
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CheckRecord):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self.FIELDS)
+    
+    __hash__ = None
@@ -0,0 +1,256 @@
+"""
+CLOUD SENTINEL - Report Generation Module
+Renders HTML scan/diff reports from the database and converts them to PDF
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterator
+
+from config import Config
+from database import Database
+
+SEVERITY_ORDER = ['CRITICAL', 'HIGH', 'MEDIUM', 'LOW', 'INFO']
+
+TEMPLATES_DIR = Path(__file__).parent / 'templates'
+
+# PDF conversion runs off the caller's thread, one job at a time
+_pdf_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='report-pdf')
+
+
+def html_to_pdf(html_path: Path, pdf_path: Optional[Path] = None) -> Path:
+    """Convert an HTML report to PDF with WeasyPrint or wkhtmltopdf"""
+    html_path = Path(html_path)
+    pdf_path = Path(pdf_path) if pdf_path else html_path.with_suffix('.pdf')
+    tmp_path = pdf_path.with_name(pdf_path.name + '.tmp')
+    
+    try:
+        from weasyprint import HTML
+        HTML(filename=str(html_path)).write_pdf(str(tmp_path))
+    except ImportError:
+        wkhtmltopdf = shutil.which('wkhtmltopdf')
+        if not wkhtmltopdf:
+            raise RuntimeError(
+                "No PDF converter available. Install one: pip install weasyprint "
+                "(or put wkhtmltopdf on PATH)"
+            )
+        subprocess.run([wkhtmltopdf, '--quiet', str(html_path), str(tmp_path)],
+                       check=True, capture_output=True)
+    
+    os.replace(tmp_path, pdf_path)
+    return pdf_path
+
+
+def convert_to_pdf_async(html_path: Path, pdf_path: Optional[Path] = None) -> Future:
+    """Queue PDF conversion as a background job and return its Future"""
+    return _pdf_executor.submit(html_to_pdf, html_path, pdf_path)
+
+
+class ReportGenerator:
+    """Streams scan and diff reports from the database into HTML files
+    
+    Violations are read with fetchmany() and rendered one page (chunk) at a
+    time through a Jinja2 template stream, so memory stays flat no matter
+    how many violations a scan has.
+    """
+    
+    def __init__(self, db: Optional[Database] = None, output_dir: Optional[Path] = None,
+                 page_size: int = None):
+        self.db = db or Database()
+        self.output_dir = Path(output_dir) if output_dir else Config.get_reports_dir()
+        self.page_size = page_size or Config.REPORT_PAGE_SIZE
+        self._env = None
+    
+    @property
+    def env(self):
+        """Jinja2 environment, created on first use"""
+        if self._env is None:
+            from jinja2 import Environment, FileSystemLoader, select_autoescape
+            self._env = Environment(
+                loader=FileSystemLoader(str(TEMPLATES_DIR)),
+                autoescape=select_autoescape(['html'])
+            )
+        return self._env
+    
+    def _default_path(self, label: str) -> Path:
+        """Timestamped report path, e.g. reports/pipeline_initial_20260225_114543.html"""
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return self.output_dir / f"{label}_{timestamp}.html"
+    
+    @staticmethod
+    def _ordered(by_severity: Dict[str, int]) -> List[str]:
+        """Severities present in a summary, most severe first"""
+        known = [sev for sev in SEVERITY_ORDER if by_severity.get(sev)]
+        other = sorted(sev for sev in by_severity if sev not in SEVERITY_ORDER and by_severity[sev])
+        return known + other
+    
+    def _render(self, output_path: Path, **context) -> Path:
+        """Stream the template to a temp file and move it into place"""
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = output_path.with_name(output_path.name + '.tmp')
+        
+        stream = self.env.get_template('report.html').stream(
+            page_size=self.page_size,
+            generated=datetime.now().isoformat(timespec='seconds'),
+            **context
+        )
+        stream.enable_buffering(size=64)
+        
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                stream.dump(f)
+            os.replace(tmp_path, output_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        
+        return output_path
+    
+    def _severity_sections(self, by_severity: Dict[str, int], title: str,
+                           pages_for) -> Iterator[Dict[str, Any]]:
+        """One lazily-paged section per severity"""
+        for severity in self._ordered(by_severity):
+            yield {
+                'title': f"{title} - {severity}",
+                'count': by_severity[severity],
+                'pages': pages_for(severity)
+            }
+    
+    def generate_scan_report(self, scan_id: str, output_path: Optional[Path] = None,
+                             label: str = 'scan', pdf: bool = False) -> Dict[str, Any]:
+        """Render a report for one scan, grouped by severity
+        
+        Returns the HTML path and, with pdf=True, a Future for the PDF job.
+        """
+        scan = self.db.get_scan(scan_id)
+        if not scan:
+            raise ValueError(f"Scan not found: {scan_id}")
+        
+        by_severity = self.db.get_violation_summary(scan_id)
+        total = sum(by_severity.values())
+        
+        cards = [{'label': 'Total Violations', 'value': total, 'css': 'total'}]
+        cards += [{'label': sev.title(), 'value': by_severity.get(sev, 0), 'css': sev.lower()}
+                  for sev in ['CRITICAL', 'HIGH', 'MEDIUM', 'LOW']]
+        
+        status = '🚫 Deployment Blocked' if scan['blocked_deployment'] else '✅ Deployment Allowed'
+        subtitle = [
+            f"Scan: {scan_id} ({scan['status']})",
+            f"Branch: {scan['branch'] or '-'} | Commit: {scan['commit_hash'] or '-'}",
+            f"Checks: {scan['passed_checks']} passed, {scan['failed_checks']} failed, "
+            f"{scan['skipped_checks']} skipped | {status}"
+        ]
+        
+        sections = self._severity_sections(
+            by_severity, '🔍 Violations',
+            lambda sev: self.db.iter_violations(scan_id, severity=sev,
+                                                chunk_size=self.page_size)
+        )
+        
+        html_path = self._render(
+            output_path or self._default_path(label),
+            title='Infrastructure Security Report',
+            subtitle=subtitle,
+            cards=cards,
+            sections=sections
+        )
+        return self._finish(html_path, pdf)
+    
+    def generate_diff_report(self, base_scan_id: str, head_scan_id: str,
+                             output_path: Optional[Path] = None, label: str = 'diff',
+                             pdf: bool = False) -> Dict[str, Any]:
+        """Render new and fixed violations between two scans"""
+        for scan_id in (base_scan_id, head_scan_id):
+            if not self.db.get_scan(scan_id):
+                raise ValueError(f"Scan not found: {scan_id}")
+        
+        diff = self.db.get_diff_summary(base_scan_id, head_scan_id)
+        new, fixed = diff['new'], diff['fixed']
+        
+        cards = [
+            {'label': 'New Violations', 'value': sum(new.values()), 'css': 'total'},
+            {'label': 'New Critical', 'value': new.get('CRITICAL', 0), 'css': 'critical'},
+            {'label': 'New High', 'value': new.get('HIGH', 0), 'css': 'high'},
+            {'label': 'Fixed', 'value': sum(fixed.values()), 'css': 'fixed'}
+        ]
+        
+        def sections():
+            yield from self._severity_sections(
+                new, '🚨 New Violations',
+                lambda sev: self.db.iter_violation_diff(
+                    base_scan_id, head_scan_id, kind='new', severity=sev,
+                    chunk_size=self.page_size)
+            )
+            yield from self._severity_sections(
+                fixed, '✅ Fixed Violations',
+                lambda sev: self.db.iter_violation_diff(
+                    base_scan_id, head_scan_id, kind='fixed', severity=sev,
+                    chunk_size=self.page_size)
+            )
+        
+        html_path = self._render(
+            output_path or self._default_path(label),
+            title='Scan Comparison Report',
+            subtitle=[f"Base: {base_scan_id}", f"Head: {head_scan_id}"],
+            cards=cards,
+            sections=sections()
+        )
+        return self._finish(html_path, pdf)
+    
+    def _finish(self, html_path: Path, pdf: bool) -> Dict[str, Any]:
+        """Optionally queue PDF conversion for a rendered report"""
+        result = {'html': html_path, 'pdf': None}
+        if pdf:
+            result['pdf'] = convert_to_pdf_async(html_path)
+        return result
+
+
+def main():
+    """Main entry point"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Cloud Sentinel Report Generator')
+    parser.add_argument('--scan-id', type=str, help='Scan to report on (default: latest full scan)')
+    parser.add_argument('--base', type=str, help='Base scan ID for a diff report')
+    parser.add_argument('--label', type=str, help='Report file prefix')
+    parser.add_argument('-o', '--output', type=str, help='Output HTML path')
+    parser.add_argument('--pdf', action='store_true', help='Also convert to PDF')
+    
+    args = parser.parse_args()
+    
+    generator = ReportGenerator()
+    output = Path(args.output) if args.output else None
+    
+    scan_id = args.scan_id
+    if not scan_id:
+        scans = generator.db.get_recent_scans(1, kind='full')
+        if not scans:
+            print("Error: no scans found", file=sys.stderr)
+            sys.exit(2)
+        scan_id = scans[0]['scan_id']
+    
+    try:
+        if args.base:
+            result = generator.generate_diff_report(args.base, scan_id, output,
+                                                    label=args.label or 'diff', pdf=args.pdf)
+        else:
+            result = generator.generate_scan_report(scan_id, output,
+                                                    label=args.label or 'scan', pdf=args.pdf)
+        print(f"HTML report: {result['html']}")
+        
+        if result['pdf']:
+            print("Converting to PDF in background...")
+            print(f"PDF report: {result['pdf'].result()}")
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(2)
+
+
+if __name__ == '__main__':
+    main()
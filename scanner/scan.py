@@ -4,6 +4,7 @@ Runs Checkov security scans on Terraform code
 """
 
 import json
+import shutil
 import subprocess
 import sys
 import uuid
@@ -12,19 +13,32 @@ from pathlib import Path
 from typing import Dict, List, Any, Optional
 import time
 
+from artifacts import ArtifactStore
 from config import Config
 from database import Database
+from gate import Gate, GateEvaluator
 from logger import ScanLogger
+from plan import PlanScanner
+from precheck import PreCheckEngine
+from profiling import NullProfiler, ScanProfiler
+from records import CheckRecord
+from runner import run_checkov
+from workqueue import ShardQueue
 
 
 class SecurityScanner:
     """Main security scanner class using Checkov"""
     
-    def __init__(self):
+    def __init__(self, db: Database = None):
         self.config = Config
-        self.db = Database()
+        # Long-running callers (the scheduler) pass their own Database so
+        # each scan doesn't open another one, audit flusher and all
+        self.db = db or Database()
         self.logger = ScanLogger()
+        self.gate = Gate.from_config()
+        self.artifacts = ArtifactStore(self.db)
         self.scan_id = None
+        self._severity_cache: Dict[str, str] = {}
     
     def generate_scan_id(self) -> str:
         """Generate unique scan ID"""
@@ -32,86 +46,395 @@ class SecurityScanner:
         unique_id = str(uuid.uuid4())[:8]
         return f"scan_{timestamp}_{unique_id}"
     
-    def run_checkov(self, terraform_dir: Path) -> Dict[str, Any]:
-        """Run Checkov scan on Terraform directory"""
-        output_file = self.config.get_checkov_output_dir() / f"{self.scan_id}_results.json"
-        
-        cmd = [
-            'checkov',
-            '-d', str(terraform_dir),
-            '-o', 'json',
-            '--output-file-path', str(output_file.parent),
-            '--framework', 'terraform',
-            '--compact'
-        ]
+    def run_checkov(self, terraform_dir: Path, timeout: float = None,
+                    files: List[Path] = None, skip_paths: List[str] = None) -> Dict[str, Any]:
+        """Run Checkov on a Terraform directory (or only the given files), see runner.py
         
-        self.logger.info(f"Running Checkov scan on: {terraform_dir}")
-        self.logger.info(f"Command: {' '.join(cmd)}")
+        The caller archives the report (see archive_report), as distributed
+        workers hand theirs back instead.
+        """
+        return run_checkov(terraform_dir, timeout=timeout, files=files, skip_paths=skip_paths,
+                           logger=self.logger, scan_id=self.scan_id)
+    
+    def archive_report(self, unit: str, report: Any):
+        """Keep a unit's raw Checkov report in the compressed artifact store
         
+        A failure to archive is logged and the scan carries on.
+        """
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minute timeout
-            )
+            self.artifacts.store(self.scan_id, unit, report)
+        except Exception as e:
+            self.logger.error(f"Could not archive the report of unit {unit}: {e}")
+    
+    def prune_artifacts(self, keep: int = None):
+        """Drop all but the newest `keep` scan directories (profiles) and
+        archive segments past ARTIFACT_RETENTION_MONTHS
+        
+        Anything touched more recently than a unit may run is left alone, as
+        it may belong to a scan still in progress; work directories left
+        behind by killed processes are removed once they are older than that.
+        """
+        keep = self.config.CHECKOV_ARTIFACT_RETENTION if keep is None else keep
+        output_dir = self.config.get_checkov_output_dir()
+        stale_before = time.time() - 2 * self.config.CHECKOV_TIMEOUT_MAX
+        
+        scan_dirs = []
+        for path in output_dir.iterdir():
+            if not path.is_dir() or path.name == self.scan_id:
+                continue
+            if path.name.startswith('.scan_'):
+                if path.stat().st_mtime < stale_before:
+                    shutil.rmtree(path, ignore_errors=True)
+            elif path.name.startswith('scan_'):
+                scan_dirs.append((path.stat().st_mtime, path))
+        
+        scan_dirs.sort(reverse=True)
+        for mtime, path in scan_dirs[max(keep - 1, 0):]:
+            if mtime < stale_before:
+                shutil.rmtree(path, ignore_errors=True)
+        
+        self.artifacts.prune()
+    
+    def discover_units(self, terraform_dir: Path, mode: str = None) -> List[Dict[str, Any]]:
+        """Split a Terraform tree into independently scannable units
+        
+        In 'directory' mode every directory holding .tf files is one unit
+        (nested unit directories are skipped so nothing is scanned twice);
+        in 'file' mode every .tf file is its own unit. Unit names are paths
+        relative to terraform_dir, so timing history carries across checkouts.
+        """
+        mode = mode or self.config.SCAN_UNIT_MODE
+        root = Path(terraform_dir)
+        tf_files = sorted(
+            path for path in root.rglob('*.tf')
+            if '.terraform' not in path.relative_to(root).parts
+        )
+        
+        if mode == 'file':
+            return [
+                {'unit': path.relative_to(root).as_posix(), 'path': root,
+                 'files': [path], 'skip_paths': []}
+                for path in tf_files
+            ] or [{'unit': '.', 'path': root, 'files': None, 'skip_paths': []}]
+        
+        if mode != 'directory':
+            raise ValueError(f"Unknown scan unit mode: {mode} (expected 'directory' or 'file')")
+        
+        tf_dirs = sorted({path.parent for path in tf_files}) or [root]
+        units = []
+        for directory in tf_dirs:
+            nested = [other for other in tf_dirs if directory in other.parents]
+            units.append({
+                'unit': directory.relative_to(root).as_posix(),
+                'path': directory,
+                'files': None,
+                'skip_paths': [other.relative_to(directory).as_posix() for other in nested]
+            })
+        return units
+    
+    def _unit_timeout(self, unit: str, previous: Optional[Dict] = None) -> float:
+        """Timeout for one unit, derived from how long it took before
+        
+        Uses CHECKOV_TIMEOUT_FACTOR x the slowest of the unit's recent
+        successful runs (CHECKOV_TIMEOUT without history). A unit that
+        timed out in the scan being resumed gets at least double its last
+        timeout, so resuming makes progress instead of repeating the failure.
+        """
+        durations = self.db.get_unit_durations(unit)
+        if durations:
+            timeout = max(durations) * self.config.CHECKOV_TIMEOUT_FACTOR
+        else:
+            timeout = self.config.CHECKOV_TIMEOUT
+        
+        if previous and previous['status'] == 'timeout' and previous['timeout_seconds']:
+            timeout = max(timeout, previous['timeout_seconds'] * 2)
+        
+        return min(max(timeout, self.config.CHECKOV_TIMEOUT_MIN), self.config.CHECKOV_TIMEOUT_MAX)
+    
+    def _run_units(self, terraform_dir: Path, results: Dict[str, Any],
+                   checkpoints: Dict[str, Dict], counts_only: bool = False,
+                   gate: GateEvaluator = None) -> List[str]:
+        """Scan unit by unit, checkpointing each unit's results as it completes
+        
+        Units already completed in checkpoints are skipped. Timed-out or
+        failed units are recorded and the scan moves on; their names are
+        returned so the caller can mark the scan incomplete. With a gate,
+        each unit's findings are fed to it and no further units are started
+        once it blocks (results['gated'] is then set).
+        """
+        units = self.discover_units(terraform_dir)
+        done = [unit for unit in units
+                if checkpoints.get(unit['unit'], {}).get('status') == 'completed']
+        if done:
+            self.logger.info(f"Resuming: {len(done)} of {len(units)} units already completed")
+        
+        incomplete = []
+        for index, unit in enumerate(units, 1):
+            name = unit['unit']
+            previous = checkpoints.get(name)
             
-            # Checkov returns exit code 1 if there are failures
-            # This is expected behavior, not an error
+            if previous and previous['status'] == 'completed':
+                for key in ('passed', 'failed', 'skipped'):
+                    results['summary'][key] += previous[f'{key}_checks']
+                continue
             
-            # Try to read the JSON output file
-            json_output_file = output_file.parent / 'results_json.json'
-            if json_output_file.exists():
-                with open(json_output_file, 'r') as f:
-                    return json.load(f)
+            timeout = self._unit_timeout(name, previous)
+            self.logger.info(f"[{index}/{len(units)}] Unit {name} (timeout {timeout:.0f}s)")
+            self.db.start_scan_unit(self.scan_id, name, str(Path(terraform_dir).resolve()), timeout)
+            unit_start = time.time()
             
-            # If no file, try to parse stdout
-            if result.stdout:
-                try:
-                    return json.loads(result.stdout)
-                except json.JSONDecodeError:
-                    pass
+            try:
+                checkov_output = self.run_checkov(unit['path'], timeout=timeout,
+                                                  files=unit['files'],
+                                                  skip_paths=unit['skip_paths'])
+                self.archive_report(name, checkov_output)
+                unit_results = self.parse_results(checkov_output, counts_only=counts_only)
+            except subprocess.TimeoutExpired:
+                self.db.fail_scan_unit(self.scan_id, name, 'timeout', time.time() - unit_start,
+                                       f"Timed out after {timeout:.0f}s")
+                incomplete.append(name)
+                continue
+            except FileNotFoundError as e:
+                self.db.fail_scan_unit(self.scan_id, name, 'failed', time.time() - unit_start, str(e))
+                raise
+            except Exception as e:
+                self.logger.error(f"Unit {name} failed: {e}")
+                self.db.fail_scan_unit(self.scan_id, name, 'failed', time.time() - unit_start, str(e))
+                incomplete.append(name)
+                continue
             
-            # Return empty results if nothing found
-            return {'results': {'passed_checks': [], 'failed_checks': [], 'skipped_checks': []}}
+            self.db.complete_scan_unit(
+                self.scan_id, name, unit_results['summary'], unit_results['failed'],
+                unit_results['resources'].values(), time.time() - unit_start
+            )
+            self._add_unit_results(results, unit_results)
             
-        except subprocess.TimeoutExpired:
-            self.logger.error("Checkov scan timed out")
-            raise
-        except FileNotFoundError:
-            self.logger.error("Checkov not found. Please install it: pip install checkov")
-            raise
+            if gate is not None and gate.add_all(unit_results['failed']):
+                remaining = len(units) - index
+                if remaining:
+                    self.logger.warning(f"Gate decided: {gate.reason} - "
+                                        f"skipping {remaining} remaining unit(s)")
+                    results['gated'] = True
+                break
+        
+        # Violations of units finished in an earlier run live only in the DB
+        if done:
+            results['failed'] = self.db.get_violations(self.scan_id)
+        
+        results['summary']['total'] = (
+            results['summary']['passed'] +
+            results['summary']['failed'] +
+            results['summary']['skipped']
+        )
+        return incomplete
     
-    def parse_results(self, checkov_output: Dict[str, Any]) -> Dict[str, Any]:
-        """Parse Checkov output into structured format"""
-        results = {
-            'passed': [],
-            'failed': [],
-            'skipped': [],
-            'summary': {
-                'total': 0,
-                'passed': 0,
-                'failed': 0,
-                'skipped': 0
-            }
-        }
+    @staticmethod
+    def _add_unit_results(results: Dict[str, Any], unit_results: Dict[str, Any]):
+        """Fold one unit's parsed results into the scan's"""
+        for key in ('passed', 'failed', 'skipped'):
+            results['summary'][key] += unit_results['summary'][key]
+            results[key].extend(unit_results[key])
+        results['resources'].update(unit_results['resources'])
+    
+    def _run_units_distributed(self, terraform_dir: Path, results: Dict[str, Any],
+                               checkpoints: Dict[str, Dict], counts_only: bool = False,
+                               gate: GateEvaluator = None, local_workers: int = 0) -> List[str]:
+        """Like _run_units, but the units run on workers through the shard queue
+        
+        Units left to do are enqueued (see workqueue.py) with their timeouts.
+        Workers (scanner/worker.py on any node, plus local_workers started
+        here) run Checkov and post the reports back; each report is parsed
+        and checkpointed here as it arrives, so the scan record has a single
+        writer. Shards that fail on every attempt leave the scan incomplete,
+        as do the remaining ones if no worker made progress for
+        SHARD_IDLE_TIMEOUT seconds. Once a gate blocks, the rest is cancelled.
+        """
+        queue = ShardQueue()
+        root = Path(terraform_dir)
+        units = self.discover_units(terraform_dir)
+        
+        shards = []
+        done = 0
+        for unit in units:
+            name = unit['unit']
+            previous = checkpoints.get(name)
+            if previous and previous['status'] == 'completed':
+                for key in ('passed', 'failed', 'skipped'):
+                    results['summary'][key] += previous[f'{key}_checks']
+                done += 1
+                continue
+            timeout = self._unit_timeout(name, previous)
+            self.db.start_scan_unit(self.scan_id, name, str(Path(terraform_dir).resolve()), timeout)
+            shards.append({
+                'unit': name,
+                'timeout': timeout,
+                'root': str(root.resolve()),
+                'path': unit['path'].relative_to(root).as_posix(),
+                'files': [path.relative_to(root).as_posix() for path in unit['files'] or []],
+                'skip_paths': unit['skip_paths']
+            })
+        if done:
+            self.logger.info(f"Resuming: {done} of {len(units)} units already completed")
+        
+        queue.enqueue(self.scan_id, shards)
+        self.logger.info(f"Queued {len(shards)} shard(s) on {queue.path}"
+                         + (f", starting {local_workers} local worker(s)" if local_workers else ''))
+        workers = [
+            subprocess.Popen([sys.executable, str(Path(__file__).parent / 'worker.py'),
+                              '--queue', str(queue.path), '--id', f'{self.scan_id}-local-{n}'])
+            for n in range(local_workers)
+        ]
+        
+        pending = {shard['unit'] for shard in shards}
+        incomplete = []
+        
+        def merge(finished: List[Dict[str, Any]]) -> bool:
+            """Checkpoint every finished shard; True if the gate blocked on one"""
+            blocked = False
+            for shard in finished:
+                unit_name = shard['unit']
+                pending.discard(unit_name)
+                if shard['status'] != 'completed':
+                    self.logger.error(f"Unit {unit_name} failed after {shard['attempts']} "
+                                      f"attempt(s): {shard['error']}")
+                    self.db.fail_scan_unit(self.scan_id, unit_name, shard['failure'] or 'failed',
+                                           shard['duration_seconds'] or 0.0, shard['error'])
+                    incomplete.append(unit_name)
+                    continue
+                
+                self.archive_report(unit_name, shard['report'])
+                unit_results = self.parse_results(shard['report'], counts_only=counts_only)
+                self.db.complete_scan_unit(
+                    self.scan_id, unit_name, unit_results['summary'], unit_results['failed'],
+                    unit_results['resources'].values(), shard['duration_seconds']
+                )
+                self._add_unit_results(results, unit_results)
+                self.logger.info(f"Unit {unit_name} done by {shard['worker']} in "
+                                 f"{shard['duration_seconds']:.1f}s ({len(pending)} left)")
+                if gate is not None and gate.add_all(unit_results['failed']):
+                    blocked = True
+            return blocked
+        
+        last_activity = time.monotonic()
+        try:
+            while pending:
+                finished = queue.take_finished(self.scan_id)
+                if merge(finished) and pending:
+                    # Withdraw what is still queued or leased, then keep any
+                    # shard that completed in the meantime
+                    queue.cancel(self.scan_id)
+                    merge(queue.take_finished(self.scan_id))
+                    if pending:
+                        self.logger.warning(f"Gate decided: {gate.reason} - "
+                                            f"cancelled {len(pending)} remaining unit(s)")
+                        results['gated'] = True
+                        for unit_name in sorted(pending):
+                            self.db.fail_scan_unit(self.scan_id, unit_name, 'cancelled', 0.0,
+                                                   'Cancelled by the fail-fast gate')
+                        pending.clear()
+                
+                if not pending:
+                    break
+                queue.reap(self.scan_id)
+                if finished or queue.active(self.scan_id):
+                    last_activity = time.monotonic()
+                elif time.monotonic() - last_activity > self.config.SHARD_IDLE_TIMEOUT:
+                    self.logger.error(f"No worker picked up a shard for "
+                                      f"{self.config.SHARD_IDLE_TIMEOUT:.0f}s - giving up on "
+                                      f"{len(pending)} unit(s)")
+                    for unit_name in sorted(pending):
+                        self.db.fail_scan_unit(self.scan_id, unit_name, 'failed', 0.0,
+                                               'No worker available')
+                    incomplete.extend(sorted(pending))
+                    break
+                time.sleep(self.config.SHARD_POLL_SECONDS)
+        finally:
+            # Anything left (gate, idle timeout, coordinator error) is withdrawn
+            queue.cancel(self.scan_id)
+            queue.purge(self.scan_id)
+            for worker in workers:
+                worker.terminate()
+            for worker in workers:
+                worker.wait()
+        
+        # Violations of units finished in an earlier run live only in the DB
+        if done:
+            results['failed'] = self.db.get_violations(self.scan_id)
+        
+        results['summary']['total'] = (
+            results['summary']['passed'] +
+            results['summary']['failed'] +
+            results['summary']['skipped']
+        )
+        return incomplete
+    
+    def run_precheck(self, terraform_dir: Path) -> Dict[str, Any]:
+        """Evaluate the native fast-lane rules (see precheck.py) instead of Checkov"""
+        self.logger.info(f"Running fast pre-check on: {terraform_dir}")
+        report = PreCheckEngine().scan(terraform_dir)
+        for error in report['parsing_errors']:
+            self.logger.warning(f"Could not parse {error['file_path']}: {error['error']}")
+        return report
+    
+    def parse_plan(self, plan_file: Path, counts_only: bool = False,
+                   gate: GateEvaluator = None) -> Dict[str, Any]:
+        """Evaluate the native rules against a `terraform show -json` plan
+        
+        The plan is streamed resource change by resource change (see plan.py)
+        and folded into the same result structure as parse_results. With a
+        gate, reading stops as soon as it blocks (results['gated'] is set).
+        """
+        self.logger.info(f"Scanning plan file: {plan_file}")
+        results = self._empty_results()
+        plan_scanner = PlanScanner()
+        for report in plan_scanner.iter_reports(plan_file):
+            seen = len(results['failed'])
+            self._process_check_results(report, results, counts_only)
+            if gate is not None and gate.add_all(results['failed'][seen:]):
+                self.logger.warning(f"Gate decided: {gate.reason} - plan scan stopped early")
+                results['gated'] = True
+                break
+        
+        stats = plan_scanner.stats
+        self.logger.info(f"Plan: {stats['resource_changes']} resource changes, "
+                         f"{stats['evaluated']} evaluated, {stats['skipped']} skipped "
+                         f"(data sources / deletions)")
+        results['summary']['total'] = (
+            results['summary']['passed'] + 
+            results['summary']['failed'] + 
+            results['summary']['skipped']
+        )
+        return results
+    
+    def load_checkov_output(self, results_file: Path) -> Any:
+        """Load a Checkov JSON report produced elsewhere (e.g. checkov-action)"""
+        self.logger.info(f"Loading Checkov results from: {results_file}")
+        with open(results_file, 'r') as f:
+            return json.load(f)
+    
+    def parse_results(self, checkov_output: Dict[str, Any],
+                      counts_only: bool = False) -> Dict[str, Any]:
+        """Parse Checkov output into structured format
+        
+        With counts_only, passed and skipped checks are only counted and
+        their lists stay empty; failed checks are always materialized.
+        """
+        results = self._empty_results()
         
         # Handle different Checkov output formats
         if isinstance(checkov_output, list):
             # Multiple check types
             for check_type in checkov_output:
-                self._process_check_results(check_type, results)
+                self._process_check_results(check_type, results, counts_only)
         elif isinstance(checkov_output, dict):
             if 'results' in checkov_output:
-                self._process_check_results(checkov_output, results)
+                self._process_check_results(checkov_output, results, counts_only)
             else:
                 # Single result format
-                self._process_check_results({'results': checkov_output}, results)
+                self._process_check_results({'results': checkov_output}, results,
+                                            counts_only)
         
         # Calculate totals
-        results['summary']['passed'] = len(results['passed'])
-        results['summary']['failed'] = len(results['failed'])
-        results['summary']['skipped'] = len(results['skipped'])
         results['summary']['total'] = (
             results['summary']['passed'] + 
             results['summary']['failed'] + 
@@ -120,42 +443,124 @@ class SecurityScanner:
         
         return results
     
-    def _process_check_results(self, check_data: Dict, results: Dict):
+    @staticmethod
+    def _empty_results() -> Dict[str, Any]:
+        """Result accumulator shared by parse_results and unit scans"""
+        return {
+            'passed': [],
+            'failed': [],
+            'skipped': [],
+            'resources': {},
+            'summary': {
+                'total': 0,
+                'passed': 0,
+                'failed': 0,
+                'skipped': 0
+            }
+        }
+    
+    def _process_check_results(self, check_data: Dict, results: Dict,
+                               counts_only: bool = False):
         """Process individual check results"""
         if 'results' not in check_data:
             return
         
         check_results = check_data['results']
+        summary = results['summary']
         
-        # Process passed checks
-        for check in check_results.get('passed_checks', []):
-            results['passed'].append(self._format_check(check, 'PASSED'))
+        passed_checks = check_results.get('passed_checks', [])
+        failed_checks = check_results.get('failed_checks', [])
+        skipped_checks = check_results.get('skipped_checks', [])
+        
+        summary['passed'] += len(passed_checks)
+        summary['failed'] += len(failed_checks)
+        summary['skipped'] += len(skipped_checks)
+        
+        resources = results['resources']
         
         # Process failed checks
-        for check in check_results.get('failed_checks', []):
-            results['failed'].append(self._format_check(check, 'FAILED'))
+        for check in failed_checks:
+            record = self._format_check(check, 'FAILED')
+            results['failed'].append(record)
+            self._tally_resource(resources, check, record.severity)
+        
+        # Process passed checks
+        for check in passed_checks:
+            self._tally_resource(resources, check)
+            if not counts_only:
+                results['passed'].append(self._format_check(check, 'PASSED'))
         
         # Process skipped checks
-        for check in check_results.get('skipped_checks', []):
-            results['skipped'].append(self._format_check(check, 'SKIPPED'))
+        for check in skipped_checks:
+            self._tally_resource(resources, check)
+            if not counts_only:
+                results['skipped'].append(self._format_check(check, 'SKIPPED'))
+    
+    def _tally_resource(self, resources: Dict, check: Dict, severity: str = None):
+        """Fold one check into its resource's posture (checks, violations, max severity)"""
+        resource = check.get('resource') or ''
+        if not resource:
+            return
+        file_path = check.get('file_path') or ''
+        
+        entry = resources.get((resource, file_path))
+        if entry is None:
+            entry = resources[(resource, file_path)] = {
+                'resource_type': self._resource_type(check),
+                'resource_name': resource,
+                'file_path': file_path,
+                'check_count': 0,
+                'violation_count': 0,
+                'max_severity': None
+            }
+        
+        entry['check_count'] += 1
+        if severity:
+            entry['violation_count'] += 1
+            levels = self.config.SEVERITY_LEVELS
+            if (entry['max_severity'] is None
+                    or levels.get(severity, 0) > levels.get(entry['max_severity'], 0)):
+                entry['max_severity'] = severity
     
-    def _format_check(self, check: Dict, status: str) -> Dict[str, Any]:
+    @staticmethod
+    def _resource_type(check: Dict) -> str:
+        """Resource type of a check: given by native rules, else read off the address
+        
+        Addresses of resources in modules start with module.<name> segments,
+        e.g. module.app.aws_s3_bucket.logs[0] -> aws_s3_bucket.
+        """
+        if check.get('resource_type'):
+            return check['resource_type']
+        parts = (check.get('resource') or '').split('.')
+        while len(parts) > 2 and parts[0] == 'module':
+            parts = parts[2:]
+        return parts[0]
+    
+    def _format_check(self, check: Dict, status: str) -> CheckRecord:
         """Format a single check result"""
+        check_id = check.get('check_id', '')
+        check_info = check.get('check') or {}
+        resource = check.get('resource', '')
+        line_range = check.get('file_line_range')
+        
         # Determine severity based on check ID patterns
-        severity = self._determine_severity(check.get('check_id', ''))
+        severity = self._severity_cache.get(check_id)
+        if severity is None:
+            severity = self._determine_severity(check_id)
+            self._severity_cache[check_id] = severity
         
-        return {
-            'check_id': check.get('check_id', ''),
-            'check_name': check.get('check', {}).get('name', check.get('check_id', '')),
-            'status': status,
-            'severity': severity,
-            'resource_type': check.get('resource', '').split('.')[0] if check.get('resource') else '',
-            'resource_name': check.get('resource', ''),
-            'file_path': check.get('file_path', ''),
-            'file_line': check.get('file_line_range', [0])[0] if check.get('file_line_range') else 0,
-            'guideline': check.get('guideline', ''),
-            'description': check.get('check', {}).get('name', '')
-        }
+        return CheckRecord(
+            check_id=check_id,
+            check_name=check_info.get('name', check_id),
+            status=status,
+            severity=severity,
+            resource_type=self._resource_type(check),
+            resource_name=resource,
+            file_path=check.get('file_path', ''),
+            file_line=line_range[0] if line_range else 0,
+            guideline=check.get('guideline', ''),
+            description=check_info.get('name', '')
+        )
     
     def _determine_severity(self, check_id: str) -> str:
         """Determine severity based on check ID"""
@@ -179,55 +584,202 @@ class SecurityScanner:
             return 'LOW'
     
     def should_block_deployment(self, results: Dict[str, Any]) -> bool:
-        """Determine if deployment should be blocked based on results"""
-        for violation in results['failed']:
-            if violation['severity'] == 'CRITICAL' and self.config.BLOCK_ON_CRITICAL:
-                return True
-            if violation['severity'] == 'HIGH' and self.config.BLOCK_ON_HIGH:
-                return True
-        return False
+        """Determine if deployment should be blocked based on results (see gate.py)"""
+        return self.gate.evaluate(results['failed']).blocked
     
     def scan(self, terraform_dir: Path = None, commit_hash: str = None,
-             branch: str = None, triggered_by: str = 'manual') -> Dict[str, Any]:
-        """Run complete security scan"""
+             branch: str = None, triggered_by: str = 'manual',
+             counts_only: bool = False, results_file: Path = None,
+             resume_scan_id: str = None, fast: bool = False,
+             plan_file: Path = None, project: str = None,
+             fail_fast: bool = False, profile: str = None,
+             distributed: bool = False, local_workers: int = 0,
+             kind: str = None) -> Dict[str, Any]:
+        """Run complete security scan
+        
+        Set counts_only to skip materializing passed/skipped checks; the
+        summary counts are still exact. Pass results_file to ingest an
+        existing Checkov JSON report instead of running Checkov, or set fast
+        to evaluate only the native pre-check rules (milliseconds, no Checkov).
+        Pass plan_file to evaluate those rules against a JSON plan instead.
+        The scan is filed under project (default: Config.SCAN_PROJECT).
+        
+        With fail_fast, the deployment gate is evaluated as results come in
+        and scanning stops once it blocks: the native rules run first and,
+        if they already block, Checkov is not started; otherwise no Checkov
+        unit is started after the gate blocks. Such a scan ends 'gated'.
+        
+        Checkov runs unit by unit (see discover_units) and each unit is
+        checkpointed in the database when it finishes. Units that time out
+        leave the scan 'incomplete'; pass its ID as resume_scan_id to run
+        only the units that did not finish.
+        
+        With distributed (or local_workers), the Checkov units are queued as
+        shards for workers (scanner/worker.py) on any number of nodes and
+        merged into this scan as they finish; local_workers starts that many
+        worker processes here as well.
+        
+        Set profile to 'cpu' or 'memory' (default: Config.SCAN_PROFILE) to
+        profile each phase of the scan; the artifacts are written to the
+        scan's artifact directory, also when the scan fails, and linked from
+        its record (profile_path).
+        
+        kind overrides the scan kind derived from the options (see
+        Database.create_scan); only 'full' scans update the finding lifecycle
+        and count as a branch's latest scan, so e.g. reingests pass 'reingest'.
+        """
+        profile = self.config.SCAN_PROFILE if profile is None else profile
+        profiler = ScanProfiler(profile) if profile else NullProfiler()
+        profile_dir = None
+        self.scan_id = None  # set by _scan once the scan has a record
+        try:
+            result = self._scan(profiler, terraform_dir, commit_hash, branch, triggered_by,
+                                counts_only, results_file, resume_scan_id, fast, plan_file,
+                                project, fail_fast, distributed or local_workers > 0,
+                                local_workers, kind)
+        finally:
+            profiler.stop()
+            if profiler.mode and self.scan_id:
+                profile_dir = self._save_profile(profiler)
+        if profile_dir:
+            result['profile_path'] = str(profile_dir)
+        return result
+    
+    def _save_profile(self, profiler: ScanProfiler) -> Optional[Path]:
+        """Write the scan's profile next to its Checkov reports and link it"""
+        try:
+            profile_dir = profiler.save(self.config.get_scan_artifact_dir(self.scan_id) / 'profile')
+            self.db.set_scan_profile(self.scan_id, str(profile_dir))
+        except Exception as e:
+            # Never fail (or mask the failure of) a scan over its profile
+            self.logger.warning(f"Could not save the {profiler.mode} profile: {e}")
+            return None
+        self.logger.info(f"{profiler.mode.upper()} profile: {profile_dir}")
+        return profile_dir
+    
+    def _scan(self, profiler, terraform_dir: Optional[Path], commit_hash: Optional[str],
+              branch: Optional[str], triggered_by: str, counts_only: bool,
+              results_file: Optional[Path], resume_scan_id: Optional[str], fast: bool,
+              plan_file: Optional[Path], project: Optional[str],
+              fail_fast: bool, distributed: bool, local_workers: int,
+              kind: Optional[str]) -> Dict[str, Any]:
+        """Body of scan(); profiler.phase() marks where each phase starts"""
+        profiler.phase('setup')
         start_time = time.time()
+        previous_duration = 0.0
+        checkpoints = {}
         
         # Setup
+        if resume_scan_id:
+            scan = self.db.get_scan(resume_scan_id)
+            if not scan:
+                raise ValueError(f"Scan not found: {resume_scan_id}")
+            if scan['status'] == 'completed':
+                raise ValueError(f"Scan already completed: {resume_scan_id}")
+            if scan['status'] == 'gated':
+                raise ValueError(f"Scan was stopped by the fail-fast gate, run a full scan "
+                                 f"instead: {resume_scan_id}")
+            checkpoints = {unit['unit']: unit for unit in self.db.get_scan_units(resume_scan_id)}
+            if terraform_dir is None and checkpoints:
+                terraform_dir = Path(next(iter(checkpoints.values()))['target'])
+            previous_duration = scan['duration_seconds'] or 0.0
+            project = scan['project']
+            self.scan_id = resume_scan_id
+        else:
+            self.scan_id = self.generate_scan_id()
         terraform_dir = terraform_dir or self.config.get_terraform_dir()
-        self.scan_id = self.generate_scan_id()
+        project = project or self.config.SCAN_PROJECT
+        # Fast lane and plan scans run a subset of the checks (see Database.create_scan)
+        kind = kind or ('plan' if plan_file else 'fast' if fast else 'full')
         
         self.logger.info("=" * 60)
-        self.logger.info("CLOUD SENTINEL - Security Scan Started")
+        self.logger.info("CLOUD SENTINEL - Security Scan " + ("Resumed" if resume_scan_id else "Started"))
         self.logger.info("=" * 60)
         self.logger.info(f"Scan ID: {self.scan_id}")
-        self.logger.info(f"Target: {terraform_dir}")
+        self.logger.info(f"Project: {project}")
+        self.logger.info(f"Target: {plan_file or results_file or terraform_dir}")
         self.logger.info(f"Triggered by: {triggered_by}")
         
-        # Create scan record in database
-        self.db.create_scan(
-            scan_id=self.scan_id,
-            commit_hash=commit_hash,
-            branch=branch,
-            triggered_by=triggered_by
-        )
+        # Create (or reopen) scan record in database
+        if resume_scan_id:
+            self.db.reopen_scan(self.scan_id)
+        else:
+            self.db.create_scan(
+                scan_id=self.scan_id,
+                commit_hash=commit_hash,
+                branch=branch,
+                triggered_by=triggered_by,
+                project=project,
+                kind=kind
+            )
+        
+        results = self._empty_results()
+        incomplete = []
+        gate = self.gate.evaluator() if fail_fast else None
         
         try:
-            # Run Checkov
-            checkov_output = self.run_checkov(terraform_dir)
+            prechecked = None
+            if fail_fast and not (results_file or fast or plan_file):
+                # The native rules settle most blocking verdicts in milliseconds
+                profiler.phase('precheck')
+                prechecked = self.parse_results(self.run_precheck(terraform_dir),
+                                                counts_only=counts_only)
+                if self.gate.evaluate(prechecked['failed']).blocked:
+                    self.logger.warning("Gate decided by the fast pre-check - Checkov not started")
+                    prechecked['gated'] = True
+                    kind = 'fast'
+                    self.db.set_scan_kind(self.scan_id, kind)
+                else:
+                    prechecked = None
             
-            # Parse results
-            results = self.parse_results(checkov_output)
+            profiler.phase('scan')
+            if results_file or fast or plan_file or prechecked:
+                # Ingest a report Checkov already produced, run the fast lane or scan a plan
+                if prechecked:
+                    results = prechecked
+                elif plan_file:
+                    results = self.parse_plan(plan_file, counts_only=counts_only, gate=gate)
+                else:
+                    if results_file:
+                        report = self.load_checkov_output(results_file)
+                        self.archive_report('.', report)
+                    else:
+                        report = self.run_precheck(terraform_dir)
+                    results = self.parse_results(report, counts_only=counts_only)
+                
+                # Store violations (records support the mapping access the DB uses)
+                profiler.phase('store')
+                self.db.add_violations_batch(self.scan_id, results['failed'])
+                
+                # Store the per-resource posture index
+                self.db.add_resources_batch(self.scan_id, results['resources'].values())
+            else:
+                # Run Checkov per unit; each unit's results are stored as it completes
+                if distributed:
+                    incomplete = self._run_units_distributed(
+                        terraform_dir, results, checkpoints, counts_only=counts_only,
+                        gate=gate, local_workers=local_workers)
+                else:
+                    incomplete = self._run_units(terraform_dir, results, checkpoints,
+                                                 counts_only=counts_only, gate=gate)
+                self.prune_artifacts()
             
-            # Determine if deployment should be blocked
-            blocked = self.should_block_deployment(results)
+            # Determine if deployment should be blocked (an incomplete scan can't clear it)
+            profiler.phase('finalize')
+            verdict = self.gate.evaluate(results['failed'])
+            blocked = verdict.blocked or bool(incomplete)
+            if results.get('gated'):
+                status = 'gated'
+            else:
+                status = 'incomplete' if incomplete else 'completed'
             
             # Calculate duration
-            duration = time.time() - start_time
+            duration = previous_duration + time.time() - start_time
             
             # Update scan record
             self.db.update_scan(
                 scan_id=self.scan_id,
-                status='completed',
+                status=status,
                 total_checks=results['summary']['total'],
                 passed_checks=results['summary']['passed'],
                 failed_checks=results['summary']['failed'],
@@ -236,56 +788,58 @@ class SecurityScanner:
                 blocked_deployment=blocked
             )
             
-            # Store violations
-            violations_to_store = [
-                {
-                    'check_id': v['check_id'],
-                    'check_name': v['check_name'],
-                    'severity': v['severity'],
-                    'resource_type': v['resource_type'],
-                    'resource_name': v['resource_name'],
-                    'file_path': v['file_path'],
-                    'file_line': v['file_line'],
-                    'guideline': v['guideline'],
-                    'description': v['description']
-                }
-                for v in results['failed']
-            ]
-            self.db.add_violations_batch(self.scan_id, violations_to_store)
+            # Fast lane and plan scans run a subset of checks, so they can't mark findings fixed
+            if status == 'completed' and kind == 'full':
+                lifecycle = self.db.record_lifecycle(self.scan_id)
+                self.logger.info(f"Lifecycle: {lifecycle['fixed']} finding(s) fixed since the "
+                                 f"last scan of this branch")
             
             # Log results
-            self._log_results(results, blocked, duration)
+            profiler.phase('report')
+            self._log_results(results, blocked, duration, verdict.reason)
+            if incomplete:
+                self.logger.warning(f"Scan incomplete - {len(incomplete)} unit(s) did not finish: "
+                                    f"{', '.join(incomplete)}")
+                self.logger.warning(f"Resume with: python scanner/scan.py --resume {self.scan_id}")
             
             # Return complete results
             return {
                 'scan_id': self.scan_id,
-                'status': 'completed',
+                'project': project,
+                'kind': kind,
+                'status': status,
                 'blocked': blocked,
+                'gate_reason': verdict.reason,
                 'duration_seconds': duration,
                 'summary': results['summary'],
+                'incomplete_units': incomplete,
+                'resources': list(results['resources'].values()),
                 'violations': results['failed'],
                 'passed': results['passed'],
                 'skipped': results['skipped']
             }
-            
+        
         except Exception as e:
-            duration = time.time() - start_time
+            duration = previous_duration + time.time() - start_time
             self.logger.error(f"Scan failed: {str(e)}")
             
+            # Units stored so far stay checkpointed; the counts reflect them
+            summary = results['summary']
             self.db.update_scan(
                 scan_id=self.scan_id,
                 status='failed',
-                total_checks=0,
-                passed_checks=0,
-                failed_checks=0,
-                skipped_checks=0,
+                total_checks=summary['passed'] + summary['failed'] + summary['skipped'],
+                passed_checks=summary['passed'],
+                failed_checks=summary['failed'],
+                skipped_checks=summary['skipped'],
                 duration_seconds=duration,
                 blocked_deployment=True
             )
             
             raise
     
-    def _log_results(self, results: Dict, blocked: bool, duration: float):
+    def _log_results(self, results: Dict, blocked: bool, duration: float,
+                     reason: str = None):
         """Log scan results"""
         self.logger.info("")
         self.logger.info("=" * 60)
@@ -321,7 +875,7 @@ class SecurityScanner:
         self.logger.info("")
         self.logger.info("=" * 60)
         if blocked:
-            self.logger.error("DEPLOYMENT BLOCKED - Critical/High severity issues found!")
+            self.logger.error(f"DEPLOYMENT BLOCKED - {reason or 'Critical/High severity issues found!'}")
         else:
             self.logger.success("DEPLOYMENT ALLOWED - No blocking issues found")
         self.logger.info("=" * 60)
@@ -336,10 +890,42 @@ def main():
                        help='Terraform directory to scan')
     parser.add_argument('--commit', type=str, help='Git commit hash')
     parser.add_argument('--branch', type=str, help='Git branch name')
+    parser.add_argument('--project', type=str,
+                       help='Project / repository to file the scan under (default: $SCAN_PROJECT)')
     parser.add_argument('--triggered-by', type=str, default='manual',
                        help='What triggered this scan')
+    parser.add_argument('--results-file', type=str,
+                       help='Ingest an existing Checkov JSON report instead of running Checkov')
+    parser.add_argument('--ci', action='store_true',
+                       help='CI mode: also write GitHub step outputs, job summary and PR comment')
+    parser.add_argument('--comment-file', type=str,
+                       help='CI mode: write a PR comment body (markdown) to this file')
+    parser.add_argument('--soft-fail', action='store_true',
+                       help='Exit 0 even when deployment would be blocked, or when the '
+                            '--results-file report is missing or unreadable')
+    parser.add_argument('--resume', type=str, metavar='SCAN_ID',
+                       help='Resume an incomplete or failed scan, skipping finished units')
+    parser.add_argument('--fast', action='store_true',
+                       help='Native fast-lane rules only (pre-commit speed, no Checkov)')
+    parser.add_argument('--plan', type=str, metavar='PLAN_JSON',
+                       help='Scan a `terraform show -json` plan file (native rules, streamed)')
+    parser.add_argument('--fail-fast', action='store_true',
+                       help='Stop scanning as soon as the deployment gate blocks')
+    parser.add_argument('--distributed', action='store_true',
+                       help='Queue the units for scanner/worker.py workers and merge their results')
+    parser.add_argument('--local-workers', type=int, default=0, metavar='N',
+                       help='Distributed scan with N worker processes on this host (plus any others)')
+    parser.add_argument('--profile', choices=['cpu', 'memory'],
+                       help='Profile each scan phase (cProfile or tracemalloc) into the '
+                            'scan\'s artifact directory (default: $SCAN_PROFILE)')
     
     args = parser.parse_args()
+    if sum(map(bool, (args.resume, args.results_file, args.fast, args.plan))) > 1:
+        parser.error('--resume, --results-file, --fast and --plan are mutually exclusive')
+    if args.fail_fast and args.resume:
+        parser.error('--fail-fast cannot be combined with --resume')
+    if (args.distributed or args.local_workers) and (args.results_file or args.fast or args.plan):
+        parser.error('--distributed only applies to Checkov scans')
     
     scanner = SecurityScanner()
     
@@ -350,17 +936,38 @@ def main():
             terraform_dir=terraform_dir,
             commit_hash=args.commit,
             branch=args.branch,
-            triggered_by=args.triggered_by
+            triggered_by=args.triggered_by,
+            counts_only=True,  # CLI only needs failures plus counts
+            results_file=Path(args.results_file) if args.results_file else None,
+            resume_scan_id=args.resume,
+            fast=args.fast,
+            plan_file=Path(args.plan) if args.plan else None,
+            project=args.project,
+            fail_fast=args.fail_fast,
+            profile=args.profile,
+            distributed=args.distributed,
+            local_workers=args.local_workers
         )
         
+        if args.ci:
+            from ci import publish_results
+            publish_results(results, commit_hash=args.commit, branch=args.branch,
+                            comment_file=Path(args.comment_file) if args.comment_file else None)
+        
         # Exit with error code if deployment blocked
-        if results['blocked']:
+        if results['blocked'] and not args.soft_fail:
             sys.exit(1)
         sys.exit(0)
-        
+    
     except Exception as e:
-        print(f"Error: {e}", file=sys.stderr)
-        sys.exit(2)
+        # A missing or unreadable report only warns under --soft-fail
+        soft = args.soft_fail and bool(args.results_file) and isinstance(
+            e, (OSError, json.JSONDecodeError, UnicodeDecodeError))
+        print(f"{'Warning' if soft else 'Error'}: {e}", file=sys.stderr)
+        if args.ci:
+            from ci import publish_failure
+            publish_failure(str(e), warning=soft)
+        sys.exit(0 if soft else 2)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+CLOUD SENTINEL - Scan Scheduler
+Debounces and coalesces scan triggers into as few Checkov runs as possible
+
+Usage:
+    python scanner/scheduler.py trigger --triggered-by push --branch main --commit abc123
+    python scanner/scheduler.py run                  # dispatch loop (plus SCAN_SCHEDULES)
+    python scanner/scheduler.py run --once           # dispatch what is due, then exit
+    python scanner/scheduler.py status
+"""
+
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config import Config
+from database import Database
+
+_INTERVAL_RE = re.compile(r'^(\d+(?:\.\d+)?)\s*([smhd]?)$')
+_UNITS = {'': 1, 's': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_interval(text: str) -> float:
+    """'90', '15m', '6h', '1d' -> seconds"""
+    match = _INTERVAL_RE.match(text.strip().lower())
+    if not match:
+        raise ValueError(f"Invalid interval: {text!r} (expected e.g. 30m, 6h or 1d)")
+    return float(match.group(1)) * _UNITS[match.group(2)]
+
+
+def parse_schedules(spec: str) -> Dict[str, float]:
+    """'main=6h,develop=1d' -> {'main': 21600.0, 'develop': 86400.0}"""
+    schedules = {}
+    for item in spec.split(','):
+        if not item.strip():
+            continue
+        branch, sep, interval = item.partition('=')
+        if not sep:
+            raise ValueError(f"Invalid schedule: {item!r} (expected BRANCH=INTERVAL)")
+        schedules[branch.strip()] = parse_interval(interval)
+    return schedules
+
+
+class ScanScheduler:
+    """Turns scan triggers (pushes, dashboard clicks, cron) into scan runs
+    
+    Every trigger is stored as a request. Pending requests for the same
+    target - project, Terraform directory and branch - form one group,
+    which is dispatched as a single scan once no trigger has arrived for
+    `debounce` seconds (a burst of pushes keeps pushing it back), but at
+    most `max_delay` seconds after the group's first trigger. The scan
+    runs the newest commit and satisfies every request in the group.
+    
+    A group never runs twice at once: triggers arriving during its scan
+    wait for the next run, unless they name the commit being scanned.
+    A trigger for a commit that already has a completed full scan of that
+    target on that branch is answered with that scan (pass force to
+    rescan); fast-lane, plan and reingested scans don't count.
+    
+    Periodic schedules ({branch: seconds}) add a 'schedule' trigger when
+    the branch's latest completed full scan of the target, whatever
+    triggered it, is older than its interval, so cron never repeats a scan
+    a push just ran.
+    
+    A dispatched group holds its requests under a lease that is renewed
+    while the scan runs; recover() only requeues requests whose lease ran
+    out, so several schedulers (a loop next to cron --once) can share a
+    database without running a group twice.
+    """
+    
+    def __init__(self, db: Database = None, debounce: float = None, max_delay: float = None,
+                 schedules: Dict[str, float] = None, scan_options: Dict[str, Any] = None,
+                 lease_seconds: float = None):
+        self.db = db or Database()
+        self.lease_seconds = lease_seconds or Config.SCHEDULER_LEASE_SECONDS
+        self.debounce = Config.SCHEDULER_DEBOUNCE_SECONDS if debounce is None else debounce
+        self.max_delay = max(self.debounce, Config.SCHEDULER_MAX_DELAY_SECONDS
+                             if max_delay is None else max_delay)
+        self.schedules = (parse_schedules(Config.SCAN_SCHEDULES)
+                          if schedules is None else schedules)
+        self.scan_options = scan_options or {}
+        with self.db.get_connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS scan_requests (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    project TEXT NOT NULL,
+                    target TEXT NOT NULL,
+                    branch TEXT NOT NULL DEFAULT '',
+                    commit_hash TEXT,
+                    triggered_by TEXT NOT NULL,
+                    requested_at REAL NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    started_at REAL,
+                    finished_at REAL,
+                    scan_id TEXT,
+                    error TEXT
+                )
+            ''')
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_scan_requests_group
+                ON scan_requests(status, project, target, branch)
+            ''')
+            Database._ensure_columns(conn.cursor(), 'scan_requests', {'lease_expires': 'REAL'})
+    
+    @staticmethod
+    def _target(terraform_dir: Optional[Path]) -> str:
+        return str(Path(terraform_dir or Config.get_terraform_dir()).resolve())
+    
+    # Completed full Checkov scans of a target (its units record the directory scanned)
+    _FULL_SCANS = '''
+        FROM scans s
+        WHERE s.project = ? AND s.branch IS ? AND s.status = 'completed' AND s.kind = 'full'
+          AND EXISTS (SELECT 1 FROM scan_units u WHERE u.scan_id = s.scan_id AND u.target = ?)
+    '''
+    
+    def submit(self, triggered_by: str, branch: str = None, commit_hash: str = None,
+               terraform_dir: Path = None, project: str = None,
+               force: bool = False, debounce: bool = True) -> Dict[str, Any]:
+        """Record a trigger; returns the request and how it will be served
+        
+        debounce=False makes the request due at once (periodic triggers
+        don't come in bursts); it still joins its group's scan.
+        """
+        project = project or Config.SCAN_PROJECT
+        target = self._target(terraform_dir)
+        branch = branch or ''
+        now = time.time()
+        requested_at = now if debounce else now - self.debounce
+        
+        with self.db.get_connection() as conn:
+            scanned = None
+            if commit_hash and not force:
+                scanned = conn.execute(f'''
+                    SELECT s.scan_id {self._FULL_SCANS} AND s.commit_hash = ?
+                    ORDER BY s.id DESC LIMIT 1
+                ''', (project, branch or None, target, commit_hash)).fetchone()
+            cursor = conn.execute('''
+                INSERT INTO scan_requests
+                (project, target, branch, commit_hash, triggered_by, requested_at,
+                 status, finished_at, scan_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (project, target, branch, commit_hash, triggered_by, requested_at,
+                  'done' if scanned else 'pending', now if scanned else None,
+                  scanned[0] if scanned else None))
+            request_id = cursor.lastrowid
+            group = conn.execute('''
+                SELECT COUNT(*), MIN(requested_at) FROM scan_requests
+                WHERE status = 'pending' AND project = ? AND target = ? AND branch = ?
+            ''', (project, target, branch)).fetchone()
+        
+        if scanned:
+            return {'request_id': request_id, 'status': 'done', 'scan_id': scanned[0],
+                    'message': f"Commit {commit_hash} was already scanned ({scanned[0]})"}
+        due = min(requested_at + self.debounce, group[1] + self.max_delay)
+        return {'request_id': request_id, 'status': 'pending', 'pending_in_group': group[0],
+                'due_in_seconds': round(max(due - now, 0), 1),
+                'message': f"Scan queued; runs in {max(due - now, 0):.0f}s unless more triggers "
+                           f"arrive ({group[0]} pending for this branch)"}
+    
+    def due_groups(self, now: float = None) -> List[Dict[str, Any]]:
+        """Pending groups whose debounce window has closed and that aren't running"""
+        now = time.time() if now is None else now
+        with self.db.get_read_connection() as conn:
+            groups = conn.execute('''
+                SELECT p.project, p.target, p.branch, COUNT(*) AS requests,
+                       MIN(p.requested_at) AS first_at, MAX(p.requested_at) AS last_at
+                FROM scan_requests p
+                WHERE p.status = 'pending'
+                  AND NOT EXISTS (SELECT 1 FROM scan_requests r
+                                  WHERE r.status = 'running' AND r.project = p.project
+                                    AND r.target = p.target AND r.branch = p.branch)
+                GROUP BY p.project, p.target, p.branch
+                ORDER BY first_at
+            ''').fetchall()
+        return [dict(group) for group in groups
+                if min(group['last_at'] + self.debounce, group['first_at'] + self.max_delay) <= now]
+    
+    def _claim(self, group: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Atomically mark a group's pending requests running (none if another process won)"""
+        now = time.time()
+        with self.db.get_connection() as conn:
+            rows = conn.execute('''
+                UPDATE scan_requests SET status = 'running', started_at = ?, lease_expires = ?
+                WHERE status = 'pending' AND project = ? AND target = ? AND branch = ?
+                  AND NOT EXISTS (SELECT 1 FROM scan_requests r
+                                  WHERE r.status = 'running' AND r.project = ?
+                                    AND r.target = ? AND r.branch = ?)
+                RETURNING id, commit_hash, triggered_by, requested_at
+            ''', (now, now + self.lease_seconds, group['project'], group['target'],
+                  group['branch'], group['project'], group['target'],
+                  group['branch'])).fetchall()
+        return sorted((dict(row) for row in rows), key=lambda row: (row['requested_at'], row['id']))
+    
+    def dispatch(self, group: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Run one scan for a due group; returns the scan result (None if not claimed)"""
+        from scan import SecurityScanner
+        
+        requests = self._claim(group)
+        if not requests:
+            return None
+        ids = [request['id'] for request in requests]
+        commit_hash = next((request['commit_hash'] for request in reversed(requests)
+                            if request['commit_hash']), None)
+        triggered_by = ','.join(sorted({request['triggered_by'] for request in requests}))
+        print(f"Scanning {group['target']} ({group['branch'] or 'no branch'}"
+              f"{', ' + commit_hash[:12] if commit_hash else ''}) for {len(ids)} request(s): "
+              f"{triggered_by}")
+        
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(ids, stop),
+                                     name='request-heartbeat', daemon=True)
+        heartbeat.start()
+        scanner = None
+        result, error = None, None
+        try:
+            scanner = SecurityScanner(db=self.db)
+            result = scanner.scan(terraform_dir=Path(group['target']), commit_hash=commit_hash,
+                                  branch=group['branch'] or None, triggered_by=triggered_by,
+                                  project=group['project'], counts_only=True,
+                                  **self.scan_options)
+        except Exception as e:
+            error = str(e)
+        finally:
+            stop.set()
+            heartbeat.join()
+            self._finish(group, ids, scanner.scan_id if scanner else None, commit_hash,
+                         result, error)
+        return result
+    
+    def _heartbeat(self, ids: List[int], stop: threading.Event):
+        """Renew the lease on a running group's requests every third of its length"""
+        while not stop.wait(self.lease_seconds / 3):
+            with self.db.get_connection() as conn:
+                conn.executemany('''
+                    UPDATE scan_requests SET lease_expires = ?
+                    WHERE id = ? AND status = 'running'
+                ''', [(time.time() + self.lease_seconds, request_id) for request_id in ids])
+    
+    def _finish(self, group: Dict[str, Any], ids: List[int], scan_id: Optional[str],
+                commit_hash: Optional[str], result: Optional[Dict[str, Any]],
+                error: Optional[str]):
+        """Close the group's requests, plus those that arrived for the scanned commit"""
+        status = 'done' if result is not None else 'failed'
+        now = time.time()
+        with self.db.get_connection() as conn:
+            conn.executemany('''
+                UPDATE scan_requests
+                SET status = ?, finished_at = ?, scan_id = ?, error = ?, lease_expires = NULL
+                WHERE id = ?
+            ''', [(status, now, scan_id, error, request_id) for request_id in ids])
+            if commit_hash and result is not None and result['status'] == 'completed':
+                conn.execute('''
+                    UPDATE scan_requests SET status = 'done', finished_at = ?, scan_id = ?
+                    WHERE status = 'pending' AND project = ? AND target = ? AND branch = ?
+                      AND commit_hash = ?
+                ''', (now, scan_id, group['project'], group['target'], group['branch'],
+                      commit_hash))
+    
+    def run_pending(self, now: float = None) -> List[Dict[str, Any]]:
+        """Dispatch every due group, one scan at a time"""
+        results = []
+        for group in self.due_groups(now):
+            result = self.dispatch(group)
+            if result is not None:
+                results.append(result)
+        return results
+    
+    def enqueue_periodic(self, terraform_dir: Path = None, project: str = None,
+                         now: float = None) -> int:
+        """Trigger scheduled branches whose latest completed full scan is too old"""
+        now = time.time() if now is None else now
+        project = project or Config.SCAN_PROJECT
+        target = self._target(terraform_dir)
+        triggered = 0
+        for branch, interval in self.schedules.items():
+            with self.db.get_read_connection() as conn:
+                waiting = conn.execute('''
+                    SELECT 1 FROM scan_requests
+                    WHERE status IN ('pending', 'running') AND project = ? AND target = ?
+                      AND branch = ?
+                    LIMIT 1
+                ''', (project, target, branch)).fetchone()
+                last = conn.execute(f'''
+                    SELECT CAST(strftime('%s', MAX(s.timestamp)) AS REAL) {self._FULL_SCANS}
+                ''', (project, branch or None, target)).fetchone()[0]
+            if waiting or (last is not None and now - last < interval):
+                continue
+            self.submit('schedule', branch=branch, terraform_dir=Path(target), project=project,
+                        debounce=False)
+            triggered += 1
+        return triggered
+    
+    def recover(self, now: float = None) -> int:
+        """Requeue 'running' requests whose lease expired (their scheduler died mid-scan)"""
+        now = time.time() if now is None else now
+        with self.db.get_connection() as conn:
+            return conn.execute('''
+                UPDATE scan_requests SET status = 'pending', started_at = NULL, lease_expires = NULL
+                WHERE status = 'running' AND COALESCE(lease_expires, 0) < ?
+            ''', (now,)).rowcount
+    
+    def run_forever(self, poll_seconds: float = None):
+        """Dispatch loop"""
+        poll_seconds = poll_seconds or Config.SCHEDULER_POLL_SECONDS
+        while True:
+            recovered = self.recover()
+            if recovered:
+                print(f"Requeued {recovered} request(s) interrupted by another scheduler")
+            self.enqueue_periodic()
+            self.run_pending()
+            time.sleep(poll_seconds)
+    
+    def get_requests(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent requests, newest first"""
+        with self.db.get_read_connection() as conn:
+            rows = conn.execute('SELECT * FROM scan_requests ORDER BY id DESC LIMIT ?',
+                                (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+
+def main():
+    """Main entry point"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Cloud Sentinel scan scheduler')
+    sub = parser.add_subparsers(dest='command', required=True)
+    
+    trigger = sub.add_parser('trigger', help='Request a scan (debounced and coalesced)')
+    trigger.add_argument('--triggered-by', type=str, default='manual',
+                         help='What triggered this scan (push, cron, dashboard, ...)')
+    trigger.add_argument('--branch', type=str, help='Git branch name')
+    trigger.add_argument('--commit', type=str, help='Git commit hash')
+    trigger.add_argument('-d', '--directory', type=str, help='Terraform directory to scan')
+    trigger.add_argument('--project', type=str, help='Project (default: $SCAN_PROJECT)')
+    trigger.add_argument('--force', action='store_true',
+                         help='Scan even if this commit already has a completed full scan')
+    
+    run = sub.add_parser('run', help='Dispatch due requests and periodic schedules')
+    run.add_argument('--once', action='store_true', help='Dispatch what is due now, then exit')
+    run.add_argument('--schedule', type=str,
+                     help="Periodic scans, e.g. 'main=6h,develop=1d' (default: $SCAN_SCHEDULES)")
+    run.add_argument('--local-workers', type=int, default=0, metavar='N',
+                     help='Run each scan distributed, with N local workers')
+    
+    status = sub.add_parser('status', help='Show recent requests')
+    status.add_argument('--limit', type=int, default=20, help='Requests to show')
+    
+    args = parser.parse_args()
+    
+    if args.command == 'trigger':
+        scheduler = ScanScheduler()
+        response = scheduler.submit(args.triggered_by, branch=args.branch, commit_hash=args.commit,
+                                    terraform_dir=Path(args.directory) if args.directory else None,
+                                    project=args.project, force=args.force)
+        print(f"Request {response['request_id']}: {response['message']}")
+    
+    elif args.command == 'run':
+        scheduler = ScanScheduler(
+            schedules=parse_schedules(args.schedule) if args.schedule is not None else None,
+            scan_options={'local_workers': args.local_workers} if args.local_workers else None)
+        if args.once:
+            scheduler.recover()
+            scheduler.enqueue_periodic()
+            # Debounce windows still open are not due yet; --once doesn't wait for them
+            results = scheduler.run_pending()
+            print(f"{len(results)} scan(s) run")
+            sys.exit(1 if any(result['status'] != 'completed' for result in results) else 0)
+        try:
+            scheduler.run_forever()
+        except KeyboardInterrupt:
+            pass
+    
+    else:
+        scheduler = ScanScheduler()
+        row_format = "{:>6}  {:<19}  {:<14} {:<12} {:<10} {:<24} {}"
+        print(row_format.format('ID', 'Requested', 'Branch', 'Commit', 'Status', 'Scan', 'Triggered by'))
+        for request in scheduler.get_requests(args.limit):
+            print(row_format.format(
+                request['id'],
+                datetime.fromtimestamp(request['requested_at']).strftime('%Y-%m-%d %H:%M:%S'),
+                request['branch'] or '-', (request['commit_hash'] or '-')[:12], request['status'],
+                request['scan_id'] or '-', request['triggered_by']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+CLOUD SENTINEL - Scan Worker
+Leases scan shards from the work queue and runs Checkov on them
+
+Usage:
+    python scanner/worker.py                          # WORK_QUEUE_PATH, until stopped
+    python scanner/worker.py -d /srv/checkout/terraform --exit-when-idle
+
+Start any number of workers, on any node that can open the queue file and
+read the Terraform tree (the coordinator's path, or -d for a local checkout
+of the same commit). See SecurityScanner.scan(distributed=True).
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config import Config
+from logger import ScanLogger
+from runner import run_checkov
+from workqueue import ShardQueue
+
+
+class ScanWorker:
+    """Runs Checkov on leased shards and posts the reports back
+    
+    Workers only need the queue and Checkov: the coordinator parses and
+    stores the reports, so no scan database is opened here.
+    """
+    
+    def __init__(self, queue: ShardQueue = None, terraform_dir: Optional[Path] = None,
+                 worker_id: str = None):
+        self.queue = queue or ShardQueue()
+        self.terraform_dir = terraform_dir
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.logger = ScanLogger()
+    
+    def run(self, exit_when_idle: bool = False, poll_seconds: float = None) -> int:
+        """Process shards until stopped (or the queue is empty); returns shards run"""
+        poll_seconds = poll_seconds or Config.SHARD_POLL_SECONDS
+        processed = 0
+        self.logger.info(f"Worker {self.worker_id} polling {self.queue.path}")
+        while True:
+            shard = self.queue.lease(self.worker_id)
+            if shard is None:
+                if exit_when_idle:
+                    return processed
+                time.sleep(poll_seconds)
+                continue
+            self.process(shard)
+            processed += 1
+    
+    def process(self, shard: Dict[str, Any]):
+        """Run one shard under a heartbeat-renewed lease"""
+        root = self.terraform_dir or Path(shard['root'])
+        name = shard['unit']
+        timeout = shard['timeout_seconds']
+        self.logger.info(f"{shard['scan_id']} unit {name} (attempt {shard['attempts']}, "
+                         f"timeout {timeout:.0f}s)")
+        
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(shard['id'], stop),
+                                     name='shard-heartbeat', daemon=True)
+        heartbeat.start()
+        start = time.time()
+        try:
+            report = run_checkov(
+                root / shard['path'], timeout=timeout,
+                files=[root / path for path in shard['files']] if shard['files'] else None,
+                skip_paths=shard['skip_paths'], logger=self.logger, scan_id=shard['scan_id'])
+        except subprocess.TimeoutExpired:
+            self.queue.fail(shard['id'], self.worker_id, 'timeout',
+                            f"Timed out after {timeout:.0f}s", time.time() - start)
+            return
+        except FileNotFoundError as e:
+            # No Checkov on this node: give the shard back and stop taking more
+            self.queue.fail(shard['id'], self.worker_id, 'failed', str(e), time.time() - start)
+            raise
+        except Exception as e:
+            self.logger.error(f"Unit {name} failed: {e}")
+            self.queue.fail(shard['id'], self.worker_id, 'failed', str(e), time.time() - start)
+            return
+        finally:
+            stop.set()
+            heartbeat.join()
+        
+        if not self.queue.complete(shard['id'], self.worker_id, report, time.time() - start):
+            self.logger.warning(f"Lease on unit {name} was lost (expired or cancelled); "
+                                f"result dropped")
+    
+    def _heartbeat(self, shard_id: int, stop: threading.Event):
+        """Renew the lease every third of its length until stopped"""
+        while not stop.wait(self.queue.lease_seconds / 3):
+            if not self.queue.heartbeat(shard_id, self.worker_id):
+                self.logger.warning(f"Lost the lease on shard {shard_id}")
+                return
+
+
+def main():
+    """Main entry point"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Cloud Sentinel distributed scan worker')
+    parser.add_argument('--queue', type=str, help='Shard queue file (default: $WORK_QUEUE_PATH)')
+    parser.add_argument('-d', '--directory', type=str,
+                       help="Local checkout of the Terraform tree (default: the coordinator's path)")
+    parser.add_argument('--id', type=str, help='Worker ID (default: host:pid)')
+    parser.add_argument('--exit-when-idle', action='store_true',
+                       help='Exit once no shard is available instead of polling')
+    
+    args = parser.parse_args()
+    
+    worker = ScanWorker(ShardQueue(Path(args.queue) if args.queue else None),
+                        Path(args.directory) if args.directory else None, args.id)
+    try:
+        processed = worker.run(exit_when_idle=args.exit_when_idle)
+        worker.logger.info(f"Worker {worker.worker_id}: {processed} shard(s) processed")
+    except KeyboardInterrupt:
+        pass
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+"""
+CLOUD SENTINEL - Work Queue Module
+Durable SQLite queue of scan shards (units) leased by distributed workers
+"""
+
+import json
+import sqlite3
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from config import Config
+
+
+class ShardQueue:
+    """Scan units waiting for, leased by or finished by workers
+    
+    The coordinator enqueues a scan's units; workers on any node that can
+    open the queue file lease one shard at a time. A lease expires unless
+    its worker heartbeats, after which the shard is handed out again, up to
+    max_attempts leases in total. Workers post the (compressed) Checkov
+    report back into the shard and the coordinator merges it into the scan
+    record, so only the coordinator writes to the scan database.
+    
+    The queue uses SQLite's rollback journal, not WAL, which needs shared
+    memory and so does not work across hosts on a network filesystem.
+    Leasing is one UPDATE ... RETURNING statement, atomic between workers.
+    
+    Shard status: queued -> leased -> completed | failed | cancelled
+    """
+    
+    def __init__(self, path: Optional[Path] = None, lease_seconds: float = None,
+                 max_attempts: int = None):
+        self.path = Path(path or Config.WORK_QUEUE_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds or Config.SHARD_LEASE_SECONDS
+        self.max_attempts = max_attempts or Config.SHARD_MAX_ATTEMPTS
+        with self._connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS scan_shards (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    scan_id TEXT NOT NULL,
+                    unit TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    timeout_seconds REAL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    attempts INTEGER DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    worker TEXT,
+                    lease_expires REAL,
+                    enqueued_at REAL,
+                    finished_at REAL,
+                    duration_seconds REAL,
+                    result BLOB,
+                    failure TEXT,
+                    error TEXT,
+                    merged BOOLEAN DEFAULT FALSE,
+                    UNIQUE (scan_id, unit)
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_shards_status ON scan_shards(status, id)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_shards_scan ON scan_shards(scan_id, merged)')
+    
+    @contextmanager
+    def _connection(self):
+        conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+    
+    def enqueue(self, scan_id: str, shards: Iterable[Dict[str, Any]]) -> int:
+        """Queue {'unit', 'timeout', 'root', 'path', 'files', 'skip_paths'} shards
+        
+        path and files are relative to root, the coordinator's Terraform
+        directory, so a worker can resolve them against its own checkout.
+        A unit queued before for the same scan (a resumed scan) is reset.
+        """
+        now = time.time()
+        rows = [(scan_id, shard['unit'],
+                 json.dumps({key: shard[key] for key in ('root', 'path', 'files', 'skip_paths')}),
+                 shard['timeout'], self.max_attempts, now)
+                for shard in shards]
+        with self._connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany('''
+                INSERT INTO scan_shards
+                (scan_id, unit, payload, timeout_seconds, max_attempts, enqueued_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (scan_id, unit) DO UPDATE SET
+                    payload = excluded.payload, timeout_seconds = excluded.timeout_seconds,
+                    status = 'queued', attempts = 0, max_attempts = excluded.max_attempts,
+                    worker = NULL, lease_expires = NULL, enqueued_at = excluded.enqueued_at,
+                    finished_at = NULL, duration_seconds = NULL, result = NULL,
+                    failure = NULL, error = NULL, merged = FALSE
+            ''', rows)
+            conn.execute('COMMIT')
+        return len(rows)
+    
+    def lease(self, worker: str) -> Optional[Dict[str, Any]]:
+        """Take the oldest available shard (queued, or whose lease ran out)"""
+        now = time.time()
+        with self._connection() as conn:
+            row = conn.execute('''
+                UPDATE scan_shards
+                SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1
+                WHERE id = (
+                    SELECT id FROM scan_shards
+                    WHERE (status = 'queued'
+                           OR (status = 'leased' AND lease_expires < ?
+                               AND attempts < max_attempts))
+                    ORDER BY id LIMIT 1
+                )
+                RETURNING id, scan_id, unit, payload, timeout_seconds, attempts
+            ''', (worker, now + self.lease_seconds, now)).fetchone()
+        if row is None:
+            return None
+        shard = dict(row)
+        shard.update(json.loads(shard.pop('payload')))
+        return shard
+    
+    def heartbeat(self, shard_id: int, worker: str) -> bool:
+        """Extend a lease; False if the worker no longer holds it"""
+        with self._connection() as conn:
+            cursor = conn.execute('''
+                UPDATE scan_shards SET lease_expires = ?
+                WHERE id = ? AND worker = ? AND status = 'leased'
+            ''', (time.time() + self.lease_seconds, shard_id, worker))
+            return cursor.rowcount == 1
+    
+    def complete(self, shard_id: int, worker: str, report: Any, duration: float) -> bool:
+        """Post a shard's Checkov report; False (and dropped) if the lease was lost"""
+        blob = zlib.compress(json.dumps(report).encode('utf-8'))
+        with self._connection() as conn:
+            cursor = conn.execute('''
+                UPDATE scan_shards
+                SET status = 'completed', result = ?, duration_seconds = ?,
+                    finished_at = ?, lease_expires = NULL
+                WHERE id = ? AND worker = ? AND status = 'leased'
+            ''', (blob, duration, time.time(), shard_id, worker))
+            return cursor.rowcount == 1
+    
+    def fail(self, shard_id: int, worker: str, failure: str, error: str,
+             duration: float) -> bool:
+        """Record a failed attempt ('timeout' or 'failed'); requeued while attempts remain
+        
+        A shard that timed out is retried with double the timeout (up to
+        CHECKOV_TIMEOUT_MAX), as a resumed scan would.
+        """
+        with self._connection() as conn:
+            cursor = conn.execute('''
+                UPDATE scan_shards
+                SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+                    failure = ?, error = ?, duration_seconds = ?, lease_expires = NULL,
+                    finished_at = CASE WHEN attempts < max_attempts THEN NULL ELSE ? END,
+                    timeout_seconds = CASE WHEN ? = 'timeout'
+                                           THEN MIN(timeout_seconds * 2, ?)
+                                           ELSE timeout_seconds END
+                WHERE id = ? AND worker = ? AND status = 'leased'
+            ''', (failure, error, duration, time.time(), failure, Config.CHECKOV_TIMEOUT_MAX,
+                  shard_id, worker))
+            return cursor.rowcount == 1
+    
+    def reap(self, scan_id: str) -> int:
+        """Fail a scan's shards whose last lease expired with no attempts left"""
+        now = time.time()
+        with self._connection() as conn:
+            cursor = conn.execute('''
+                UPDATE scan_shards
+                SET status = 'failed', failure = 'failed', finished_at = ?,
+                    error = 'Worker lost (lease expired) on every attempt'
+                WHERE scan_id = ? AND status = 'leased' AND lease_expires < ?
+                  AND attempts >= max_attempts
+            ''', (now, scan_id, now))
+            return cursor.rowcount
+    
+    def cancel(self, scan_id: str) -> int:
+        """Withdraw a scan's unfinished shards (running workers' results are dropped)"""
+        with self._connection() as conn:
+            cursor = conn.execute('''
+                UPDATE scan_shards SET status = 'cancelled', finished_at = ?
+                WHERE scan_id = ? AND status IN ('queued', 'leased')
+            ''', (time.time(), scan_id))
+            return cursor.rowcount
+    
+    def take_finished(self, scan_id: str) -> List[Dict[str, Any]]:
+        """Completed and failed shards not merged yet, marked merged (report decoded)"""
+        with self._connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            rows = conn.execute('''
+                SELECT id, unit, status, attempts, timeout_seconds, duration_seconds,
+                       result, failure, error, worker
+                FROM scan_shards
+                WHERE scan_id = ? AND NOT merged AND status IN ('completed', 'failed')
+                ORDER BY id
+            ''', (scan_id,)).fetchall()
+            conn.executemany('UPDATE scan_shards SET merged = TRUE, result = NULL WHERE id = ?',
+                             [(row['id'],) for row in rows])
+            conn.execute('COMMIT')
+        
+        shards = []
+        for row in rows:
+            shard = dict(row)
+            blob = shard.pop('result')
+            shard['report'] = json.loads(zlib.decompress(blob)) if blob else None
+            shards.append(shard)
+        return shards
+    
+    def active(self, scan_id: str) -> int:
+        """Shards of a scan under a live lease (a dead worker's lease doesn't count)"""
+        with self._connection() as conn:
+            return conn.execute('''
+                SELECT COUNT(*) FROM scan_shards
+                WHERE scan_id = ? AND status = 'leased' AND lease_expires > ?
+            ''', (scan_id, time.time())).fetchone()[0]
+    
+    def progress(self, scan_id: str) -> Dict[str, int]:
+        """{status: shard count} of a scan"""
+        with self._connection() as conn:
+            return dict(conn.execute(
+                'SELECT status, COUNT(*) FROM scan_shards WHERE scan_id = ? GROUP BY status',
+                (scan_id,)).fetchall())
+    
+    def purge(self, scan_id: str):
+        """Drop a finished scan's shards (scan_units keeps the per-unit record)"""
+        with self._connection() as conn:
+            conn.execute('DELETE FROM scan_shards WHERE scan_id = ?', (scan_id,))
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+CLOUD SENTINEL - Analytics Benchmark
+Times the dashboard's summary and trend queries on SQLite and on the DuckDB mirror
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add scanner directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scanner'))
+
+from analytics import AnalyticsStore
+from database import Database
+
+SEVERITIES = ['CRITICAL', 'HIGH', 'MEDIUM', 'LOW']
+
+
+def seed(db: Database, violations: int, days: int, projects: int):
+    """Fill db with synthetic scans of 1000 violations spread over `days` days"""
+    now = datetime.utcnow()
+    per_scan = 1000
+    with db.get_connection() as conn:
+        for n in range(0, violations, per_scan):
+            scan_id = f"bench_{n // per_scan}"
+            project = f"project-{(n // per_scan) % projects}"
+            when = (now - timedelta(days=random.uniform(0, days))).strftime('%Y-%m-%d %H:%M:%S')
+            conn.execute(
+                "INSERT INTO scans (scan_id, timestamp, status, project) VALUES (?, ?, 'completed', ?)",
+                (scan_id, when, project))
+            conn.executemany('''
+                INSERT INTO violations (scan_id, check_id, check_name, severity, resource_type,
+                                        resource_name, file_path, timestamp, project)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [(scan_id, f'CKV_AWS_{i % 150}', f'Check {i % 150}', SEVERITIES[i % 4],
+                   'aws_s3_bucket', f'aws_s3_bucket.r{i}', f'/main{i % 40}.tf', when, project)
+                  for i in range(min(per_scan, violations - n))])
+
+
+def median_ms(fn, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark dashboard aggregates: SQLite vs DuckDB')
+    parser.add_argument('--db', type=str, help='Existing database (default: seed a temporary one)')
+    parser.add_argument('-n', '--violations', type=int, default=500000,
+                        help='Violations to seed (default: 500000)')
+    parser.add_argument('--days', type=int, default=180, help='History to seed and query (default: 180)')
+    parser.add_argument('--projects', type=int, default=10, help='Projects to seed (default: 10)')
+    parser.add_argument('--project', type=str, help='Also time the project-scoped queries')
+    parser.add_argument('--runs', type=int, default=10, help='Runs per query (default: 10)')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        if args.db:
+            db = Database(Path(args.db))
+        else:
+            db = Database(Path(work_dir) / 'bench.db')
+            start = time.perf_counter()
+            seed(db, args.violations, args.days, args.projects)
+            print(f"seeded {args.violations} violations in {time.perf_counter() - start:.1f}s")
+        db.analytics = None  # the SQLite side of the comparison
+        
+        store = AnalyticsStore(db, ':memory:', sync_interval=float('inf'))
+        start = time.perf_counter()
+        copied = store.sync(force=True)
+        elapsed = time.perf_counter() - start
+        print(f"initial sync: {copied} rows in {elapsed:.2f}s ({copied / max(elapsed, 1e-9):,.0f} rows/s)")
+        
+        queries = [
+            ('summary', lambda: db.get_violation_counts(),
+             lambda: store.get_violation_counts()),
+            (f'trends {args.days}d', lambda: db.get_violation_trends(args.days),
+             lambda: store.get_violation_trends(args.days))
+        ]
+        if args.project:
+            project = args.project
+            queries += [
+                ('summary (project)', lambda: db.get_violation_counts(project),
+                 lambda: store.get_violation_counts(project)),
+                (f'trends {args.days}d (project)', lambda: db.get_violation_trends(args.days, project),
+                 lambda: store.get_violation_trends(args.days, project))
+            ]
+        
+        print(f"\n{'query':<26} {'sqlite ms':>10} {'duckdb ms':>10} {'speedup':>8}")
+        for name, on_sqlite, on_duckdb in queries:
+            if on_sqlite() != on_duckdb():
+                print(f"  warning: {name} results differ between backends")
+            sqlite_ms = median_ms(on_sqlite, args.runs)
+            duckdb_ms = median_ms(on_duckdb, args.runs)
+            print(f"{name:<26} {sqlite_ms:>10.1f} {duckdb_ms:>10.1f} {sqlite_ms / duckdb_ms:>7.1f}x")
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+CLOUD SENTINEL - Pre-check Benchmark
+Times the native fast-lane rules against a full Checkov run and compares findings
+"""
+
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add scanner directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scanner'))
+
+from precheck import RULES, PreCheckEngine
+
+
+def failed_pairs(report, check_ids=None):
+    """{(check_id, resource)} of failed checks in a Checkov-format report"""
+    reports = report if isinstance(report, list) else [report]
+    pairs = set()
+    for item in reports:
+        for check in item.get('results', {}).get('failed_checks', []):
+            if check_ids is None or check['check_id'] in check_ids:
+                pairs.add((check['check_id'], check['resource']))
+    return pairs
+
+
+def time_precheck(terraform_dir: Path, runs: int):
+    """Cold and median warm wall time (ms) of the fast lane"""
+    timings = []
+    report = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        report = PreCheckEngine().scan(terraform_dir)
+        timings.append((time.perf_counter() - start) * 1000)
+    return report, timings[0], statistics.median(timings)
+
+
+def time_checkov(terraform_dir: Path, runs: int):
+    """Median wall time (ms) of a full Checkov run, or None if not installed"""
+    checkov = shutil.which('checkov')
+    if not checkov:
+        return None, None
+    timings = []
+    report = None
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as work_dir:
+            start = time.perf_counter()
+            subprocess.run([checkov, '-d', str(terraform_dir), '-o', 'json', '--framework',
+                            'terraform', '--compact', '--output-file-path', work_dir],
+                           capture_output=True, text=True)
+            timings.append((time.perf_counter() - start) * 1000)
+            output = Path(work_dir) / 'results_json.json'
+            if output.exists():
+                report = json.loads(output.read_text())
+    return report, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark fast pre-check vs Checkov')
+    parser.add_argument('-d', '--directory', default='terraform', help='Terraform directory')
+    parser.add_argument('--runs', type=int, default=20, help='Pre-check runs (default: 20)')
+    parser.add_argument('--checkov-runs', type=int, default=1, help='Checkov runs (default: 1)')
+    parser.add_argument('--results-file', type=str,
+                        help='Compare against an existing Checkov JSON report instead of running Checkov')
+    args = parser.parse_args()
+    
+    terraform_dir = Path(args.directory)
+    fast_report, cold_ms, warm_ms = time_precheck(terraform_dir, args.runs)
+    
+    if args.results_file:
+        checkov_report, checkov_ms = json.loads(Path(args.results_file).read_text()), None
+    else:
+        checkov_report, checkov_ms = time_checkov(terraform_dir, args.checkov_runs)
+    
+    summary = fast_report['summary']
+    print(f"{'engine':<12} {'median ms':>10} {'findings':>9}")
+    print(f"{'pre-check':<12} {warm_ms:>10.1f} {summary['failed']:>9}   "
+          f"(cold {cold_ms:.1f} ms, {summary['resource_count']} resources, {len(RULES)} rules)")
+    
+    if checkov_report is None:
+        print(f"{'checkov':<12} {'-':>10} {'-':>9}   (not installed; pass --results-file to compare)")
+        return
+    
+    checkov_failed = failed_pairs(checkov_report)
+    timing = f"{checkov_ms:>10.1f}" if checkov_ms is not None else f"{'-':>10}"
+    print(f"{'checkov':<12} {timing} {len(checkov_failed):>9}")
+    if checkov_ms:
+        print(f"\nspeedup: {checkov_ms / warm_ms:.0f}x")
+    
+    # Coverage on the checks both engines implement
+    fast = failed_pairs(fast_report)
+    full = failed_pairs(checkov_report, set(RULES))
+    print(f"\nshared rules: {len(fast & full)} agree, "
+          f"{len(fast - full)} pre-check only, {len(full - fast)} checkov only")
+    for check_id, resource in sorted(fast ^ full):
+        side = 'pre-check' if (check_id, resource) in fast else 'checkov'
+        print(f"  {side:<10} {check_id} {resource}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+CLOUD SENTINEL - Plan Fixture Generator
+Writes a synthetic `terraform show -json` plan with any number of resource changes
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+OPEN_POLICY = json.dumps({'Version': '2012-10-17', 'Statement': [
+    {'Effect': 'Allow', 'Action': '*', 'Resource': '*'}]})
+READ_POLICY = json.dumps({'Version': '2012-10-17', 'Statement': [
+    {'Effect': 'Allow', 'Action': ['s3:GetObject'], 'Resource': ['arn:aws:s3:::logs/*']}]})
+
+
+def _change(module, resource_type, name, index, after, after_unknown=None,
+            actions=('create',), mode='managed'):
+    address = f"{resource_type}.{name}[{index}]"
+    if mode == 'data':
+        address = 'data.' + address
+    if module:
+        address = f"{module}.{address}"
+    return {
+        'address': address,
+        'module_address': module or None,
+        'mode': mode,
+        'type': resource_type,
+        'name': name,
+        'index': index,
+        'provider_name': 'registry.terraform.io/hashicorp/aws',
+        'change': {
+            'actions': list(actions),
+            'before': None,
+            'after': after,
+            'after_unknown': after_unknown or {},
+            'before_sensitive': False,
+            'after_sensitive': {}
+        }
+    }
+
+
+def _ingress(port, cidr):
+    return {'cidr_blocks': [cidr], 'description': '', 'from_port': port, 'to_port': port,
+            'protocol': 'tcp', 'ipv6_cidr_blocks': [], 'prefix_list_ids': [],
+            'security_groups': [], 'self': False}
+
+
+def resource_changes(i: int):
+    """The ten changes of group i (every kind of finding, pass and skip)"""
+    module = f'module.app_{i}' if i % 2 else ''
+    bad = i % 3 == 0
+    yield _change(module, 'aws_security_group', 'web', i, {
+        'name': f'web-{i}', 'ingress': [_ingress(443, '0.0.0.0/0'),
+                                        _ingress(22, '0.0.0.0/0' if bad else '10.0.0.0/8')],
+        'egress': [], 'tags': {'Name': f'web-{i}'}},
+        {'id': True, 'arn': True, 'ingress': [{}, {}]})
+    yield _change(module, 'aws_instance', 'app', i, {
+        'ami': 'ami-12345678', 'instance_type': 't3.micro',
+        'root_block_device': [{'encrypted': not bad, 'volume_size': 20}],
+        'ebs_block_device': []}, {'id': True, 'root_block_device': [{'kms_key_id': True}]})
+    yield _change(module, 'aws_ebs_volume', 'data', i, {
+        'availability_zone': 'us-east-1a', 'size': 100, 'encrypted': None},
+        {'id': True, 'encrypted': i % 5 == 0})
+    # Bucket names are known for even groups, computed (bucket_prefix) for odd ones
+    bucket = f'sentinel-logs-{i}' if i % 2 == 0 else None
+    yield _change(module, 'aws_s3_bucket', 'logs', i, {
+        'bucket': bucket, 'bucket_prefix': None if bucket else 'sentinel-logs-',
+        'acl': 'public-read' if bad else None, 'force_destroy': False},
+        {'id': True, 'arn': True, 'bucket': bucket is None})
+    yield _change(module, 'aws_s3_bucket_server_side_encryption_configuration', 'logs', i, {
+        'bucket': bucket, 'rule': [{'apply_server_side_encryption_by_default': [
+            {'sse_algorithm': 'AES256' if bad else 'aws:kms', 'kms_master_key_id': None}],
+            'bucket_key_enabled': None}]},
+        {'id': True, 'bucket': bucket is None})
+    yield _change(module, 'aws_s3_bucket_public_access_block', 'logs', i, {
+        'bucket': bucket, 'block_public_acls': True, 'block_public_policy': not bad,
+        'ignore_public_acls': True, 'restrict_public_buckets': True},
+        {'id': True, 'bucket': bucket is None})
+    yield _change(module, 'aws_iam_policy', 'app', i, {
+        'name': f'app-{i}', 'policy': OPEN_POLICY if bad else READ_POLICY},
+        {'id': True, 'arn': True})
+    yield _change(module, 'aws_subnet', 'private', i, {
+        'cidr_block': f'10.{i % 256}.0.0/24', 'map_public_ip_on_launch': False},
+        {'id': True, 'vpc_id': True})
+    yield _change(module, 'aws_ami', 'ubuntu', i, {'most_recent': True}, mode='data',
+                  actions=('read',))
+    yield _change(module, 'aws_instance', 'legacy', i, None, actions=('delete',))
+
+
+def configuration(groups: int):
+    """Configuration section: S3 settings reference their bucket via aws_s3_bucket.logs.id"""
+    def module_body():
+        resources = [{'address': 'aws_s3_bucket.logs', 'mode': 'managed',
+                      'type': 'aws_s3_bucket', 'name': 'logs', 'expressions': {}}]
+        for resource_type in ('aws_s3_bucket_server_side_encryption_configuration',
+                              'aws_s3_bucket_public_access_block'):
+            resources.append({
+                'address': f'{resource_type}.logs', 'mode': 'managed',
+                'type': resource_type, 'name': 'logs',
+                'expressions': {'bucket': {'references': ['aws_s3_bucket.logs.id',
+                                                          'aws_s3_bucket.logs']}}})
+        return {'resources': resources}
+    
+    root = module_body()
+    root['module_calls'] = {f'app_{i}': {'source': './modules/app', 'module': module_body()}
+                            for i in range(1, groups, 2)}
+    return {'provider_config': {'aws': {'name': 'aws'}}, 'root_module': root}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic Terraform plan JSON')
+    parser.add_argument('output', help='Plan file to write')
+    parser.add_argument('-n', '--resources', type=int, default=1000,
+                        help='Resource changes to generate (default: 1000)')
+    args = parser.parse_args()
+    
+    groups = max(1, args.resources // 10)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        f.write('{"format_version": "1.2", "terraform_version": "1.7.5",\n')
+        # Large sections the scanner has to skip without decoding
+        f.write(' "planned_values": {"root_module": {"resources": [')
+        for i in range(groups):
+            f.write(('' if i == 0 else ',\n') + json.dumps(
+                {'address': f'aws_subnet.private[{i}]', 'values': {'cidr_block': f'10.{i % 256}.0.0/24',
+                                                                   'tags': {'Name': 'x' * 200}}}))
+        f.write(']}},\n "resource_changes": [\n')
+        first = True
+        for i in range(groups):
+            for change in resource_changes(i):
+                f.write(('' if first else ',\n') + json.dumps(change))
+                first = False
+        f.write('\n],\n "configuration": ')
+        json.dump(configuration(groups), f)
+        f.write(',\n "timestamp": "2024-01-01T00:00:00Z", "errored": false}\n')
+    
+    size = Path(args.output).stat().st_size
+    print(f"Wrote {groups * 10} resource changes ({size / 1024 / 1024:.1f} MB) to {args.output}",
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+CLOUD SENTINEL - Dashboard Load Test
+Seeds a large synthetic scan history and measures API latency under concurrency
+
+Usage:
+    python scripts/load_test.py seed --db /tmp/load.db --scans 2000 --violations 2000000
+    python scripts/load_test.py run --db /tmp/load.db -c 1,8,32 --duration 15 -o results.json
+    python scripts/load_test.py run --url http://dashboard:5000 -c 16
+
+`run` starts the production server (dashboard/wsgi.py, waitress) on the
+database in a subprocess, so the clients don't share its interpreter, or
+drives an already running dashboard given --url. Each endpoint is measured
+on its own at every concurrency level. Results go to stdout as a table and,
+with -o, to a JSON file with stable key order and rounding for diffing runs.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from urllib.parse import urlsplit
+
+ROOT = Path(__file__).parent.parent
+
+# Add scanner directory to path
+sys.path.insert(0, str(ROOT / 'scanner'))
+
+SEVERITY_WEIGHTS = {'CRITICAL': 5, 'HIGH': 20, 'MEDIUM': 45, 'LOW': 30}
+RESOURCE_TYPES = ['aws_s3_bucket', 'aws_instance', 'aws_security_group', 'aws_iam_policy',
+                  'aws_db_instance', 'aws_ebs_volume', 'aws_lambda_function', 'aws_kms_key']
+BRANCHES = ['main'] * 8 + ['develop', 'feature/load']
+
+# Endpoints measured by default (name=path); add more with --endpoint
+DEFAULT_ENDPOINTS = [
+    'summary=/api/summary',
+    'violations=/api/violations?limit=50',
+    'trends=/api/trends?days=30',
+    'search=/api/search?q=bucket&limit=50',
+    'top_resources=/api/resources/top',
+    'mttr=/api/lifecycle/mttr'
+]
+
+
+def percentile(sorted_values, pct: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def finding_universe(rng: random.Random, size: int):
+    """Findings a project can have: (check_id, check_name, severity, type, name, file)"""
+    checks = [(f'CKV_AWS_{n}', rng.choices(list(SEVERITY_WEIGHTS), list(SEVERITY_WEIGHTS.values()))[0])
+              for n in range(1, 301)]
+    findings = set()
+    while len(findings) < size:
+        check_id, severity = rng.choice(checks)
+        resource_type = rng.choice(RESOURCE_TYPES)
+        module = rng.randrange(max(1, size // 200))
+        resource_name = f'{resource_type}.{resource_type.split("_", 1)[1]}_{rng.randrange(size // 4 + 1)}'
+        findings.add((check_id, f'Ensure {resource_type} passes {check_id}', severity,
+                      resource_type, resource_name, f'/modules/m{module}/main.tf'))
+    return sorted(findings)
+
+
+def seed(db_path: Path, scans: int, violations: int, projects: int, days: int, rng_seed: int):
+    """Fill db_path with `scans` scans holding `violations` violations in total
+    
+    Each project has a fixed universe of findings and every scan that did
+    not fail reports a random 2/3 of it, so findings come and go between
+    scans (fixes and reopens) as they do in real history. Scans are spread over `days` in
+    time order across projects; a few fail or end incomplete.
+    """
+    from config import Config
+    from database import Database
+    
+    rng = random.Random(rng_seed)
+    db = Database(db_path)
+    statuses = rng.choices(['completed', 'failed', 'incomplete'], [95, 3, 2], k=scans)
+    reporting = max(1, sum(status != 'failed' for status in statuses))
+    per_scan, extra = divmod(violations, reporting)
+    universes = {f'project-{n}': finding_universe(rng, (per_scan + 1) * 3 // 2)
+                 for n in range(projects)}
+    
+    now = datetime.utcnow()
+    times = sorted(now - timedelta(seconds=rng.uniform(0, days * 86400)) for _ in range(scans))
+    reported = 0
+    start = time.perf_counter()
+    stored = 0
+    batch = 50
+    
+    for first in range(0, scans, batch):
+        with db.get_connection() as conn:
+            for n in range(first, min(first + batch, scans)):
+                project = f'project-{n % projects}'
+                scan_id = f'loadtest_{n:07d}'
+                when = times[n].strftime('%Y-%m-%d %H:%M:%S')
+                status = statuses[n]
+                found = []
+                if status != 'failed':
+                    found = rng.sample(universes[project], per_scan + (reported < extra))
+                    reported += 1
+                stored += len(found)
+                blocked = any(f[2] in ('CRITICAL', 'HIGH') for f in found)
+                conn.execute('''
+                    INSERT INTO scans (scan_id, timestamp, status, total_checks, passed_checks,
+                                       failed_checks, skipped_checks, commit_hash, branch,
+                                       triggered_by, duration_seconds, blocked_deployment, project)
+                    VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?, 'load-test', ?, ?, ?)
+                ''', (scan_id, when, status, len(found) * 4, len(found) * 3, len(found),
+                      f'{rng.getrandbits(160):040x}', rng.choice(BRANCHES),
+                      round(rng.uniform(5, 300), 1), blocked, project))
+                conn.executemany('''
+                    INSERT INTO violations (scan_id, project, check_id, check_name, severity,
+                                            resource_type, resource_name, file_path, file_line,
+                                            guideline, description, timestamp)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', [(scan_id, project, check_id, check_name, severity, resource_type,
+                       resource_name, file_path, rng.randrange(1, 400),
+                       f'https://docs.example.com/{check_id.lower()}',
+                       f'{check_name} for {resource_name}', when)
+                      for check_id, check_name, severity, resource_type, resource_name, file_path
+                      in found])
+                
+                resources = {}
+                for _, _, severity, resource_type, resource_name, file_path in found:
+                    resource = resources.setdefault(resource_name, {
+                        'resource_type': resource_type, 'resource_name': resource_name,
+                        'file_path': file_path, 'check_count': 4, 'violation_count': 0,
+                        'max_severity': severity})
+                    resource['check_count'] += 1
+                    resource['violation_count'] += 1
+                    if Config.SEVERITY_LEVELS[severity] > Config.SEVERITY_LEVELS[resource['max_severity']]:
+                        resource['max_severity'] = severity
+                Database._insert_resources(conn, scan_id, resources.values())
+        print(f"\r  {min(first + batch, scans)}/{scans} scans, {stored:,} violations "
+              f"({time.perf_counter() - start:.0f}s)", end='', flush=True)
+    print()
+    
+    # Let Database rebuild the rollups and replay the lifecycle, as it does
+    # for history stored before those tables existed
+    start = time.perf_counter()
+    with db.get_connection() as conn:
+        conn.execute('DROP TABLE project_rollups')
+        conn.execute('DROP TABLE violation_lifecycle')
+    db.audit.flush()
+    Database(db_path)
+    print(f"  rollups and lifecycle rebuilt in {time.perf_counter() - start:.0f}s")
+    with db.get_connection() as conn:
+        conn.execute('ANALYZE')
+    return stored
+
+
+def start_server(db_path: Path, threads: int):
+    """Serve db_path with dashboard/wsgi.py on a free port; returns (process, base url)"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    env = dict(os.environ, SQLITE_DB_PATH=str(db_path))
+    # Not a pipe: nobody reads it while the test runs, and waitress logs a
+    # warning per queued request under load, which would fill it and stall the server
+    log = tempfile.TemporaryFile()
+    process = subprocess.Popen(
+        [sys.executable, str(ROOT / 'dashboard' / 'wsgi.py'), '--host', '127.0.0.1',
+         '--port', str(port), '--workers', '1', '--threads', str(threads)],
+        env=env, stdout=subprocess.DEVNULL, stderr=log)
+    
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            log.seek(0)
+            raise RuntimeError(f"dashboard exited: {log.read().decode(errors='replace')}")
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return process, url
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError('dashboard did not start within 60s')
+
+
+class Client:
+    """One simulated user: a keep-alive connection issuing requests back to back"""
+    
+    def __init__(self, url: str, gzip: bool):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self.headers = {'Accept-Encoding': 'gzip'} if gzip else {}
+        self.conn = None
+    
+    def get(self, path: str) -> bool:
+        """Issue one GET; True if it succeeded (dashboard errors come back as 200 + 'error')"""
+        for attempt in (1, 2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            try:
+                self.conn.request('GET', self.prefix + path, headers=self.headers)
+                response = self.conn.getresponse()
+                body = response.read()
+                break
+            except (http.client.HTTPException, OSError):
+                self.conn.close()
+                self.conn = None
+                if attempt == 2:
+                    return False
+        if response.status != 200:
+            return False
+        if body[:1] == b'{' and response.getheader('Content-Encoding') != 'gzip':
+            return 'error' not in json.loads(body)
+        return True
+    
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+
+
+def measure(url: str, path: str, concurrency: int, duration: float, requests: int,
+            gzip: bool) -> dict:
+    """Drive one endpoint with `concurrency` clients; returns its latency stats (ms)"""
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    remaining = [requests]
+    deadline = [0.0]
+    
+    def worker():
+        client = Client(url, gzip)
+        mine, failed = [], 0
+        while time.perf_counter() < deadline[0]:
+            if requests:
+                with lock:
+                    if remaining[0] <= 0:
+                        break
+                    remaining[0] -= 1
+            start = time.perf_counter()
+            ok = client.get(path)
+            mine.append((time.perf_counter() - start) * 1000)
+            failed += not ok
+        client.close()
+        with lock:
+            latencies.extend(mine)
+            errors[0] += failed
+    
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    start = time.perf_counter()
+    deadline[0] = start + (duration if not requests else float('inf'))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    
+    latencies.sort()
+    return {
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': errors[0],
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 1),
+        'p95_ms': round(percentile(latencies, 95), 1),
+        'p99_ms': round(percentile(latencies, 99), 1),
+        'max_ms': round(latencies[-1], 1) if latencies else 0.0,
+        'mean_ms': round(statistics.fmean(latencies), 1) if latencies else 0.0
+    }
+
+
+def database_stats(db_path: Path) -> dict:
+    from database import Database
+    
+    with Database(db_path).get_read_connection() as conn:
+        return {table: conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                for table in ('scans', 'violations', 'resources')}
+
+
+def run(args):
+    endpoints = []
+    for spec in args.endpoint or DEFAULT_ENDPOINTS:
+        name, sep, path = spec.partition('=')
+        if not sep or not path.startswith('/'):
+            sys.exit(f"Invalid --endpoint {spec!r} (expected name=/path)")
+        endpoints.append((name, path))
+    levels = [int(level) for level in args.concurrency.split(',')]
+    
+    process = None
+    if args.url:
+        url = args.url
+    else:
+        db_path = Path(args.db)
+        if not db_path.exists():
+            sys.exit(f"No database at {db_path} (create one with: load_test.py seed --db {db_path})")
+        process, url = start_server(db_path, args.threads)
+    
+    report = {
+        'target': args.url or {'db': str(args.db), **database_stats(Path(args.db)),
+                               'server_threads': args.threads},
+        'duration_s': None if args.requests else args.duration,
+        'requests_per_level': args.requests or None,
+        'gzip': args.gzip,
+        'endpoints': {}
+    }
+    try:
+        print(f"{'endpoint':<16} {'conc':>5} {'reqs':>7} {'err':>5} {'req/s':>8} "
+              f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+        for name, path in endpoints:
+            Client(url, args.gzip).get(path)  # warm caches and the read connection
+            results = []
+            for level in levels:
+                stats = measure(url, path, level, args.duration, args.requests, args.gzip)
+                results.append(stats)
+                print(f"{name:<16} {level:>5} {stats['requests']:>7} {stats['errors']:>5} "
+                      f"{stats['rps']:>8.1f} {stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} "
+                      f"{stats['p99_ms']:>8.1f} {stats['max_ms']:>8.1f}", flush=True)
+            report['endpoints'][name] = {'path': path, 'levels': results}
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, sort_keys=True) + '\n')
+        print(f"\nResults written to {args.output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the Cloud Sentinel dashboard API')
+    sub = parser.add_subparsers(dest='command', required=True)
+    
+    seed_parser = sub.add_parser('seed', help='Create a database with synthetic scan history')
+    seed_parser.add_argument('--db', type=str, required=True, help='Database to create')
+    seed_parser.add_argument('--scans', type=int, default=2000, help='Scans to seed (default: 2000)')
+    seed_parser.add_argument('-n', '--violations', type=int, default=1000000,
+                             help='Violations to seed in total (default: 1000000)')
+    seed_parser.add_argument('--projects', type=int, default=10, help='Projects (default: 10)')
+    seed_parser.add_argument('--days', type=int, default=180, help='History in days (default: 180)')
+    seed_parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    
+    run_parser = sub.add_parser('run', help='Measure endpoint latency under concurrency')
+    target = run_parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--db', type=str, help='Serve this database with dashboard/wsgi.py')
+    target.add_argument('--url', type=str, help='Base URL of a running dashboard')
+    run_parser.add_argument('-c', '--concurrency', type=str, default='1,8,32',
+                            help='Comma-separated concurrent clients per step (default: 1,8,32)')
+    run_parser.add_argument('--duration', type=float, default=10,
+                            help='Seconds per endpoint and level (default: 10)')
+    run_parser.add_argument('--requests', type=int, default=0,
+                            help='Fixed request count per endpoint and level instead of --duration')
+    run_parser.add_argument('--endpoint', action='append', metavar='NAME=PATH',
+                            help='Endpoint to measure (repeatable; default: the dashboard panels)')
+    run_parser.add_argument('--threads', type=int, default=8,
+                            help='Server threads when serving --db (default: 8)')
+    run_parser.add_argument('--gzip', action='store_true', help='Request gzip-compressed responses')
+    run_parser.add_argument('-o', '--output', type=str, help='Write results as JSON')
+    
+    args = parser.parse_args()
+    
+    # Database() is instantiated on import; keep it off the default database
+    if args.command == 'seed' or args.db:
+        os.environ['SQLITE_DB_PATH'] = str(args.db)
+    
+    if args.command == 'seed':
+        db_path = Path(args.db)
+        if db_path.exists():
+            sys.exit(f"{db_path} already exists; seed a new file")
+        start = time.perf_counter()
+        stored = seed(db_path, args.scans, args.violations, args.projects, args.days, args.seed)
+        print(f"Seeded {args.scans} scans, {stored:,} violations into {db_path} "
+              f"in {time.perf_counter() - start:.0f}s")
+    else:
+        run(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -50,7 +50,11 @@ mkdir -p "$OUTPUT_DIR"
 
 # Generate timestamp for this scan
 TIMESTAMP=$(date +%Y%m%d_%H%M%S)
-OUTPUT_FILE="$OUTPUT_DIR/scan_${TIMESTAMP}.json"
+OUTPUT_FILE="$OUTPUT_DIR/scan_${TIMESTAMP}_$$.json"
+
+# Private work directory so concurrent scans don't share results_json.json
+WORK_DIR=$(mktemp -d "$OUTPUT_DIR/.scan_${TIMESTAMP}_XXXXXX")
+trap 'rm -rf "$WORK_DIR"' EXIT
 
 echo -e "${YELLOW}Scanning: $TERRAFORM_DIR${NC}"
 echo -e "${YELLOW}Output: $OUTPUT_FILE${NC}"
@@ -65,12 +69,12 @@ $CHECKOV_CMD \
     --framework terraform \
     -o cli \
     -o json \
-    --output-file-path "$OUTPUT_DIR" \
+    --output-file-path "$WORK_DIR" \
     --compact
 
-# Rename output file
-if [ -f "$OUTPUT_DIR/results_json.json" ]; then
-    mv "$OUTPUT_DIR/results_json.json" "$OUTPUT_FILE"
+# Move output file into place (atomic rename, same filesystem)
+if [ -f "$WORK_DIR/results_json.json" ]; then
+    mv "$WORK_DIR/results_json.json" "$OUTPUT_FILE"
 fi
 
 echo ""
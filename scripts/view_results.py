@@ -4,15 +4,17 @@ CLOUD SENTINEL - View Scan Results
 Query and display scan results from SQLite database
 """
 
+import json
 import sys
-import os
 from pathlib import Path
 
 # Add scanner directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'scanner'))
 
 from database import Database
-from tabulate import tabulate
+from export import EXPORT_FORMATS, SCAN_COLUMNS, VIOLATION_COLUMNS, iter_rows, serialize
+
+SEVERITY_ORDER = ['CRITICAL', 'HIGH', 'MEDIUM', 'LOW']
 
 
 def print_header(title: str):
@@ -22,80 +24,123 @@ def print_header(title: str):
     print("=" * 60)
 
 
-def view_recent_scans(db: Database, limit: int = 10):
+def write_rows(rows, fmt: str, columns=None):
+    """Write rows to stdout as they are read (json, ndjson or csv)"""
+    out = sys.stdout
+    for chunk in serialize(rows, fmt, columns):
+        out.write(chunk)
+    out.flush()
+
+
+def ordered_severities(summary: dict) -> list:
+    """Severities present in a summary, most severe first"""
+    return ([sev for sev in SEVERITY_ORDER if sev in summary]
+            + sorted(sev for sev in summary if sev not in SEVERITY_ORDER))
+
+
+def view_recent_scans(db: Database, limit: int = 10, fmt: str = 'text',
+                      project: str = None):
     """View recent scans"""
-    print_header("Recent Scans")
+    scans = iter_rows(db.iter_scans(limit, project=project))
     
-    scans = db.get_recent_scans(limit)
-    
-    if not scans:
-        print("No scans found.")
+    if fmt != 'text':
+        write_rows(({col: scan.get(col) for col in SCAN_COLUMNS} for scan in scans),
+                   fmt, SCAN_COLUMNS)
         return
     
-    table_data = []
+    print_header("Recent Scans")
+    
+    row_format = "{:<24} {:<20} {:<12} {:>7} {:>7}  {}"
+    printed = 0
     for scan in scans:
+        if not printed:
+            print(row_format.format("Scan ID", "Timestamp", "Status", "Passed", "Failed", "Blocked"))
+            print("-" * 80)
+        
         status_icon = "✓" if scan['status'] == 'completed' else "✗"
         blocked_icon = "🚫" if scan['blocked_deployment'] else "✅"
         
-        table_data.append([
+        print(row_format.format(
             scan['scan_id'][:20] + "...",
-            scan['timestamp'],
+            str(scan['timestamp']),
             f"{status_icon} {scan['status']}",
             scan['passed_checks'],
             scan['failed_checks'],
             blocked_icon
-        ])
+        ))
+        printed += 1
     
-    headers = ["Scan ID", "Timestamp", "Status", "Passed", "Failed", "Blocked"]
-    print(tabulate(table_data, headers=headers, tablefmt="grid"))
+    if not printed:
+        print("No scans found.")
 
 
-def view_violations(db: Database, scan_id: str = None):
-    """View violations for a scan"""
-    print_header("Violations")
-    
-    if scan_id:
-        violations = db.get_violations(scan_id)
-        print(f"Scan: {scan_id}\n")
-    else:
-        # Get latest scan
-        scans = db.get_recent_scans(1)
+def view_violations(db: Database, scan_id: str = None, severity: str = None,
+                    fmt: str = 'text', project: str = None):
+    """View violations for a scan, streamed from the database"""
+    latest = False
+    if not scan_id:
+        # Get latest full scan (fast / plan scans only run a subset of checks)
+        scans = db.get_recent_scans(1, project=project, kind='full')
         if not scans:
-            print("No scans found.")
+            if fmt == 'text':
+                print_header("Violations")
+                print("No scans found.")
             return
         scan_id = scans[0]['scan_id']
-        violations = db.get_violations(scan_id)
-        print(f"Latest Scan: {scan_id}\n")
+        latest = True
     
-    if not violations:
-        print("No violations found.")
+    # Counts come from a GROUP BY; rows are streamed one severity at a time
+    summary = db.get_violation_summary(scan_id)
+    severities = [severity] if severity else ordered_severities(summary)
+    
+    def rows():
+        for sev in severities:
+            yield from iter_rows(db.iter_violations(scan_id, severity=sev))
+    
+    if fmt != 'text':
+        write_rows(({col: v.get(col) for col in VIOLATION_COLUMNS} for v in rows()),
+                   fmt, VIOLATION_COLUMNS)
         return
     
-    # Group by severity
-    by_severity = {}
-    for v in violations:
-        sev = v['severity']
-        if sev not in by_severity:
-            by_severity[sev] = []
-        by_severity[sev].append(v)
+    print_header("Violations")
+    print(f"{'Latest Scan' if latest else 'Scan'}: {scan_id}\n")
+    
+    if not any(summary.get(sev) for sev in severities):
+        print("No violations found.")
+        return
     
-    for severity in ['CRITICAL', 'HIGH', 'MEDIUM', 'LOW']:
-        if severity in by_severity:
-            print(f"\n[{severity}] - {len(by_severity[severity])} issues")
-            print("-" * 40)
-            
-            for v in by_severity[severity]:
-                print(f"  • {v['check_id']}: {v['check_name']}")
-                print(f"    Resource: {v['resource_name']}")
-                print(f"    File: {v['file_path']}:{v['file_line']}")
-                print()
+    for sev in severities:
+        if not summary.get(sev):
+            continue
+        print(f"\n[{sev}] - {summary[sev]} issues")
+        print("-" * 40)
+        
+        for v in iter_rows(db.iter_violations(scan_id, severity=sev)):
+            print(f"  • {v['check_id']}: {v['check_name']}")
+            print(f"    Resource: {v['resource_name']}")
+            print(f"    File: {v['file_path']}:{v['file_line']}")
+            print()
 
 
-def view_statistics(db: Database):
+def view_statistics(db: Database, fmt: str = 'text', project: str = None):
     """View overall statistics"""
-    print_header("Statistics")
+    stats = db.get_statistics(project)
+    
+    if fmt == 'csv':
+        rows = [{'metric': key, 'value': value} for key, value in stats.items()
+                if key != 'violations_by_severity']
+        rows += [{'metric': f'violations_{sev}', 'value': count}
+                 for sev, count in stats['violations_by_severity'].items()]
+        write_rows(rows, fmt)
+        return
+    if fmt == 'json':
+        print(json.dumps(stats, indent=2))
+        return
+    if fmt == 'ndjson':
+        write_rows([stats], fmt)
+        return
     
-    stats = db.get_statistics()
+    print_header(f"Statistics: {project}" if project else "Statistics")
     
     print(f"Total Scans: {stats['total_scans']}")
     print(f"Total Violations: {stats['total_violations']}")
@@ -106,15 +151,197 @@ def view_statistics(db: Database):
         print(f"  {severity}: {count}")
 
 
+def view_top_resources(db: Database, scan_id: str = None, limit: int = 10,
+                       fmt: str = 'text', project: str = None):
+    """View the riskiest resources of a scan"""
+    top = db.get_riskiest_resources(scan_id, limit, project=project)
+    
+    if fmt != 'text':
+        write_rows(top['resources'], fmt)
+        return
+    
+    print_header("Riskiest Resources")
+    
+    if not top['resources']:
+        print("No resource data found.")
+        return
+    
+    print(f"Scan: {top['scan_id']}\n")
+    row_format = "{:<10} {:>10} {:>7}  {}"
+    print(row_format.format("Severity", "Violations", "Checks", "Resource"))
+    print("-" * 80)
+    for r in top['resources']:
+        print(row_format.format(r['max_severity'] or '-', r['violation_count'],
+                                r['check_count'], r['resource_name']))
+
+
+def view_resource_history(db: Database, resource_name: str, limit: int = 10,
+                          fmt: str = 'text', project: str = None):
+    """View a resource's posture across scans"""
+    history = db.get_resource_history(resource_name, limit, project=project)
+    
+    if fmt != 'text':
+        write_rows(history, fmt)
+        return
+    
+    print_header(f"History: {resource_name}")
+    
+    if not history:
+        print("No history found for this resource.")
+        return
+    
+    row_format = "{:<20} {:<10} {:>10} {:>7}  {}"
+    print(row_format.format("Timestamp", "Severity", "Violations", "Checks", "Scan ID"))
+    print("-" * 80)
+    for h in history:
+        print(row_format.format(str(h['timestamp']), h['max_severity'] or '-',
+                                h['violation_count'], h['check_count'], h['scan_id']))
+
+
+def search_violations(db: Database, query: str, severity: str = None,
+                      scan_id: str = None, limit: int = 10, offset: int = 0,
+                      fmt: str = 'text', project: str = None):
+    """Full-text search over violations"""
+    page = db.search_violations(query, severity=severity, scan_id=scan_id,
+                                limit=limit, offset=offset, project=project)
+    
+    if fmt != 'text':
+        write_rows(({col: v.get(col) for col in VIOLATION_COLUMNS + ['rank']}
+                    for v in page['results']), fmt, VIOLATION_COLUMNS + ['rank'])
+        return
+    
+    print_header(f"Search: {query}")
+    
+    if not page['results']:
+        print("No matching violations found.")
+        return
+    
+    for v in page['results']:
+        print(f"  • [{v['severity']}] {v['check_id']}: {v['check_name']}")
+        print(f"    Resource: {v['resource_name']}")
+        print(f"    File: {v['file_path']}:{v['file_line']}")
+        print(f"    Scan: {v['scan_id']}")
+        print()
+    
+    if page['has_more']:
+        print(f"More results available: --offset {offset + limit}")
+
+
+def view_projects(db: Database, fmt: str = 'text'):
+    """View the cross-project rollup"""
+    projects = db.get_project_rollups()
+    
+    if fmt != 'text':
+        write_rows(projects, fmt)
+        return
+    
+    print_header("Projects")
+    
+    if not projects:
+        print("No projects found.")
+        return
+    
+    row_format = "{:<30} {:>6} {:>10} {:>8} {:>6}  {}"
+    print(row_format.format("Project", "Scans", "Violations", "Critical", "High", "Last Scan"))
+    print("-" * 80)
+    for p in projects:
+        print(row_format.format(p['project'][:30], p['scan_count'], p['violation_count'],
+                                p['critical_count'], p['high_count'],
+                                f"{p['last_status'] or '-'} {p['last_scan_at'] or ''}"))
+
+
+def view_mttr(db: Database, fmt: str = 'text', project: str = None,
+              branch: str = None, since: str = None):
+    """View mean time to remediate per severity"""
+    mttr = db.get_mttr(project, branch, since)
+    rows = [{'severity': sev, **mttr[sev]} for sev in ordered_severities(mttr)]
+    
+    if fmt != 'text':
+        write_rows(rows, fmt)
+        return
+    
+    scope = ' / '.join(part for part in (project, branch) if part)
+    print_header(f"Mean Time to Remediate: {scope}" if scope else "Mean Time to Remediate")
+    
+    if not rows:
+        print("No findings tracked yet.")
+        return
+    
+    row_format = "{:<10} {:>7} {:>12} {:>12} {:>7}"
+    print(row_format.format("Severity", "Fixed", "MTTR (h)", "Longest (h)", "Open"))
+    print("-" * 52)
+    for row in rows:
+        print(row_format.format(row['severity'], row['fixed'],
+                                '-' if row['mttr_hours'] is None else row['mttr_hours'],
+                                '-' if row['max_hours'] is None else row['max_hours'],
+                                row['open']))
+
+
+def view_open_ages(db: Database, fmt: str = 'text', project: str = None, branch: str = None):
+    """View open findings by age since first seen"""
+    ages = db.get_open_ages(project, branch)
+    by_severity = ages['by_severity']
+    rows = [{'severity': sev, **by_severity[sev]} for sev in ordered_severities(by_severity)]
+    
+    if fmt != 'text':
+        write_rows(rows, fmt, ['severity'] + ages['buckets'])
+        return
+    
+    print_header("Open Findings by Age")
+    
+    if not rows:
+        print("No open findings.")
+        return
+    
+    row_format = "{:<10}" + " {:>8}" * len(ages['buckets'])
+    print(row_format.format("Severity", *ages['buckets']))
+    print("-" * (10 + 9 * len(ages['buckets'])))
+    for row in rows:
+        print(row_format.format(row['severity'], *(row[label] for label in ages['buckets'])))
+    print(f"\n{ages['open']} open, oldest {ages['oldest_days']} days")
+
+
+def view_audit_log(db: Database, scan_id: str = None, action: str = None,
+                   since: str = None, limit: int = 10, fmt: str = 'text'):
+    """View audit events, newest first"""
+    events = db.get_audit_log(scan_id=scan_id, action=action, since=since, limit=limit)
+    
+    if fmt != 'text':
+        write_rows(events, fmt, ['timestamp', 'action', 'details', 'user', 'scan_id'])
+        return
+    
+    print_header("Audit Log")
+    
+    if not events:
+        print("No audit events found.")
+        return
+    
+    for event in events:
+        print(f"{event['timestamp']}  {event['action']:<16} {event['details']}")
+
+
 def main():
     """Main entry point"""
     import argparse
     
     parser = argparse.ArgumentParser(description='View Cloud Sentinel scan results')
-    parser.add_argument('command', choices=['scans', 'violations', 'stats'],
+    parser.add_argument('command', choices=['scans', 'violations', 'stats', 'search',
+                                            'resources', 'history', 'projects', 'mttr', 'ages',
+                                            'audit'],
                        help='What to view')
+    parser.add_argument('query', nargs='*',
+                       help='Search terms (search) or resource name (history)')
     parser.add_argument('--scan-id', type=str, help='Specific scan ID')
+    parser.add_argument('--project', type=str, help='Only this project / repository')
+    parser.add_argument('--branch', type=str, help='Only this branch (mttr, ages)')
+    parser.add_argument('--since', type=str,
+                       help='Only findings fixed (mttr) or events logged (audit) since this date')
+    parser.add_argument('--action', type=str, help='Only this audit action, e.g. SCAN_FAILED')
+    parser.add_argument('--severity', type=str, help='Filter by severity')
     parser.add_argument('--limit', type=int, default=10, help='Number of results')
+    parser.add_argument('--offset', type=int, default=0, help='Skip this many results')
+    parser.add_argument('--format', choices=['text'] + EXPORT_FORMATS, default='text',
+                       help='Output format (json/ndjson/csv stream rows for piping)')
     
     args = parser.parse_args()
     
@@ -122,19 +349,42 @@ def main():
     db = Database()
     
     if args.command == 'scans':
-        view_recent_scans(db, args.limit)
+        view_recent_scans(db, args.limit, fmt=args.format, project=args.project)
     elif args.command == 'violations':
-        view_violations(db, args.scan_id)
+        view_violations(db, args.scan_id, severity=args.severity, fmt=args.format,
+                        project=args.project)
     elif args.command == 'stats':
-        view_statistics(db)
+        view_statistics(db, fmt=args.format, project=args.project)
+    elif args.command == 'projects':
+        view_projects(db, fmt=args.format)
+    elif args.command == 'mttr':
+        view_mttr(db, fmt=args.format, project=args.project, branch=args.branch,
+                  since=args.since)
+    elif args.command == 'ages':
+        view_open_ages(db, fmt=args.format, project=args.project, branch=args.branch)
+    elif args.command == 'audit':
+        view_audit_log(db, args.scan_id, action=args.action, since=args.since,
+                       limit=args.limit, fmt=args.format)
+    elif args.command == 'resources':
+        view_top_resources(db, args.scan_id, args.limit, fmt=args.format,
+                           project=args.project)
+    elif args.command == 'history':
+        if not args.query:
+            parser.error('history requires a resource name')
+        view_resource_history(db, args.query[0], args.limit, fmt=args.format,
+                              project=args.project)
+    elif args.command == 'search':
+        if not args.query:
+            parser.error('search requires query terms')
+        search_violations(db, ' '.join(args.query), severity=args.severity,
+                          scan_id=args.scan_id, limit=args.limit, offset=args.offset,
+                          fmt=args.format, project=args.project)
 
 
 if __name__ == '__main__':
     try:
-        from tabulate import tabulate
-    except ImportError:
-        print("Installing tabulate...")
-        os.system('pip3 install tabulate')
-        from tabulate import tabulate
-    
-    main()
+        main()
+    except BrokenPipeError:
+        # Output piped into head/less etc. that exited early
+        sys.stderr.close()
+        sys.exit(0)
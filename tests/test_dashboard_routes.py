@@ -0,0 +1,56 @@
+"""
+CLOUD SENTINEL - Dashboard routing tests
+Project-scoped routes must not swallow sub-resource segments into the project name
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# The dashboard opens its database on import
+os.environ['SQLITE_DB_PATH'] = str(Path(tempfile.mkdtemp()) / 'scan_results.db')
+os.environ.pop('ANALYTICS_BACKEND', None)
+sys.path.insert(0, str(Path(__file__).parent.parent / 'dashboard'))
+
+import app as dashboard  # noqa: E402
+
+
+@pytest.fixture
+def urls():
+    return dashboard.app.url_map.bind('localhost')
+
+
+@pytest.mark.parametrize('path, endpoint, args', [
+    ('/api/projects/default/export/violations', 'export_rows',
+     {'project': 'default', 'table': 'violations'}),
+    ('/api/projects/acme/infra/export/scans', 'export_rows',
+     {'project': 'acme/infra', 'table': 'scans'}),
+    ('/api/projects/default/resources/top', 'get_top_resources', {'project': 'default'}),
+    ('/api/projects/default/resources/aws_s3_bucket.logs/history', 'get_resource_history',
+     {'project': 'default', 'resource_name': 'aws_s3_bucket.logs'}),
+    ('/api/projects/default/lifecycle/mttr', 'get_mttr', {'project': 'default'}),
+    ('/api/projects/default/violations', 'get_violations', {'project': 'default'}),
+    ('/api/projects/acme/infra/violations', 'get_violations', {'project': 'acme/infra'}),
+])
+def test_project_routes(urls, path, endpoint, args):
+    assert urls.match(path) == (endpoint, args)
+
+
+def test_project_export_streams_ndjson():
+    response = dashboard.app.test_client().get(
+        '/api/projects/default/export/violations?format=ndjson')
+    assert response.status_code == 200
+    assert response.mimetype == dashboard.CONTENT_TYPES['ndjson']
+
+
+def test_changes_report_both_cursors():
+    client = dashboard.app.test_client()
+    summary = client.get('/api/summary').get_json()
+    delta = client.get(f"/api/changes?cursor={summary['cursor']}"
+                       f"&updated={summary['updated_cursor']}").get_json()
+    assert (delta['cursor'], delta['updated_cursor']) == (summary['cursor'],
+                                                          summary['updated_cursor'])
+    assert delta['updated'] == [] and not delta['reset']